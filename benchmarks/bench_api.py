@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.generate_vault import bulk_insert, synthetic_credentials
+
+#####
+# latency and throughput of the API routes on synthetic vaults
+# seeds a throwaway database (never vault.db) with N credentials per size from generate_vault, then
+# drives the Flask app in-process through its test client, so the numbers are the app's cost without
+# any network. results are written as JSON, and compared against a baseline file to flag
+# regressions (exit status 1).
+#
+#     python -m benchmarks.bench_api --sizes 1000,10000,100000 --output results.json
+#     python -m benchmarks.bench_api --baseline benchmarks/baseline_api.json
+#
+# a baseline is just an earlier --output file. numbers only compare on the same machine, so
+# regenerate it there with --output benchmarks/baseline_api.json when the hardware changes.
+#####
+
+BENCH_USER = "bench-user"
+BENCH_PASSWORD = "bench-master-password"
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_THRESHOLD = 0.25
+# compared against the baseline; the other numbers are informational
+COMPARED_METRIC = "p50_ms"
+
+
+def load_app(db_path: str):
+    # both are read when the modules are imported, so they have to be set first
+    os.environ["PASSWORDMANAGER_DB"] = db_path
+    os.environ["PASSWORDMANAGER_AUTO_LOCK_SECONDS"] = "0"
+    import passwordmanager.api.routes as routes
+    from passwordmanager.core import passwordManager
+
+    routes.app.config["TESTING"] = True
+    return routes, passwordManager
+
+
+def login(client):
+    response = client.post("/account/login", json={"username": BENCH_USER, "master_password": BENCH_PASSWORD})
+    assert response.status_code == 200, response.get_json()
+
+
+def seed(routes, pm, size: int) -> list:
+    """Replace the vault's rows with `size` synthetic credentials owned by the bench user."""
+    state = routes.sessions.default.snapshot()
+    pm.c.execute("DELETE FROM credentials")
+    pm.conn.commit()
+    bulk_insert(pm, BENCH_USER, state.cipher, state.reuse_key, synthetic_credentials(size, random.Random(size)))
+    pm.c.execute("SELECT id FROM credentials WHERE owner = ?", (BENCH_USER,))
+    return [row[0] for row in pm.c.fetchall()]
+
+
+def timed(func, runs: int) -> list:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(name: str, size: int, times: list, rows_per_run: int = 0) -> dict:
+    ordered = sorted(times)
+    mean = statistics.fmean(ordered)
+    result = {
+        "name": name,
+        "size": size,
+        "runs": len(ordered),
+        "mean_ms": round(mean * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "ops_per_s": round(1 / mean, 2) if mean else None,
+    }
+    if rows_per_run:
+        result["rows_per_s"] = round(rows_per_run / mean, 1) if mean else None
+    return result
+
+
+def expect_ok(response):
+    assert response.status_code in (200, 201), (response.status_code, response.get_data(as_text=True)[:200])
+    return response
+
+
+def bench_size(routes, pm, client, size: int, args) -> list:
+    start = time.perf_counter()
+    ids = seed(routes, pm, size)
+    print(f"seeded {size:,} credentials in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    results = []
+
+    results.append(summarize("list", size, timed(lambda: expect_ok(client.get("/list")), args.repeat), size))
+    results.append(summarize(
+        "export_json", size, timed(lambda: expect_ok(client.get("/export?format=json")), args.repeat), size
+    ))
+    results.append(summarize(
+        "export_csv", size, timed(lambda: expect_ok(client.get("/export?format=csv")), args.repeat), size
+    ))
+
+    sample = [random.choice(ids) for _ in range(args.samples)]
+    get_times = [timed(lambda cred_id=cred_id: expect_ok(client.get(f"/get/{cred_id}")), 1)[0] for cred_id in sample]
+    results.append(summarize("get", size, get_times))
+
+    duplicate_times = []
+    pm.c.execute("SELECT site, username FROM credentials ORDER BY RANDOM() LIMIT ?", (args.samples,))
+    for i, (site, username) in enumerate(pm.c.fetchall()):
+        # half hits, half misses
+        payload = {"site": site, "username": username if i % 2 == 0 else f"missing{i}@example.com"}
+        duplicate_times.append(timed(lambda: expect_ok(client.post("/check-duplicate", json=payload)), 1)[0])
+    results.append(summarize("check_duplicate", size, duplicate_times))
+
+    header = "site,username,password\n"
+    body = "".join(f"import{i}.example.com,importer{i},pw-{i}-{random.random()}\n" for i in range(args.import_rows))
+    import_times = []
+    for _ in range(args.repeat):
+        import_times.append(timed(lambda: expect_ok(client.post(
+            "/import?allow_duplicates=true", data=header + body, content_type="text/csv"
+        )), 1)[0])
+        pm.c.execute("DELETE FROM credentials WHERE site LIKE 'import%.example.com'")
+        pm.conn.commit()
+    results.append(summarize("import", size, import_times, args.import_rows))
+
+    results.append(summarize("login", size, timed(lambda: login(client), args.login_repeat)))
+    return results
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """Rows that got slower than the baseline by more than threshold (a fraction, 0.25 = 25%)."""
+    previous = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["name"], result["size"]))
+        if not before or not before.get(COMPARED_METRIC):
+            continue
+        ratio = result[COMPARED_METRIC] / before[COMPARED_METRIC]
+        result["baseline_" + COMPARED_METRIC] = before[COMPARED_METRIC]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(result)
+    return regressions
+
+
+def print_table(results: list):
+    print(f"{'benchmark':<16} {'size':>8} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>10} {'rows/s':>12} {'vs base':>8}")
+    for r in results:
+        rows = f"{r['rows_per_s']:>12,.0f}" if r.get("rows_per_s") else f"{'':>12}"
+        ratio = f"{r['ratio']:>7.2f}x" if "ratio" in r else f"{'':>8}"
+        print(
+            f"{r['name']:<16} {r['size']:>8,} {r['runs']:>5} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f}"
+            f" {r['ops_per_s']:>10,.1f} {rows} {ratio}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API routes on synthetic vaults")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated vault sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of the whole-vault routes per size")
+    parser.add_argument("--samples", type=int, default=200, help="requests for the single-row routes per size")
+    parser.add_argument("--import-rows", type=int, default=1000, help="rows per /import request")
+    parser.add_argument("--login-repeat", type=int, default=3, help="logins (one KDF each) per size")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"slowdown of {COMPARED_METRIC} counted as a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        routes, pm = load_app(os.path.join(tmpdir, "bench-vault.db"))
+        client = routes.app.test_client()
+        client.post("/account/create", json={"username": BENCH_USER, "master_password": BENCH_PASSWORD})
+        login(client)
+
+        results = []
+        for size in sizes:
+            results.extend(bench_size(routes, pm, client, size, args))
+        pm.conn.close()
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    print_table(results)
+
+    if args.output:
+        payload = {
+            "benchmark": "api",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.write("\n")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r['name']} @ {r['size']:,}: {r[COMPARED_METRIC]:.2f} ms vs {r['baseline_' + COMPARED_METRIC]:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
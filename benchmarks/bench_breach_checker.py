@@ -0,0 +1,68 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from passwordmanager.utils.breach_checker import BloomFilter, BreachChecker, DIGEST_SIZE
+
+#####
+# lookup rate of the offline breach checker
+# builds a synthetic hash file of random SHA-1 digests (the real dump is the same format, only bigger),
+# then times lookups with and without the Bloom prefilter, for hits and for misses.
+#
+#     python -m benchmarks.bench_breach_checker --hashes 5000000 --lookups 200000
+#####
+
+
+def build_file(path: str, count: int) -> None:
+    digests = sorted(os.urandom(DIGEST_SIZE) for _ in range(count))
+    with open(path, "wb") as target:
+        target.write(b"".join(digests))
+
+
+def sample_hits(path: str, count: int, lookups: int):
+    with open(path, "rb") as source:
+        data = source.read()
+    return [data[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE] for i in random.sample(range(count), min(lookups, count))]
+
+
+def time_lookups(checker: BreachChecker, digests) -> float:
+    start = time.perf_counter()
+    for digest in digests:
+        checker.contains_digest(digest)
+    elapsed = time.perf_counter() - start
+    return len(digests) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark breached-password lookups")
+    parser.add_argument("--hashes", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--file", help="existing hash file to use instead of a synthetic one")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = args.file
+        if path is None:
+            path = os.path.join(tmpdir, "hashes.bin")
+            start = time.perf_counter()
+            build_file(path, args.hashes)
+            print(f"built {args.hashes:,} hashes in {time.perf_counter() - start:.1f}s")
+        count = os.path.getsize(path) // DIGEST_SIZE
+
+        hits = sample_hits(path, count, args.lookups)
+        misses = [os.urandom(DIGEST_SIZE) for _ in range(args.lookups)]
+
+        start = time.perf_counter()
+        bloom = BloomFilter.from_hash_file(path)
+        print(f"bloom filter: {len(bloom.bits) / 2**20:.1f} MiB, built in {time.perf_counter() - start:.1f}s")
+
+        with BreachChecker(path) as checker:
+            print(f"mmap only      hits: {time_lookups(checker, hits):>12,.0f}/s   misses: {time_lookups(checker, misses):>12,.0f}/s")
+        with BreachChecker(path, bloom) as checker:
+            print(f"bloom + mmap   hits: {time_lookups(checker, hits):>12,.0f}/s   misses: {time_lookups(checker, misses):>12,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+# runs without a display unless told otherwise; has to be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEvent
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.bench_api import compare, print_table, summarize, timed
+from benchmarks.generate_vault import synthetic_credentials
+
+#####
+# rendering cost of the credential list
+# feeds ListCredentialsWidget synthetic /list responses (from generate_vault, no server involved) on
+# an offscreen Qt platform and times what a user waits for: the first screenful after a load, paging
+# down through the list, filtering per keystroke, light/dark switches and show/hide all passwords. RSS and live
+# widget counts are recorded next to the timings, since a leak shows up there before it gets slow.
+# output and baseline comparison work like bench_api (exit status 1 on a regression).
+#
+#     python -m benchmarks.bench_gui --sizes 100,1000,5000 --output results.json
+#     python -m benchmarks.bench_gui --baseline earlier.json
+#####
+
+DEFAULT_SIZES = "100,1000,5000"
+DEFAULT_THRESHOLD = 0.25
+# give up waiting for the widget after this long, so a hang fails the run instead of stalling it
+WAIT_TIMEOUT_SECONDS = 600
+
+
+def rss_mb():
+    """Resident set size of this process in MiB, None where it can't be read cheaply."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # peak rather than current, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def credential_list(size: int) -> list:
+    """A /list response body: newest first, dates as MM-DD-YYYY like the route sends them."""
+    rows = sorted(synthetic_credentials(size, random.Random(size)), key=lambda row: row[3], reverse=True)
+    return [
+        {
+            "id": cred_id,
+            "site": site,
+            "username": username,
+            "password": password,
+            "created_at": created_at.strftime("%m-%d-%Y"),
+        }
+        for cred_id, (site, username, password, created_at) in enumerate(rows, start=1)
+    ]
+
+
+def wait_until(app, done):
+    deadline = time.perf_counter() + WAIT_TIMEOUT_SECONDS
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("the credential list did not settle")
+        app.processEvents()
+        time.sleep(0)
+
+
+def settled(widget) -> bool:
+    return not widget.loading and not widget.render_timer.isActive()
+
+
+def bench_size(app, size: int, args) -> list:
+    from passwordmanager.gui.widgets.listCredentialsWidget import ListCredentialsWidget
+    from passwordmanager.utils.theme_manager import theme_manager
+
+    credentials = credential_list(size)
+    results = []
+    rss_before = rss_mb()
+    widgets_before = len(QApplication.allWidgets())
+
+    widget = ListCredentialsWidget()
+    widget.resize(900, 700)
+    widget.show()
+
+    first_paint = []
+    with patch("passwordmanager.api.apiCallerMethods.get_all_credentials", return_value=credentials):
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            widget.load_credentials()
+            wait_until(app, lambda: not widget.loading)
+            app.processEvents()
+            wait_until(app, lambda: settled(widget))
+            first_paint.append(time.perf_counter() - start)
+    results.append(summarize("load_first_screen", size, first_paint))
+
+    # page down to the end, up to --pages pages; a page should cost the same at any depth and vault size
+    scroll_bar = widget.scroll_area.verticalScrollBar()
+    pages = []
+    while scroll_bar.value() < scroll_bar.maximum() and len(pages) < args.pages:
+        start = time.perf_counter()
+        scroll_bar.setValue(scroll_bar.value() + scroll_bar.pageStep())
+        app.processEvents()
+        wait_until(app, lambda: settled(widget))
+        pages.append(time.perf_counter() - start)
+    if pages:
+        results.append(summarize("scroll_page", size, pages))
+    loaded = {
+        "rss_mb": rss_mb(),
+        "cards": len(widget.cards),
+        "widgets": len(QApplication.allWidgets()) - widgets_before,
+    }
+
+    # type a site name one key at a time, pausing long enough for the list to settle
+    # like a person would; the filter pass itself is what's timed (the debounce is skipped).
+    # a keystroke only ranks the head of the matches, the rest is ranked once typing pauses
+    keystrokes = []
+    tails = []
+    for site in random.Random(size).sample([cred["site"] for cred in credentials], min(args.queries, size)):
+        for length in range(1, min(len(site), args.query_length) + 1):
+            widget.search_bar.blockSignals(True)
+            widget.search_bar.setText(site[:length])
+            widget.search_bar.blockSignals(False)
+            keystrokes.extend(timed(widget.apply_filters, 1))
+            wait_until(app, lambda: settled(widget))
+        if widget.tail_query is not None:
+            tails.extend(timed(widget.complete_matches, 1))
+        widget.search_bar.blockSignals(True)
+        widget.search_bar.clear()
+        widget.search_bar.blockSignals(False)
+        widget.apply_filters()
+        wait_until(app, lambda: settled(widget))
+    results.append(summarize("filter_keystroke", size, keystrokes))
+    if tails:
+        results.append(summarize("filter_tail", size, tails))
+
+    # light/dark switches restyle every registered window; processing events includes the re-polish
+    original_mode = theme_manager.current_mode
+    modes = iter(["light", "dark"] * args.repeat)
+
+    def switch_theme():
+        theme_manager.set_mode(next(modes))
+        app.processEvents()
+
+    with patch.object(theme_manager, "save_theme_config"):
+        results.append(summarize("theme_switch", size, timed(switch_theme, args.repeat * 2)))
+        theme_manager.set_mode(original_mode)
+
+    def toggle_passwords():
+        widget.toggle_show_all_passwords()
+        app.processEvents()
+
+    results.append(summarize("toggle_show_all", size, timed(toggle_passwords, args.repeat * 2)))
+
+    widget.close()
+    widget.deleteLater()
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+    app.processEvents()
+    gc.collect()
+    memory = {
+        "rss_before_mb": rss_before,
+        "rss_loaded_mb": loaded["rss_mb"],
+        "rss_after_close_mb": rss_mb(),
+        "cards": loaded["cards"],
+        "widgets_loaded": loaded["widgets"],
+        # widgets still alive once the list is gone; anything above zero is a leak
+        "widgets_leaked": len(QApplication.allWidgets()) - widgets_before,
+    }
+    for result in results:
+        result.update(memory)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the credential list widget on synthetic vaults")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated list sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="loads, theme switch pairs and toggle pairs per size")
+    parser.add_argument("--pages", type=int, default=200, help="most pages scrolled per size")
+    parser.add_argument("--queries", type=int, default=5, help="site names typed per size")
+    parser.add_argument("--query-length", type=int, default=8, help="keystrokes typed per site name")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown of the median counted as a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = []
+    for size in sizes:
+        results.extend(bench_size(app, size, args))
+        last = results[-1]
+        print(
+            f"{size:,} credentials: {last['cards']:,} cards, {last['widgets_loaded']:,} widgets,"
+            f" RSS {last['rss_before_mb']} -> {last['rss_loaded_mb']} -> {last['rss_after_close_mb']} MiB,"
+            f" {last['widgets_leaked']} widgets left after close",
+            file=sys.stderr,
+        )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    print_table(results)
+
+    if args.output:
+        payload = {
+            "benchmark": "gui",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qt_platform": app.platformName(),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.write("\n")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r['name']} @ {r['size']:,}: {r['p50_ms']:.2f} ms vs {r['baseline_p50_ms']:.2f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
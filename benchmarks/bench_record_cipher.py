@@ -0,0 +1,67 @@
+import argparse
+import os
+import sqlite3
+import string
+import tempfile
+import time
+
+from cryptography.fernet import Fernet
+
+from passwordmanager.core.record_cipher import RecordCipher
+
+#####
+# stored size and speed of the credential encryption formats
+# encrypts the same synthetic passwords as Fernet tokens and as AEAD records, then compares bytes per
+# row, the resulting SQLite file size, and encrypt/decrypt throughput.
+#
+#     python -m benchmarks.bench_record_cipher --rows 100000 --length 16
+#####
+
+
+def make_passwords(rows: int, length: int):
+    alphabet = (string.ascii_letters + string.digits).encode()
+    return [bytes(alphabet[b % len(alphabet)] for b in os.urandom(length)) for _ in range(rows)]
+
+
+def time_per_second(func, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def db_size(tokens) -> int:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "vault.db")
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE credentials (id INTEGER PRIMARY KEY, password BLOB)")
+        db.executemany("INSERT INTO credentials (password) VALUES (?)", ((token,) for token in tokens))
+        db.commit()
+        db.execute("VACUUM")
+        db.close()
+        return os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Fernet tokens against AEAD records")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--length", type=int, default=16, help="plaintext password length")
+    args = parser.parse_args()
+
+    vmk = Fernet.generate_key()
+    passwords = make_passwords(args.rows, args.length)
+    formats = [("fernet", Fernet(vmk)), ("record", RecordCipher(vmk))]
+
+    for name, cipher in formats:
+        encrypt_rate = time_per_second(cipher.encrypt, passwords)
+        tokens = [cipher.encrypt(p) for p in passwords]
+        decrypt_rate = time_per_second(cipher.decrypt, tokens)
+        per_row = sum(len(t) for t in tokens) / len(tokens)
+        print(
+            f"{name:<7} {per_row:>6.1f} B/row   db {db_size(tokens) / 2**20:>6.2f} MiB"
+            f"   encrypt {encrypt_rate:>10,.0f}/s   decrypt {decrypt_rate:>10,.0f}/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
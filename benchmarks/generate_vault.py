@@ -0,0 +1,282 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import string
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from passwordmanager.utils.pattern_strength import DICTIONARY_DIR
+
+#####
+# synthetic vaults for load and scale testing
+# writes a vault.db with N made-up but realistic credentials: shared domains with subdomains, emails
+# and handles built from common names, duplicate entries, reused passwords and a mix of weak, medium
+# and strong ones, created over the last five years. the account is made with the real kdf/vmk
+# modules, so the app can open the file (PASSWORDMANAGER_DB=<path>) and log in with the printed
+# credentials. rows are bulk inserted with the credentials indexes and triggers dropped, then those
+# are recreated and the search index rebuilt once, instead of being updated row by row.
+# encryption is most of the cost (about 25 us a row), so with --workers > 1 a process pool encrypts
+# the batches while this process generates the next ones and is the only writer.
+#
+#     python -m benchmarks.generate_vault --output /tmp/vault-1m.db --rows 1000000
+#####
+
+TEST_USERNAME = "loadtest"
+TEST_MASTER_PASSWORD = "loadtest-master-password"
+# cheap Argon2 settings for throwaway vaults (--fast-kdf), so test logins don't each cost 1/4 second
+FAST_KDF_PARAMS = {"time_cost": 1, "memory_cost": 8192, "parallelism": 1}
+INSERT_BATCH_SIZE = 10_000
+
+TLDS = ["com", "com", "com", "org", "net", "io", "co.uk", "de", "fr", "app", "dev"]
+SUBDOMAINS = ["www", "login", "accounts", "app", "mail", "secure", "my", "portal", "id", "shop"]
+EMAIL_DOMAINS = ["gmail.com", "outlook.com", "yahoo.com", "proton.me", "icloud.com", "example.org"]
+STRONG_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*()-_=+"
+# rough shape of a real vault, as fractions of all rows
+DUPLICATE_RATE = 0.02
+WEAK_RATE = 0.15
+REUSED_RATE = 0.20
+MEDIUM_RATE = 0.25
+
+
+def _dictionary(name: str):
+    with open(DICTIONARY_DIR / f"{name}.txt", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def synthetic_credentials(
+    count: int, rng: random.Random, now: Optional[datetime] = None
+) -> Iterator[Tuple[str, str, str, datetime]]:
+    """Yields (site, username, password, created_at) tuples."""
+    words = [word for word in _dictionary("english") if len(word) >= 3 and word.isalpha()]
+    names = _dictionary("names")
+    weak = _dictionary("passwords")
+    now = now or datetime.utcnow()
+    max_age = 5 * 365 * 24 * 3600
+
+    # about four accounts per domain, and a pool of passwords that keep coming back
+    domains = [f"{rng.choice(words)}{rng.choice(words)}.{rng.choice(TLDS)}" for _ in range(max(1, count // 4))]
+    shared = ["".join(rng.choices(STRONG_ALPHABET, k=12)) for _ in range(max(1, count // 50))]
+
+    previous = None
+    for _ in range(count):
+        if previous is not None and rng.random() < DUPLICATE_RATE:
+            # the same login saved twice, usually with a different password
+            site, username = previous
+        else:
+            domain = rng.choice(domains)
+            site = f"{rng.choice(SUBDOMAINS)}.{domain}" if rng.random() < 0.3 else domain
+            first, last = rng.choice(names), rng.choice(names)
+            style = rng.random()
+            if style < 0.6:
+                username = f"{first}.{last}@{rng.choice(EMAIL_DOMAINS)}"
+            elif style < 0.85:
+                username = f"{first}{rng.randrange(100)}"
+            else:
+                username = f"{first[0]}{last}"
+            previous = (site, username)
+
+        kind = rng.random()
+        if kind < WEAK_RATE:
+            password = rng.choice(weak)
+        elif kind < WEAK_RATE + REUSED_RATE:
+            password = rng.choice(shared)
+        elif kind < WEAK_RATE + REUSED_RATE + MEDIUM_RATE:
+            password = f"{rng.choice(words).capitalize()}{rng.randrange(10000)}{rng.choice('!?.#')}"
+        else:
+            password = "".join(rng.choices(STRONG_ALPHABET, k=rng.randrange(16, 25)))
+
+        yield site, username, password, now - timedelta(seconds=rng.randrange(max_age))
+
+
+def _encrypt_batch(cipher, reuse_key: Optional[bytes], owner: str, batch) -> List[tuple]:
+    from passwordmanager.core.reuse_index import password_fingerprint
+
+    return [
+        (site, username, cipher.encrypt(password.encode()), created_at, password_fingerprint(reuse_key, password), owner)
+        for site, username, password, created_at in batch
+    ]
+
+
+# per worker process: the cipher is built once from the VMK, ciphers themselves don't pickle
+_worker = {}
+
+
+def _init_worker(vmk: bytes, reuse_key: Optional[bytes], owner: str):
+    from passwordmanager.core.record_cipher import RecordCipher
+
+    _worker.update(cipher=RecordCipher(vmk), reuse_key=reuse_key, owner=owner)
+
+
+def _encrypt_in_worker(batch) -> List[tuple]:
+    return _encrypt_batch(_worker["cipher"], _worker["reuse_key"], _worker["owner"], batch)
+
+
+def _encrypted_batches(owner, cipher, reuse_key, credentials, batch_size, workers, vmk) -> Iterator[List[tuple]]:
+    batches = iter(lambda: list(itertools.islice(credentials, batch_size)), [])
+    if workers <= 1:
+        for batch in batches:
+            yield _encrypt_batch(cipher, reuse_key, owner, batch)
+        return
+    if vmk is None:
+        raise ValueError("encrypting in worker processes needs the vmk")
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(vmk, reuse_key, owner)) as pool:
+        # a couple of batches per worker in flight, in order, so a million rows never sit in memory at once
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(_encrypt_in_worker, (batch,)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def bulk_insert(
+    pm,
+    owner: str,
+    cipher,
+    reuse_key: Optional[bytes],
+    credentials,
+    batch_size: int = INSERT_BATCH_SIZE,
+    workers: int = 1,
+    vmk: Optional[bytes] = None,
+) -> int:
+    """
+    Encrypt and insert (site, username, password, created_at) tuples for owner through pm.conn
+    (the passwordManager module). Returns the number of rows written. With workers > 1 the batches
+    are encrypted in that many processes, which build their own cipher from vmk; rows keep their order.
+    """
+    credentials = iter(credentials)
+    conn = pm.conn
+    cursor = conn.cursor()
+    conn.commit()
+    cursor.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = 'credentials' AND type IN ('index', 'trigger') AND sql IS NOT NULL"
+    )
+    schema = cursor.fetchall()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'credentials_fts'")
+    has_fts = cursor.fetchone() is not None
+    synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+
+    inserted = 0
+    try:
+        cursor.execute("PRAGMA synchronous = OFF")
+        for kind, name, _ in schema:
+            cursor.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+
+        for batch in _encrypted_batches(owner, cipher, reuse_key, credentials, batch_size, workers, vmk):
+            inserted += _insert_batch(cursor, batch)
+    finally:
+        for _, _, sql in schema:
+            cursor.execute(sql)
+        if has_fts:
+            cursor.execute("INSERT INTO credentials_fts(credentials_fts) VALUES ('rebuild')")
+        conn.commit()
+        cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        cursor.close()
+    return inserted
+
+
+def _insert_batch(cursor, batch) -> int:
+    cursor.executemany(
+        "INSERT INTO credentials (site, username, password, created_at, password_hmac, owner) VALUES (?, ?, ?, ?, ?, ?)",
+        batch,
+    )
+    return len(batch)
+
+
+def create_test_account(pm, username: str, master_password: str, kdf_params: Optional[Dict] = None) -> bytes:
+    """Creates the account the way /account/create does and returns its VMK."""
+    from passwordmanager.core.kdf import default_kdf_params, derive_wrap_key
+    from passwordmanager.core.vmk import generate_vmk, wrap_vmk
+
+    pm.c.execute("SELECT 1 FROM user_metadata WHERE username = ?", (username,))
+    if pm.c.fetchone():
+        raise ValueError(f"account {username!r} already exists")
+    salt = os.urandom(16)
+    kdf_params = kdf_params or default_kdf_params()
+    vmk = generate_vmk()
+    pm.c.execute(
+        """
+        INSERT INTO user_metadata (username, wrapped_vmk, salt, kdf, kdf_params, owner_claimed)
+        VALUES (?, ?, ?, ?, ?, 1)
+        """,
+        (username, wrap_vmk(derive_wrap_key(master_password, salt, kdf_params), vmk), salt, "argon2id", json.dumps(kdf_params)),
+    )
+    pm.conn.commit()
+    return vmk
+
+
+def generate_vault(
+    pm,
+    rows: int,
+    username: str = TEST_USERNAME,
+    master_password: str = TEST_MASTER_PASSWORD,
+    seed: Optional[int] = None,
+    kdf_params: Optional[Dict] = None,
+    workers: int = 1,
+) -> Dict:
+    from passwordmanager.core.record_cipher import RecordCipher
+    from passwordmanager.core.reuse_index import derive_reuse_key
+
+    start = time.perf_counter()
+    vmk = create_test_account(pm, username, master_password, kdf_params)
+    credentials = synthetic_credentials(rows, random.Random(seed))
+    inserted = bulk_insert(
+        pm, username, RecordCipher(vmk), derive_reuse_key(vmk), credentials, workers=workers, vmk=vmk
+    )
+    seconds = time.perf_counter() - start
+    return {
+        "path": pm.db_path,
+        "rows": inserted,
+        "username": username,
+        "master_password": master_password,
+        "workers": workers,
+        "seconds": round(seconds, 2),
+        "rows_per_second": round(inserted / seconds) if seconds else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a vault database full of synthetic credentials")
+    parser.add_argument("--output", required=True, help="database file to create")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--username", default=TEST_USERNAME)
+    parser.add_argument("--password", default=TEST_MASTER_PASSWORD, help="master password of the test account")
+    parser.add_argument("--seed", type=int, help="makes the credentials (not the keys) reproducible")
+    parser.add_argument("--fast-kdf", action="store_true", help="cheap Argon2 parameters, for test vaults only")
+    parser.add_argument("--force", action="store_true", help="replace the output file if it exists")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes encrypting rows (default: one per CPU, 1 encrypts in this process)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    if os.path.exists(output):
+        if not args.force:
+            sys.exit(f"{output} exists, pass --force to replace it")
+        os.remove(output)
+
+    # the database is opened when passwordManager is imported
+    os.environ["PASSWORDMANAGER_DB"] = output
+    from passwordmanager.core import passwordManager as pm
+
+    summary = generate_vault(
+        pm,
+        args.rows,
+        username=args.username,
+        master_password=args.password,
+        seed=args.seed,
+        kdf_params=FAST_KDF_PARAMS if args.fast_kdf else None,
+        workers=args.workers,
+    )
+    pm.conn.close()
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -21,7 +21,8 @@ a = Analysis(
     binaries=[],   
     datas=[
     (os.path.join(os.getcwd(), 'resources/images'), 'resources/images'),
-    (os.path.join(os.getcwd(), 'passwordmanager/themes'), 'passwordmanager/themes'),], 
+    (os.path.join(os.getcwd(), 'passwordmanager/themes'), 'passwordmanager/themes'),
+    (os.path.join(os.getcwd(), 'passwordmanager/dictionaries'), 'passwordmanager/dictionaries'),], 
     hiddenimports=[], 
     hookspath=[],
     hooksconfig={},
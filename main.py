@@ -1,25 +1,79 @@
-from passwordmanager.gui.main_window import MainWindow
-from passwordmanager.gui.login_dialogue import LoginDialog
+from passwordmanager.utils.startup_trace import startup_trace
 from PyQt6.QtWidgets import QApplication, QDialog
+from PyQt6.QtCore import QTimer
+from passwordmanager.gui.login_dialogue import LoginDialog
+import os
 import sys
 import threading
-import time
-from passwordmanager.api.routes import app
 
 #####
 # Main entry point for PasswordManager GUI application
+# only what the login window needs is imported up front. the API (Flask, cryptography, argon2 and
+# opening the database) loads on the server thread while the login window comes up, and the main
+# window is imported once the login succeeds. phases go to the startup trace (utils/startup_trace.py)
 #####
 
+API_HOST = "127.0.0.1"
+API_PORT = 5000
+# quits as soon as this startup phase is reached, so a launch can be timed (benchmarks/bench_startup.py)
+STARTUP_EXIT_ENV = "PASSWORDMANAGER_STARTUP_EXIT"
+
+startup_trace.mark("imports_done")
+
+
+def serve_api(ready):
+    try:
+        from passwordmanager.api.routes import app
+        from werkzeug.serving import make_server
+
+        server = make_server(API_HOST, API_PORT, app, threaded=True)
+        startup_trace.mark("server_ready")
+    finally:
+        # the login window waits for this, also when the server couldn't start (it shows the errors)
+        ready.set()
+    server.serve_forever()
+
+
+def when_server_ready(login, ready):
+    """Keep the login buttons off until the API answers, then run the checks the dialog skipped."""
+    if ready.is_set():
+        return
+    login.login_btn.setEnabled(False)
+    login.create_btn.setEnabled(False)
+    timer = QTimer(login)
+    timer.setInterval(20)
+
+    def poll():
+        if ready.is_set():
+            timer.stop()
+            login.login_btn.setEnabled(True)
+            login.create_btn.setEnabled(True)
+            login.check_lockout_status()
+            login.check_quick_unlock()
+
+    timer.timeout.connect(poll)
+    timer.start()
+
+
 if __name__ == "__main__":
-    server = threading.Thread(target=app.run, daemon=True, kwargs={'port': 5000})
+    server_ready = threading.Event()
+    server = threading.Thread(target=serve_api, args=(server_ready,), daemon=True)
     server.start()
 
-    time.sleep(1)
+    exit_phase = os.environ.get(STARTUP_EXIT_ENV)
+    if exit_phase:
+        startup_trace.listeners.append(lambda phase: phase == exit_phase and QApplication.exit(0))
 
     qt_app = QApplication(sys.argv)
+    startup_trace.mark("qapplication_created")
     login = LoginDialog()
+    when_server_ready(login, server_ready)
+    # runs once the dialog is up and its event loop has started
+    QTimer.singleShot(0, lambda: startup_trace.mark("login_window_shown"))
     result = login.exec()
     if result == QDialog.DialogCode.Accepted:
+        startup_trace.mark("logged_in")
+        from passwordmanager.gui.main_window import MainWindow
         MainWindow.run()
     else:
         sys.exit(0)
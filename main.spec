@@ -15,6 +15,7 @@ a = Analysis(
     datas=[
         ('resources/images', 'resources/images'),
         ('passwordmanager/themes', 'passwordmanager/themes'),
+        ('passwordmanager/dictionaries', 'passwordmanager/dictionaries'),
     ] + argon2_datas + cffi_datas + pyqt6_datas + cryptography_datas + flask_datas,
     hiddenimports=[
         'argon2',
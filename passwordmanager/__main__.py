@@ -0,0 +1,6 @@
+import sys
+
+from passwordmanager.cli import main
+
+# python -m passwordmanager: the headless command line (passwordmanager/cli.py); main.py starts the GUI
+sys.exit(main())
@@ -1,9 +1,16 @@
-import requests
-
 #####
 # methods to call the passwordManager API
 #####
 
+class _LazyRequests:
+    """Stands in for the requests module and imports it on first use (~80 ms the login window doesn't wait for)."""
+
+    def __getattr__(self, name):
+        import requests as module
+        return getattr(module, name)
+
+requests = _LazyRequests()
+
 BASE_URL = "http://127.0.0.1:5000"
 
 # Export
@@ -39,9 +46,32 @@ def get_all_credentials():
     response = requests.get(f"{BASE_URL}/list")
     return response.json()
 
+# full-text search over site/username, returns one page of metadata
+def search_credentials(query, limit=20, offset=0):
+    response = requests.get(f"{BASE_URL}/search", params={"q": query, "limit": limit, "offset": offset})
+    return response.json()
+
+# ranked fuzzy search over site/username, returns metadata only
+def fuzzy_search_credentials(query, limit=20):
+    response = requests.get(f"{BASE_URL}/search/fuzzy", params={"q": query, "limit": limit})
+    return response.json()
+
+# vault health report (weak, reused and old credentials)
+def get_vault_health(max_age_days=None):
+    params = {"max_age_days": max_age_days} if max_age_days else None
+    response = requests.get(f"{BASE_URL}/health", params=params)
+    return response.json()
+
+# groups of credentials sharing a password (from the keyed hash index)
+def get_reused_passwords():
+    response = requests.get(f"{BASE_URL}/health/reused")
+    return response.json()
+
 #calls GET generate-password
-def get_new_generated_password():
-    response = requests.get(f"{BASE_URL}/get/generated-password")
+# options are passed through as query parameters, e.g. length=24, symbols=False, mode="passphrase", count=100
+def get_new_generated_password(**options):
+    params = {key: str(value).lower() if isinstance(value, bool) else value for key, value in options.items()}
+    response = requests.get(f"{BASE_URL}/get/generated-password", params=params or None)
     return response.json()
 
 #calls DELETE
@@ -84,6 +114,40 @@ def set_master_password(new_password, old_password):
     })
     return response
 
+# re-encrypts the vault under a new VMK; background=False waits for it to finish
+def rotate_vmk(master_password, background=True):
+    response = requests.post(f"{BASE_URL}/account/rotate-vmk", json={
+        "master_password": master_password,
+        "background": background
+    })
+    return response.json()
+
+def get_vmk_rotation_status():
+    response = requests.get(f"{BASE_URL}/account/rotate-vmk")
+    return response.json()
+
+# converts any credentials still stored as Fernet tokens to the compact record format
+def migrate_records():
+    response = requests.post(f"{BASE_URL}/records/migrate")
+    return response.json()
+
+# short PIN for re-opening the vault after an (auto-)lock, without the master password
+def setup_quick_unlock(pin):
+    response = requests.post(f"{BASE_URL}/account/quick-unlock/setup", json={"pin": pin})
+    return response.json()
+
+def quick_unlock(pin):
+    response = requests.post(f"{BASE_URL}/account/quick-unlock", json={"pin": pin})
+    return response.json()
+
+def quick_unlock_status():
+    response = requests.get(f"{BASE_URL}/account/quick-unlock")
+    return response.json()
+
+def disable_quick_unlock():
+    response = requests.delete(f"{BASE_URL}/account/quick-unlock")
+    return response.json()
+
 def get_status():
     response = requests.get(f"{BASE_URL}/status")
     return response.json()
@@ -0,0 +1,242 @@
+import bisect
+import functools
+import ipaddress
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+#####
+# request metrics for the embedded API, in Prometheus text format
+# per route: a latency histogram, counts by status code, and how much of the time went to the
+# database versus crypto (KDF, encrypt, decrypt), plus the number of requests in flight. the
+# hooks only read a clock and bump counters under one lock. with PASSWORDMANAGER_METRICS=0 nothing
+# is installed at all: no hooks, no wrapped cursor or ciphers, and /metrics answers 404.
+# phases are timed by wrapping the callables the routes use (the cursor, the cipher classes, the
+# KDF functions). a phase called from inside another one (MultiRecordCipher -> RecordCipher) is
+# counted once, and calls outside a request (background rotation) are not counted.
+#####
+
+METRICS_ENV = "PASSWORDMANAGER_METRICS"
+# seconds; Prometheus' usual web latency buckets, with the KDF's ~1/4 second in between
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("db", "kdf", "encrypt", "decrypt")
+UNMATCHED_ROUTE = "unmatched"
+
+
+def metrics_enabled() -> bool:
+    return os.environ.get(METRICS_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def is_loopback(address) -> bool:
+    try:
+        return ipaddress.ip_address(address or "").is_loopback
+    except ValueError:
+        return False
+
+
+class RequestMetrics:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.in_flight = 0
+        # (route, method) -> [bucket counts..., +Inf count] and [count, seconds]
+        self._histograms: Dict[Tuple[str, str], List[int]] = {}
+        self._totals: Dict[Tuple[str, str], List[float]] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        # (route, phase) -> [calls, seconds]
+        self._phases: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # request lifecycle ##################################################################
+    def start_request(self):
+        self._local.start = time.perf_counter()
+        self._local.phases = {}
+        self._local.busy = False
+        with self._lock:
+            self.in_flight += 1
+
+    def finish_request(self, route: str, method: str, status: int):
+        phases = getattr(self._local, "phases", None)
+        if phases is None:
+            return
+        elapsed = time.perf_counter() - self._local.start
+        self._local.phases = None
+        index = bisect.bisect_left(self.buckets, elapsed)
+        with self._lock:
+            self.in_flight -= 1
+            key = (route, method)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1)
+                self._totals[key] = [0, 0.0]
+            histogram[index] += 1
+            totals = self._totals[key]
+            totals[0] += 1
+            totals[1] += elapsed
+            status_key = (route, method, status)
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+            for phase, (calls, seconds) in phases.items():
+                entry = self._phases.setdefault((route, phase), [0, 0.0])
+                entry[0] += calls
+                entry[1] += seconds
+
+    def install(self, app):
+        """Register the hooks on a Flask app. Call before any other before_request hook is added."""
+        from flask import request
+
+        @app.before_request
+        def _start_metrics():
+            self.start_request()
+
+        @app.after_request
+        def _finish_metrics(response):
+            rule = request.url_rule
+            self.finish_request(rule.rule if rule is not None else UNMATCHED_ROUTE, request.method, response.status_code)
+            return response
+
+        @app.teardown_request
+        def _abandon_metrics(_error):
+            # after_request didn't run (its own failure), still count the request as done
+            if getattr(self._local, "phases", None) is not None:
+                self.finish_request(request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE, request.method, 500)
+
+    # phase timing #######################################################################
+    def timed(self, phase: str, func):
+        """Wrap func so the time spent in it counts towards phase for the current request."""
+        local = self._local
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            phases = getattr(local, "phases", None)
+            if phases is None or local.busy:
+                return func(*args, **kwargs)
+            local.busy = True
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                local.busy = False
+                entry = phases.get(phase)
+                if entry is None:
+                    phases[phase] = (1, elapsed)
+                else:
+                    phases[phase] = (entry[0] + 1, entry[1] + elapsed)
+
+        return wrapper
+
+    def timed_cipher_class(self, cls):
+        """Subclass of a cipher class whose encrypt/decrypt count as crypto time."""
+        return type(cls.__name__, (cls,), {
+            "encrypt": self.timed("encrypt", cls.encrypt),
+            "decrypt": self.timed("decrypt", cls.decrypt),
+            "__module__": cls.__module__,
+        })
+
+    def timed_connection(self, connection):
+        return TimedConnection(connection, self)
+
+    # exposition #########################################################################
+    def render(self) -> str:
+        with self._lock:
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+            totals = {key: list(value) for key, value in self._totals.items()}
+            statuses = dict(self._statuses)
+            phases = {key: list(value) for key, value in self._phases.items()}
+            in_flight = self.in_flight
+
+        lines = [
+            "# HELP passwordmanager_http_requests_total Requests handled, by route, method and status.",
+            "# TYPE passwordmanager_http_requests_total counter",
+        ]
+        for (route, method, status), count in sorted(statuses.items()):
+            lines.append(f"passwordmanager_http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+
+        lines += [
+            "# HELP passwordmanager_http_request_duration_seconds Request latency, by route and method.",
+            "# TYPE passwordmanager_http_request_duration_seconds histogram",
+        ]
+        for (route, method), histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (None,), histogram):
+                cumulative += count
+                le = "+Inf" if bound is None else repr(bound)
+                lines.append(
+                    f"passwordmanager_http_request_duration_seconds_bucket{_labels(route=route, method=method, le=le)} {cumulative}"
+                )
+            count, seconds = totals[(route, method)]
+            labels = _labels(route=route, method=method)
+            lines.append(f"passwordmanager_http_request_duration_seconds_sum{labels} {seconds:.6f}")
+            lines.append(f"passwordmanager_http_request_duration_seconds_count{labels} {count}")
+
+        lines += [
+            "# HELP passwordmanager_request_phase_seconds_total Time spent in the database and in crypto, by route.",
+            "# TYPE passwordmanager_request_phase_seconds_total counter",
+        ]
+        for (route, phase), (_, seconds) in sorted(phases.items()):
+            lines.append(f"passwordmanager_request_phase_seconds_total{_labels(route=route, phase=phase)} {seconds:.6f}")
+        lines += [
+            "# HELP passwordmanager_request_phase_calls_total Database and crypto calls, by route.",
+            "# TYPE passwordmanager_request_phase_calls_total counter",
+        ]
+        for (route, phase), (calls, _) in sorted(phases.items()):
+            lines.append(f"passwordmanager_request_phase_calls_total{_labels(route=route, phase=phase)} {calls}")
+
+        lines += [
+            "# HELP passwordmanager_http_requests_in_flight Requests being handled right now.",
+            "# TYPE passwordmanager_http_requests_in_flight gauge",
+            f"passwordmanager_http_requests_in_flight {in_flight}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class TimedConnection:
+    """sqlite3 connection stand-in whose commits and cursors count as database time."""
+
+    def __init__(self, connection, metrics: RequestMetrics):
+        self._connection = connection
+        self._metrics = metrics
+        self.commit = metrics.timed("db", connection.commit)
+        self.rollback = metrics.timed("db", connection.rollback)
+
+    def cursor(self, *args):
+        return TimedCursor(self._connection.cursor(*args), self._metrics, self)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class TimedCursor:
+    """sqlite3 cursor stand-in; execute and fetch calls count as database time."""
+
+    def __init__(self, cursor, metrics: RequestMetrics, connection: TimedConnection = None):
+        self._cursor = cursor
+        self.connection = connection or TimedConnection(cursor.connection, metrics)
+        self._execute = metrics.timed("db", cursor.execute)
+        self._executemany = metrics.timed("db", cursor.executemany)
+        self.fetchone = metrics.timed("db", cursor.fetchone)
+        self.fetchmany = metrics.timed("db", cursor.fetchmany)
+        self.fetchall = metrics.timed("db", cursor.fetchall)
+
+    def execute(self, *args):
+        self._execute(*args)
+        return self
+
+    def executemany(self, *args):
+        self._executemany(*args)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _labels(**labels) -> str:
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
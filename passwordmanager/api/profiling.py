@@ -0,0 +1,156 @@
+import cProfile
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+#####
+# on-demand cProfile captures of API requests, for "it's slow on my machine" reports
+# off unless PASSWORDMANAGER_PROFILE is set ("all", or comma separated routes like /list,/export)
+# or POST /debug/profiling with a JSON body {"enabled": true} turns it on; both work on a packaged
+# build since they need no code change.
+# each selected request runs under its own profiler and is saved as <route>-<timestamp>-<ms>ms.prof
+# (open with python -m pstats or snakeviz). only the N slowest are kept: a faster request isn't
+# written once the directory is full, and the fastest file is deleted when a slower one comes in.
+# profiles hold function names and timings, never arguments or return values.
+#####
+
+PROFILE_ENV = "PASSWORDMANAGER_PROFILE"
+PROFILE_DIR_ENV = "PASSWORDMANAGER_PROFILE_DIR"
+PROFILE_KEEP_ENV = "PASSWORDMANAGER_PROFILE_KEEP"
+DEFAULT_KEEP = 10
+PROFILE_SUFFIX = ".prof"
+_PROFILE_NAME = re.compile(r"^(?P<route>.+)-(?P<stamp>\d{8}T\d{6}\d{6})-(?P<ms>\d+)ms\.prof$")
+
+
+def _route_slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+def parse_routes(value: Optional[str]) -> Optional[frozenset]:
+    """None means every route."""
+    if value is None or value.strip().lower() in ("1", "all", "true", "*"):
+        return None
+    return frozenset(route.strip() for route in value.split(",") if route.strip())
+
+
+def parse_keep(value: Optional[str]) -> int:
+    """A typo in this debug-only setting falls back to the default rather than stopping the app."""
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return DEFAULT_KEEP
+
+
+class RequestProfiler:
+    def __init__(self, directory: str, keep: int = DEFAULT_KEEP):
+        self.directory = directory
+        self.keep = max(1, keep)
+        self.enabled = False
+        self.routes: Optional[frozenset] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # (ms, path) of the profiles on disk, scanned lazily so a restart keeps the old ones in the count
+        self._saved: Optional[List] = None
+
+    @classmethod
+    def from_environment(cls, default_directory: str) -> "RequestProfiler":
+        profiler = cls(
+            os.environ.get(PROFILE_DIR_ENV) or default_directory,
+            parse_keep(os.environ.get(PROFILE_KEEP_ENV)),
+        )
+        if os.environ.get(PROFILE_ENV):
+            profiler.configure(True, parse_routes(os.environ[PROFILE_ENV]))
+        return profiler
+
+    def configure(self, enabled: bool, routes: Optional[Iterable[str]] = None, keep: Optional[int] = None):
+        with self._lock:
+            self.routes = frozenset(routes) if routes is not None else None
+            if keep is not None:
+                self.keep = max(1, int(keep))
+            self.enabled = bool(enabled)
+
+    def wants(self, route: Optional[str]) -> bool:
+        return self.enabled and route is not None and (self.routes is None or route in self.routes)
+
+    # request lifecycle ##################################################################
+    def start(self, route: str):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # another profiler is active (3.12+ allows one per process), skip this request
+            return
+        self._local.profile = profile
+        self._local.route = route
+        self._local.start = time.perf_counter()
+
+    def finish(self) -> Optional[str]:
+        """Stop this thread's profile and save it if it is among the slowest. Returns the saved path."""
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            return None
+        profile.disable()
+        elapsed_ms = int((time.perf_counter() - self._local.start) * 1000)
+        self._local.profile = None
+
+        with self._lock:
+            saved = self._saved_profiles()
+            if len(saved) >= self.keep and elapsed_ms <= saved[0][0]:
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+            path = os.path.join(self.directory, f"{_route_slug(self._local.route)}-{stamp}-{elapsed_ms}ms{PROFILE_SUFFIX}")
+            profile.dump_stats(path)
+            saved.append((elapsed_ms, path))
+            saved.sort()
+            while len(saved) > self.keep:
+                _, fastest = saved.pop(0)
+                try:
+                    os.remove(fastest)
+                except OSError:
+                    pass
+        return path
+
+    def install(self, app):
+        from flask import request
+
+        @app.before_request
+        def _start_profile():
+            if self.enabled:
+                rule = request.url_rule
+                route = rule.rule if rule is not None else None
+                if self.wants(route):
+                    self.start(route)
+
+        @app.teardown_request
+        def _finish_profile(_error):
+            if getattr(self._local, "profile", None) is not None:
+                self.finish()
+
+    # inspection #########################################################################
+    def status(self) -> Dict:
+        with self._lock:
+            saved = list(self._saved_profiles())
+        return {
+            "enabled": self.enabled,
+            "routes": sorted(self.routes) if self.routes is not None else "all",
+            "keep": self.keep,
+            "directory": self.directory,
+            "profiles": [
+                {"file": os.path.basename(path), "ms": ms} for ms, path in sorted(saved, reverse=True)
+            ],
+        }
+
+    def _saved_profiles(self) -> List:
+        if self._saved is None:
+            self._saved = []
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    match = _PROFILE_NAME.match(name)
+                    if match:
+                        self._saved.append((int(match.group("ms")), os.path.join(self.directory, name)))
+            self._saved.sort()
+        return self._saved
@@ -1,13 +1,13 @@
 import json
-from flask import Flask, request, jsonify
-from cryptography.fernet import Fernet
-import secrets
+from flask import Flask, Response, request, jsonify, g
 import os
 import datetime
 import time
+import sqlite3
+import threading
 
-from passwordmanager.core.passwordManager import conn, c
-from passwordmanager.core.kdf import default_kdf_params, derive_wrap_key
+from passwordmanager.core.passwordManager import conn, c, db_path, get_vault_revision, get_base_path, FTS_AVAILABLE
+from passwordmanager.core.kdf import default_kdf_params, derive_wrap_key, derive_wrap_keys
 from passwordmanager.core.vmk import generate_vmk, unwrap_vmk, wrap_vmk
 from passwordmanager.core.export_service import (
     fetch_decryptable_credentials,
@@ -17,52 +17,180 @@ from passwordmanager.core.export_service import (
 from passwordmanager.core.import_service import (
     parse_csv,
     import_items,
+    drop_existing,
 )
+from passwordmanager.core.health_service import build_health_report, DEFAULT_MAX_AGE_DAYS
+from passwordmanager.core.reuse_index import (
+    derive_reuse_key,
+    password_fingerprint,
+    backfill_fingerprints,
+    find_reused,
+)
+from passwordmanager.core.rotation_service import (
+    get_rotation,
+    start_rotation,
+    rotate_batch,
+    finish_rotation,
+    rotation_progress,
+)
+from passwordmanager.core.quick_unlock import QuickUnlock, validate_pin
+from passwordmanager.core.search_service import search_terms, search_metadata
+from passwordmanager.core.login_lockout import lockout_remaining, record_failed_attempt, reset_lockout
+from passwordmanager.core.ownership import claim_unowned_rows
+from passwordmanager.core.record_cipher import RecordCipher, MultiRecordCipher, migrate_records
+from passwordmanager.core.vault_session import SESSION_HEADER, SessionStore
+from passwordmanager.api.metrics import RequestMetrics, TimedCursor, is_loopback, metrics_enabled
+from passwordmanager.api.profiling import RequestProfiler, parse_routes
+from passwordmanager.utils.search_engine import SearchEngine
+from passwordmanager.utils.breach_checker import get_breach_checker
+from passwordmanager.utils.password_generator import (
+    DEFAULT_LENGTH,
+    DEFAULT_SEPARATOR,
+    DEFAULT_WORDS,
+    MAX_COUNT,
+    MAX_LENGTH,
+    MAX_WORDS,
+    build_alphabet,
+    generate_passphrases,
+    generate_passwords,
+    passphrase_entropy_bits,
+    password_entropy_bits,
+)
+from passwordmanager.utils.wordlist import get_wordlist
 
 # Flask API
 app = Flask(__name__)
 app.debug = False
-# Global variables for the vault and current user
-vault_locked = True
-current_user = None
-current_vmk = None
-current_vmk_cipher = None
+
+# per-route latency, status codes and database/crypto time for GET /metrics. the hooks go in before
+# track_activity so rejected requests are counted too; PASSWORDMANAGER_METRICS=0 leaves all of it out
+metrics = RequestMetrics() if metrics_enabled() else None
+if metrics is not None:
+    metrics.install(app)
+    conn = metrics.timed_connection(conn)
+    c = TimedCursor(c, metrics, conn)
+    RecordCipher = metrics.timed_cipher_class(RecordCipher)
+    MultiRecordCipher = metrics.timed_cipher_class(MultiRecordCipher)
+    derive_wrap_key = metrics.timed("kdf", derive_wrap_key)
+    derive_wrap_keys = metrics.timed("kdf", derive_wrap_keys)
+    wrap_vmk = metrics.timed("encrypt", wrap_vmk)
+    unwrap_vmk = metrics.timed("decrypt", unwrap_vmk)
+
+# cProfile captures of slow requests, off until PASSWORDMANAGER_PROFILE or POST /debug/profiling
+# turns them on; the N slowest are kept in ./profiles next to the database or executable
+profiler = RequestProfiler.from_environment(os.path.join(get_base_path(), "profiles"))
+profiler.install(app)
+
+# vault state (lock flag, user, VMK, cipher, reuse key, secret cache) lives in one session per client,
+# requests without a session token use sessions.default
+sessions = SessionStore()
+
+# metadata-only search engine over one account's rows, rebuilt when the vault revision or the account changes
+search_engine_cache = {"key": None, "engine": None}
+# the health report decrypts the whole vault, so it is only recomputed when its inputs change
+health_report_cache = {"key": None, "report": None}
+# background VMK rotation; "stop" is set when the vault locks, the rotation resumes on the next request
+rotation_worker = {"thread": None, "stop": None, "error": None}
+
+# idle auto-lock: after idle_seconds without a request a session locks and its keys are dropped.
+# 0 turns it off. requests that only look at the lock state don't count as activity
+AUTO_LOCK_ENV = "PASSWORDMANAGER_AUTO_LOCK_SECONDS"
+auto_lock = {"idle_seconds": int(os.environ.get(AUTO_LOCK_ENV) or 15 * 60), "watchdog": None}
+PASSIVE_ENDPOINTS = {"vault_status", "quick_unlock_status", "account_lockout_status", "prometheus_metrics",
+                     "profiling_status"}
+# PIN-wrapped VMK for re-opening the vault after a lock, in memory only
+quick_unlock = QuickUnlock()
 
 import passwordmanager.core.secure_cleanup
 
 # POST methods ###########################################################################
+def _session():
+    # resolved from the X-Vault-Session header in track_activity
+    return g.vault_session
+
+def _lock_session(session, allow_quick_unlock):
+    username = session.close()
+    # the PIN belongs to the session that enrolled it: that session locking arms it, logging out forgets it
+    if quick_unlock.belongs_to(session):
+        if not allow_quick_unlock:
+            quick_unlock.clear()
+        elif username is not None and username == quick_unlock.username:
+            quick_unlock.arm()
+    health_report_cache["key"] = None
+    health_report_cache["report"] = None
+    # the rotation resumes on the user's next rotate-vmk call, stop it once nobody holds its keys
+    if rotation_worker["stop"] is not None and username is not None and not sessions.for_user(username):
+        rotation_worker["stop"].set()
+
+def _lock_if_idle(session, now):
+    idle_seconds = auto_lock["idle_seconds"]
+    if idle_seconds and session.cipher is not None and now - session.last_activity >= idle_seconds:
+        _lock_session(session, allow_quick_unlock=True)
+
+def _idle_watchdog():
+    # locks idle sessions even when nothing is calling the API
+    while True:
+        time.sleep(max(1, min(auto_lock["idle_seconds"] or 30, 30)))
+        now = time.time()
+        for session in sessions.all():
+            _lock_if_idle(session, now)
+            session.cache.purge_expired(now)
+
+@app.before_request
+def track_activity():
+    if auto_lock["watchdog"] is None:
+        auto_lock["watchdog"] = threading.Thread(target=_idle_watchdog, daemon=True)
+        auto_lock["watchdog"].start()
+    session = sessions.get(request.headers.get(SESSION_HEADER))
+    if session is None:
+        return jsonify({"error": "Unknown session"}), 401
+    g.vault_session = session
+    now = time.time()
+    _lock_if_idle(session, now)
+    if request.endpoint not in PASSIVE_ENDPOINTS:
+        session.touch(now)
+
+# starts a session of its own for a client that shouldn't share the default one;
+# send the token back in the X-Vault-Session header, log out to end it
+@app.route("/session", methods=["POST"])
+def create_session():
+    # sessions idle past the auto-lock drop their keys first, which lets the store reuse their slots
+    now = time.time()
+    for existing in sessions.all():
+        _lock_if_idle(existing, now)
+    session = sessions.create()
+    if session is None:
+        return jsonify({"error": "too many sessions"}), 429
+    return jsonify({"session": session.token, "header": SESSION_HEADER}), 201
+
 @app.route("/lock", methods=["POST"])
 def lock_vault():
-    """Lock the vault (no add/get/delete allowed until unlocked)."""
-    global vault_locked, current_user, current_vmk_cipher
-    vault_locked = True
-    current_user = None
-    current_vmk_cipher = None
+    """Lock the vault (no add/get/delete allowed until unlocked). A quick-unlock PIN stays usable."""
+    _lock_session(_session(), allow_quick_unlock=True)
     return jsonify({"status": "vault locked"})
 
 @app.route("/unlock", methods=["POST"])
 def unlock_vault():
     """Unlock the vault."""
-    global vault_locked
-    vault_locked = False
+    _session().unlock()
     return jsonify({"status": "vault unlocked"})
 
 @app.route("/add", methods=["POST"])
 def add_credential():
-    global vault_locked, current_vmk_cipher
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
-    if current_vmk_cipher is None:
+    if state.cipher is None:
         return jsonify({"error": "Not logged in"}), 401
 
     data = request.json
 
     now = datetime.datetime.utcnow()
 
-    encrypted_password = current_vmk_cipher.encrypt(data["password"].encode())
+    encrypted_password = state.cipher.encrypt(data["password"].encode())
     c.execute(
-        "INSERT INTO credentials (site, username, password, created_at) VALUES (?, ?, ?, ?)", 
-        (data["site"], data["username"], encrypted_password, now)       
+        "INSERT INTO credentials (site, username, password, created_at, password_hmac, owner) VALUES (?, ?, ?, ?, ?, ?)", 
+        (data["site"], data["username"], encrypted_password, now, password_fingerprint(state.reuse_key, data["password"]), state.username)
     )
     new_user_id = c.lastrowid
 
@@ -77,21 +205,62 @@ def add_credential():
 @app.route("/status", methods=["GET"])
 def vault_status():
     """Check current vault state."""
-    return jsonify({"vault_locked": vault_locked})
+    return jsonify({"vault_locked": _session().locked})
+
+# request metrics in Prometheus text format, for the local machine only
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    if metrics is None or not is_loopback(request.remote_addr):
+        return jsonify({"error": "Not found"}), 404
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+# profiling state and the saved profiles, slowest first (local machine only)
+@app.route("/debug/profiling", methods=["GET"])
+def profiling_status():
+    if not is_loopback(request.remote_addr):
+        return jsonify({"error": "Not found"}), 404
+    return jsonify(profiler.status())
+
+# turn request profiling on or off: {"enabled": true, "routes": ["/list"] or "all", "keep": 10}, "enabled" is required
+@app.route("/debug/profiling", methods=["POST"])
+def configure_profiling():
+    if not is_loopback(request.remote_addr):
+        return jsonify({"error": "Not found"}), 404
+    # a JSON content type can't be sent cross-origin without a preflight, so a web page the user
+    # visits can't switch profiling on with a plain form or text POST; and nothing is implied
+    if not request.is_json:
+        return jsonify({"error": "expected a JSON body"}), 415
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("enabled"), bool):
+        return jsonify({"error": "enabled must be true or false"}), 400
+    routes = data.get("routes", "all")
+    if isinstance(routes, str):
+        routes = parse_routes(routes)
+    elif not isinstance(routes, list) or not all(isinstance(route, str) for route in routes):
+        return jsonify({"error": "routes must be a list of route rules or \"all\""}), 400
+    keep = data.get("keep")
+    # bool is an int subclass, so "keep": true would otherwise pass as 1
+    if keep is not None and (not isinstance(keep, int) or isinstance(keep, bool) or keep < 1):
+        return jsonify({"error": "keep must be a positive integer"}), 400
+    profiler.configure(data["enabled"], routes, keep)
+    return jsonify(profiler.status())
 
 @app.route("/get/<int:cred_id>", methods=["GET"])
 def get_credential(cred_id):
-    global vault_locked, current_vmk_cipher
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
-    if current_vmk_cipher is None:
+    if state.cipher is None:
         return jsonify({"error": "Not logged in"}), 401
 
-    c.execute("SELECT site, username, password, created_at FROM credentials WHERE id = ?", (cred_id,))
+    c.execute(
+        "SELECT site, username, password, created_at FROM credentials WHERE id = ? AND owner = ?",
+        (cred_id, state.username),
+    )
     row = c.fetchone()
     if row:
         site, username, encrypted_password, created_at = row
-        password = current_vmk_cipher.decrypt(encrypted_password).decode()
+        password = _decrypt_password(state, cred_id, encrypted_password)
 
         # Format created_at to MM-DD-YYYY
         created_at_str = None
@@ -108,24 +277,200 @@ def get_credential(cred_id):
         }), 200
     return jsonify({"error": "not found"}), 404
 
+def _decrypt_password(state, cred_id, token):
+    # the stored token is the row's revision: any write replaces it, so a hit is never stale
+    password = state.cache.get(cred_id, token)
+    if password is None:
+        password = state.cipher.decrypt(token)
+        state.cache.put(cred_id, token, password)
+    return password.decode()
+
+# Full-text search over site/username, served straight from the FTS5 index (metadata only)
+@app.route("/search", methods=["GET"])
+def search_credentials():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    query = request.args.get("q") or ""
+    try:
+        limit = int(request.args.get("limit") or 20)
+        offset = int(request.args.get("offset") or 0)
+    except ValueError:
+        return jsonify({"error": "invalid limit or offset"}), 400
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+
+    terms = search_terms(query)
+    if not terms:
+        return jsonify({"query": query, "results": [], "total": 0, "limit": limit, "offset": offset})
+
+    total, rows = search_metadata(c, terms, state.username, FTS_AVAILABLE, limit, offset)
+    results = [
+        {"id": cred_id, "site": site, "username": username, "created_at": _format_created_at(created_at)}
+        for cred_id, site, username, created_at in rows
+    ]
+    return jsonify({"query": query, "results": results, "total": total, "limit": limit, "offset": offset})
+
+# Ranked fuzzy search over site/username (metadata only, nothing is decrypted)
+@app.route("/search/fuzzy", methods=["GET"])
+def fuzzy_search_credentials():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    query = request.args.get("q") or ""
+    try:
+        limit = int(request.args.get("limit") or 20)
+    except ValueError:
+        return jsonify({"error": "invalid limit"}), 400
+    limit = max(1, min(limit, 100))
+
+    engine = _get_search_engine(state.username)
+    results = []
+    for pos, score, tier in engine.rank(query, limit):
+        row = engine.credentials[pos]
+        results.append({
+            "id": row["id"],
+            "site": row["site"],
+            "username": row["username"],
+            "created_at": _format_created_at(row["created_at"]),
+            "score": score,
+            "match": tier,
+        })
+    return jsonify({"query": query, "results": results})
+
+def _get_search_engine(owner):
+    key = (get_vault_revision(), owner)
+    if search_engine_cache["engine"] is None or search_engine_cache["key"] != key:
+        c.execute("SELECT id, site, username, created_at FROM credentials WHERE owner = ?", (owner,))
+        rows = [
+            {"id": cred_id, "site": site or "", "username": username or "", "created_at": created_at}
+            for cred_id, site, username, created_at in c.fetchall()
+        ]
+        search_engine_cache["engine"] = SearchEngine(rows)
+        search_engine_cache["key"] = key
+    return search_engine_cache["engine"]
+
+def _format_created_at(created_at):
+    # Format created_at to MM-DD-YYYY
+    if isinstance(created_at, datetime.datetime):
+        return created_at.strftime("%m-%d-%Y")
+    return None
+
+# Vault health report: weak, reused and old credentials (no passwords in the response)
+@app.route("/health", methods=["GET"])
+def vault_health():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    try:
+        max_age_days = int(request.args.get("max_age_days") or DEFAULT_MAX_AGE_DAYS)
+    except ValueError:
+        return jsonify({"error": "invalid max_age_days"}), 400
+    max_age_days = max(1, max_age_days)
+
+    # "old" depends on today's date, so the day is part of the key too
+    key = (get_vault_revision(), state.username, max_age_days, datetime.date.today())
+    if health_report_cache["key"] != key:
+        health_report_cache["report"] = build_health_report(
+            c, state.cipher, max_age_days=max_age_days, breach_checker=get_breach_checker(), owner=state.username
+        )
+        health_report_cache["key"] = key
+    return jsonify(health_report_cache["report"])
+
+# Reused passwords, answered from the keyed hash index without decrypting anything
+@app.route("/health/reused", methods=["GET"])
+def reused_passwords():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None:
+        return jsonify({"error": "Not logged in"}), 401
+
+    # rows from before the index existed get their hash first; once done this is a single indexed lookup
+    backfill = backfill_fingerprints(c, state.cipher, state.reuse_key, owner=state.username)
+    if backfill["updated"]:
+        conn.commit()
+    groups = find_reused(c, owner=state.username)
+    return jsonify({"groups": groups, "reused": sum(group["count"] for group in groups)})
+
+def _arg_flag(name, default):
+    value = request.args.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "y")
+
 # Password generator
+# ?mode=password&length=16&count=1&lowercase=&uppercase=&digits=&symbols=&exclude=&exclude_ambiguous=
+# ?mode=passphrase&words=6&separator=-&capitalize=&count=1
 @app.route("/get/generated-password", methods=["GET"])
-def generate_password(length=16):
-    chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()"
-    password = ''.join(secrets.choice(chars) for _ in range(length))
-    return jsonify({"password": password})
+def generate_password():
+    mode = (request.args.get("mode") or "password").lower()
+    try:
+        count = int(request.args.get("count") or 1)
+        length = int(request.args.get("length") or DEFAULT_LENGTH)
+        words = int(request.args.get("words") or DEFAULT_WORDS)
+    except ValueError:
+        return jsonify({"error": "invalid count, length or words"}), 400
+    if not 1 <= count <= MAX_COUNT:
+        return jsonify({"error": f"count must be between 1 and {MAX_COUNT}"}), 400
+
+    if mode == "passphrase":
+        if not 1 <= words <= MAX_WORDS:
+            return jsonify({"error": f"words must be between 1 and {MAX_WORDS}"}), 400
+        separator = request.args.get("separator", DEFAULT_SEPARATOR)
+        try:
+            wordlist = get_wordlist()
+        except (OSError, ValueError):
+            return jsonify({"error": "Passphrase wordlist unavailable"}), 503
+        passwords = generate_passphrases(count, words, separator, _arg_flag("capitalize", False), wordlist)
+        entropy_bits = passphrase_entropy_bits(words, wordlist)
+    elif mode == "password":
+        if not 1 <= length <= MAX_LENGTH:
+            return jsonify({"error": f"length must be between 1 and {MAX_LENGTH}"}), 400
+        try:
+            alphabet = build_alphabet(
+                lowercase=_arg_flag("lowercase", True),
+                uppercase=_arg_flag("uppercase", True),
+                digits=_arg_flag("digits", True),
+                symbols=_arg_flag("symbols", True),
+                exclude=request.args.get("exclude") or "",
+                exclude_ambiguous=_arg_flag("exclude_ambiguous", False),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        passwords = generate_passwords(count, length, alphabet)
+        entropy_bits = password_entropy_bits(length, alphabet)
+    else:
+        return jsonify({"error": "mode must be 'password' or 'passphrase'"}), 400
+
+    # every password comes from the same uniform distribution, so they all carry the same entropy
+    return jsonify({
+        "password": passwords[0],
+        "passwords": passwords,
+        "count": count,
+        "entropy_bits": round(entropy_bits, 2),
+    })
 
 # Export endpoint
 @app.route("/export", methods=["GET"])
 def export_credentials():
-    global vault_locked, current_vmk_cipher
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
-    if current_vmk_cipher is None:
+    if state.cipher is None:
         return jsonify({"error": "Not logged in"}), 401
 
     fmt = (request.args.get("format") or "json").lower()
-    items = fetch_decryptable_credentials(c, current_vmk_cipher)
+    items = fetch_decryptable_credentials(c, state.cipher, owner=state.username)
 
     if fmt == "csv":
         csv_text = serialize_export_csv(items)
@@ -146,10 +491,10 @@ def export_credentials():
 # Import endpoint (CSV)
 @app.route("/import", methods=["POST"])
 def import_credentials():
-    global vault_locked, current_vmk_cipher
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
-    if current_vmk_cipher is None:
+    if state.cipher is None:
         return jsonify({"error": "Not logged in"}), 401
 
     csv_text = ""
@@ -174,20 +519,11 @@ def import_credentials():
 
     # If not allowing duplicates, pre-filter duplicates and count as skipped
     skipped = 0
-    items_to_insert = []
+    items_to_insert = items
     if not allow_duplicates:
-        for it in items:
-            site = (it.get("site") or "").strip()
-            username = (it.get("username") or "").strip()
-            c.execute("SELECT 1 FROM credentials WHERE site = ? AND username = ?", (site, username))
-            if c.fetchone():
-                skipped += 1
-                continue
-            items_to_insert.append(it)
-    else:
-        items_to_insert = items
+        items_to_insert, skipped = drop_existing(c, items, state.username)
 
-    summary = import_items(c, items_to_insert, current_vmk_cipher)
+    summary = import_items(c, items_to_insert, state.cipher, reuse_key=state.reuse_key, owner=state.username)
     summary["skipped"] = summary.get("skipped", 0) + skipped
     # commit on success/partial success
     conn.commit()
@@ -197,19 +533,19 @@ def import_credentials():
 # List all stored credentials
 @app.route("/list", methods=["GET"])
 def list_credentials():
-    global vault_locked, current_vmk_cipher
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
-    if current_vmk_cipher is None:
+    if state.cipher is None:
         return jsonify({"error": "Not logged in"}), 401
     
-    c.execute("SELECT id, site, username, password, created_at FROM credentials")
+    c.execute("SELECT id, site, username, password, created_at FROM credentials WHERE owner = ?", (state.username,))
     rows = c.fetchall()
 
     credentials_list = []
     for cred_id, site, username, encrypted_password, created_at in rows:
         try:
-            password = current_vmk_cipher.decrypt(encrypted_password).decode()
+            password = _decrypt_password(state, cred_id, encrypted_password)
 
             # normalize created_at to MM-DD-YYYY
             created_at_str = None
@@ -232,31 +568,32 @@ def list_credentials():
 # DELETE methods #############################################################################
 @app.route("/delete/<int:cred_id>", methods=["DELETE"])
 def delete_credential(cred_id):
-    global vault_locked, current_vmk_cipher
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
-    if current_vmk_cipher is None:
+    if state.cipher is None:
         return jsonify({"error": "Not logged in"}), 401
     
-    c.execute("SELECT site, username, password FROM credentials WHERE id = ?", (cred_id,))
+    c.execute("SELECT site, username, password FROM credentials WHERE id = ? AND owner = ?", (cred_id, state.username))
     row = c.fetchone()
     if not row:
         return jsonify({"error": "not found"}), 404
     
     site, username, encrypted_password = row
-    password = current_vmk_cipher.decrypt(encrypted_password).decode()
-    c.execute("DELETE FROM credentials WHERE id = ?", (cred_id,))
+    password = _decrypt_password(state, cred_id, encrypted_password)
+    c.execute("DELETE FROM credentials WHERE id = ? AND owner = ?", (cred_id, state.username))
     conn.commit()
+    state.cache.discard(cred_id)
     return jsonify({"id": cred_id, "site": site, "username": username, "password": password})
 
 # PUT methods #########################################################################
 # Update password for a credential
 @app.route("/update", methods=["PUT"])
 def update_credential():
-    global vault_locked, current_vmk_cipher
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
-    if current_vmk_cipher is None:
+    if state.cipher is None:
         return jsonify({"error": "Not logged in"}), 401
     data = request.json
 
@@ -265,13 +602,14 @@ def update_credential():
         return jsonify({"error": "missing id"}), 400
     username = data["username"]
     site = data["site"]
-    encrypted_password = current_vmk_cipher.encrypt(data["password"].encode())
+    encrypted_password = state.cipher.encrypt(data["password"].encode())
     c.execute(
-        "UPDATE credentials SET site = ?, username = ?, password = ? WHERE id = ?",
-        (site, username, encrypted_password, cred_id)
+        "UPDATE credentials SET site = ?, username = ?, password = ?, password_hmac = ? WHERE id = ? AND owner = ?",
+        (site, username, encrypted_password, password_fingerprint(state.reuse_key, data["password"]), cred_id, state.username)
     )
 
     conn.commit()
+    state.cache.discard(cred_id)
     return jsonify({"status": "updated", "id": cred_id})
 
 # Account methods ######################################################################
@@ -297,8 +635,8 @@ def create_account():
 
     c.execute(
         """
-        INSERT INTO user_metadata (username, wrapped_vmk, salt, kdf, kdf_params)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO user_metadata (username, wrapped_vmk, salt, kdf, kdf_params, owner_claimed)
+        VALUES (?, ?, ?, ?, ?, 1)
         """,
         (
             username,
@@ -320,19 +658,10 @@ def account_login():
     if not username or not master_password:
         return jsonify({"error": "incorrect credentials"}), 401
 
-    current_time = time.time()
-    
-    c.execute(
-        "SELECT failed_attempts, lockout_until_timestamp FROM login_lockout WHERE id = 1"
-    )
-    lockout_row = c.fetchone()
-    
-    if lockout_row:
-        failed_attempts, lockout_until = lockout_row
-        if lockout_until is not None and current_time < lockout_until:
-            remaining_seconds = int(lockout_until - current_time)
-            return jsonify({"error": "login locked", "lockout_seconds": remaining_seconds}), 423
-    
+    remaining_seconds = lockout_remaining(c)
+    if remaining_seconds:
+        return jsonify({"error": "login locked", "lockout_seconds": remaining_seconds}), 423
+
     c.execute(
         "SELECT wrapped_vmk, salt, kdf, kdf_params FROM user_metadata WHERE username = ?",
         (username,),
@@ -352,82 +681,107 @@ def account_login():
         return jsonify({"error": "incorrect credentials"}), 401
 
     _reset_lockout()
-    global vault_locked, current_user, current_vmk, current_vmk_cipher
-    vault_locked = False
-    current_user = username
-    current_vmk = vmk
-    current_vmk_cipher = Fernet(vmk)
+    # an unfinished rotation leaves rows under both keys, read them with both until it completes
+    rotation = get_rotation(c, username)
+    pending_vmk = unwrap_vmk(wrap_key, rotation["new_wrapped_vmk"]) if rotation is not None else None
+    _open_session(_session(), username, vmk, pending_vmk)
     return jsonify({"status": "logged in"})
 
+def _open_session(session, username, vmk, pending_vmk=None):
+    if quick_unlock.belongs_to(session) and quick_unlock.username != username:
+        quick_unlock.clear()
+    if pending_vmk is not None:
+        cipher = MultiRecordCipher([RecordCipher(pending_vmk), RecordCipher(vmk)])
+        reuse_key = derive_reuse_key(pending_vmk)
+    else:
+        cipher = RecordCipher(vmk)
+        reuse_key = derive_reuse_key(vmk)
+    _claim_rows(username, cipher)
+    session.open(username, vmk, cipher, reuse_key)
+
+def _claim_rows(username, cipher):
+    # once per account: take over the rows from before credentials had an owner column
+    c.execute("SELECT owner_claimed FROM user_metadata WHERE username = ?", (username,))
+    row = c.fetchone()
+    if row is None or row[0]:
+        return
+    claim_unowned_rows(c, username, cipher)
+    c.execute("UPDATE user_metadata SET owner_claimed = 1 WHERE username = ?", (username,))
+    conn.commit()
+
 
 @app.route("/account/logout", methods=["POST"])
 def account_logout():
-    return lock_vault()
+    session = _session()
+    _lock_session(session, allow_quick_unlock=False)
+    if session.token is not None:
+        sessions.remove(session)
+    return jsonify({"status": "vault locked"})
+
+# enrolls a short PIN for re-opening the vault after an (auto-)lock
+@app.route("/account/quick-unlock/setup", methods=["POST"])
+def quick_unlock_setup():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None or not state.username:
+        return jsonify({"error": "Not logged in"}), 401
+    data = request.json or {}
+    pin = data.get("pin")
+    error = validate_pin(pin)
+    if error:
+        return jsonify({"error": error}), 400
+    # the PIN wraps the current VMK, which a pending rotation is about to replace
+    if get_rotation(c, state.username) is not None:
+        return jsonify({"error": "finish the key rotation first"}), 409
+    quick_unlock.enroll(state.username, state.vmk, pin, session=_session())
+    return jsonify({"status": "quick unlock enabled", "idle_seconds": auto_lock["idle_seconds"]})
+
+@app.route("/account/quick-unlock", methods=["POST"])
+def quick_unlock_vault():
+    data = request.json or {}
+    if not quick_unlock.belongs_to(_session()) or not quick_unlock.available():
+        return jsonify({"error": "quick unlock unavailable"}), 403
+    username = quick_unlock.username
+    vmk = quick_unlock.unlock(data.get("pin") or "")
+    if vmk is None:
+        status = quick_unlock.status()
+        return jsonify({"error": "incorrect PIN", "attempts_left": status["attempts_left"]}), 401
+    _open_session(_session(), username, vmk)
+    return jsonify({"status": "logged in", "username": username})
+
+@app.route("/account/quick-unlock", methods=["GET"])
+def quick_unlock_status():
+    if quick_unlock.belongs_to(_session()):
+        status = quick_unlock.status()
+    else:
+        # another session's PIN, nothing this client can use or learn about
+        status = QuickUnlock().status()
+    status["idle_seconds"] = auto_lock["idle_seconds"]
+    return jsonify(status)
+
+@app.route("/account/quick-unlock", methods=["DELETE"])
+def quick_unlock_disable():
+    if quick_unlock.belongs_to(_session()):
+        quick_unlock.clear()
+    return jsonify({"status": "quick unlock disabled"})
 
 @app.route("/account/lockout-status", methods=["GET"])
 def account_lockout_status():
-    current_time = time.time()
-    c.execute(
-        "SELECT lockout_until_timestamp FROM login_lockout WHERE id = 1"
-    )
-    lockout_row = c.fetchone()
-    
-    if not lockout_row or lockout_row[0] is None:
-        return jsonify({"locked": False, "lockout_seconds": 0})
-    
-    lockout_until = lockout_row[0]
-    if current_time >= lockout_until:
-        return jsonify({"locked": False, "lockout_seconds": 0})
-    
-    remaining_seconds = int(lockout_until - current_time)
-    return jsonify({"locked": True, "lockout_seconds": remaining_seconds})
+    remaining_seconds = lockout_remaining(c)
+    return jsonify({"locked": remaining_seconds > 0, "lockout_seconds": remaining_seconds})
 
 def _record_failed_attempt():
-    current_time = time.time()
-    c.execute(
-        "SELECT failed_attempts, lockout_until_timestamp FROM login_lockout WHERE id = 1"
-    )
-    row = c.fetchone()
-    
-    if row:
-        failed_attempts, lockout_until = row
-        if lockout_until is not None and current_time < lockout_until:
-            return
-        
-        failed_attempts = (failed_attempts or 0) + 1
-    else:
-        failed_attempts = 1
-    
-    if failed_attempts >= 3:
-        base_lockout = 15
-        lockout_multiplier = 2 ** (failed_attempts - 3)
-        lockout_duration = base_lockout * lockout_multiplier
-        lockout_until = current_time + lockout_duration
-    else:
-        lockout_until = None
-    
-    c.execute(
-        """
-        INSERT INTO login_lockout (id, failed_attempts, lockout_until_timestamp)
-        VALUES (1, ?, ?)
-        ON CONFLICT(id) DO UPDATE SET
-            failed_attempts = ?,
-            lockout_until_timestamp = ?
-        """,
-        (failed_attempts, lockout_until, failed_attempts, lockout_until),
-    )
-    conn.commit()
+    record_failed_attempt(c)
 
 def _reset_lockout():
-    c.execute("DELETE FROM login_lockout WHERE id = 1")
-    conn.commit()
+    reset_lockout(c)
 
 # changes a users master password assuming they're already logged in.
 @app.route("/account/password", methods=["PUT"])
 def change_master_password():
-    global vault_locked, current_user, current_vmk, current_vmk_cipher
-
-    if vault_locked or not current_user:
+    state = _session().snapshot()
+    if state.locked or not state.username:
         return jsonify({"error": "not logged in"}), 401
 
     data = request.json or {}
@@ -441,7 +795,7 @@ def change_master_password():
     # load user kdf 
     c.execute(
         "SELECT wrapped_vmk, salt, kdf_params FROM user_metadata WHERE username = ?",
-        (current_user,),
+        (state.username,),
     )
     row = c.fetchone()
     
@@ -451,32 +805,171 @@ def change_master_password():
     wrapped_vmk, salt, kdf_params_json = row
     params = json.loads(kdf_params_json)
 
+    # the new key gets a fresh salt and the current default KDF params. both derivations are
+    # independent, so they run side by side and the request costs about one KDF instead of two
+    new_salt = os.urandom(16)
+    new_params = default_kdf_params()
+    try:
+        old_wrap_key, new_wrap_key = derive_wrap_keys([
+            (old_password, salt, params),
+            (new_password, new_salt, new_params),
+        ])
+    except Exception:
+        return jsonify({"error": "incorrect old password"}), 403
+
     # verify old master password
     try:
-        old_wrap_key = derive_wrap_key(old_password, salt, params)
         attempted_vmk = unwrap_vmk(old_wrap_key, wrapped_vmk)
     except Exception:
         return jsonify({"error": "incorrect old password"}), 403
     
-    # generate wrap key for new pswd
-    new_wrap_key = derive_wrap_key(new_password, salt, params)
-    new_wrapped_vmk = wrap_vmk(new_wrap_key, current_vmk)
+    # wrap with the new pswd key
+    new_wrapped_vmk = wrap_vmk(new_wrap_key, state.vmk)
     
     # store
     c.execute(
-        "UPDATE user_metadata SET wrapped_vmk = ? WHERE username = ?",
-        (new_wrapped_vmk, current_user),
+        "UPDATE user_metadata SET wrapped_vmk = ?, salt = ?, kdf_params = ? WHERE username = ?",
+        (new_wrapped_vmk, new_salt, json.dumps(new_params), state.username),
     )
+    # a pending rotation key is wrapped with the master password too
+    rotation = get_rotation(c, state.username)
+    if rotation is not None:
+        pending_vmk = unwrap_vmk(old_wrap_key, rotation["new_wrapped_vmk"])
+        c.execute(
+            "UPDATE vmk_rotation SET new_wrapped_vmk = ? WHERE username = ?",
+            (wrap_vmk(new_wrap_key, pending_vmk), state.username),
+        )
     conn.commit()
 
     return jsonify({"status": "password updated"})
 
+# how long a rotation batch waits for a request thread's write to finish before it gives up
+ROTATION_BUSY_TIMEOUT = 30
+
+def _run_rotation(username, old_vmk, new_vmk, stop):
+    """Rewrite batches until done or stopped, then make the new VMK the account's key."""
+    # a connection of its own, one BEGIN IMMEDIATE transaction per batch: its commits and rollbacks
+    # never take along what request threads have half-written on the shared connection
+    worker_conn = sqlite3.connect(db_path, timeout=ROTATION_BUSY_TIMEOUT, isolation_level=None)
+    cursor = worker_conn.cursor()
+    new_cipher = RecordCipher(new_vmk)
+    read_cipher = MultiRecordCipher([new_cipher, RecordCipher(old_vmk)])
+    new_reuse_key = derive_reuse_key(new_vmk)
+    try:
+        while not stop.is_set():
+            cursor.execute("BEGIN IMMEDIATE")
+            progress = rotate_batch(cursor, username, read_cipher, new_cipher, new_reuse_key, owner=username)
+            if progress["finished"]:
+                finish_rotation(cursor, username)
+                cursor.execute("COMMIT")
+                for session in sessions.for_user(username):
+                    session.set_keys(username, new_cipher, new_reuse_key, vmk=new_vmk)
+                return
+            cursor.execute("COMMIT")
+    except Exception as e:
+        if worker_conn.in_transaction:
+            worker_conn.rollback()
+        rotation_worker["error"] = str(e)
+    finally:
+        worker_conn.close()
+
+# re-encrypts every credential under a fresh VMK, for when the old one may have leaked.
+# runs in the background by default and resumes (same call) after a lock or a restart
+@app.route("/account/rotate-vmk", methods=["POST"])
+def rotate_vmk():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None or not state.username:
+        return jsonify({"error": "Not logged in"}), 401
+
+    data = request.json or {}
+    master_password = data.get("master_password")
+    if not master_password:
+        return jsonify({"error": "missing fields"}), 400
+    thread = rotation_worker["thread"]
+    if thread is not None and thread.is_alive():
+        return jsonify({"error": "rotation already running"}), 409
+
+    c.execute(
+        "SELECT wrapped_vmk, salt, kdf_params FROM user_metadata WHERE username = ?",
+        (state.username,),
+    )
+    row = c.fetchone()
+    if not row:
+        return jsonify({"error": "user not found"}), 404
+    wrapped_vmk, salt, kdf_params_json = row
+    try:
+        wrap_key = derive_wrap_key(master_password, salt, json.loads(kdf_params_json))
+        old_vmk = unwrap_vmk(wrap_key, wrapped_vmk)
+    except Exception:
+        return jsonify({"error": "incorrect master password"}), 403
+
+    rotation = get_rotation(c, state.username)
+    if rotation is None:
+        new_vmk = generate_vmk()
+        rotation = start_rotation(c, state.username, wrap_vmk(wrap_key, new_vmk), owner=state.username)
+        conn.commit()
+    else:
+        new_vmk = unwrap_vmk(wrap_key, rotation["new_wrapped_vmk"])
+
+    # the PIN-wrapped copy is of the key being replaced
+    if quick_unlock.username == state.username:
+        quick_unlock.clear()
+    # from here on new rows are written with the new key and every row stays readable, in every
+    # session of this user, otherwise another client could write old-key rows behind the rotation
+    read_cipher = MultiRecordCipher([RecordCipher(new_vmk), RecordCipher(old_vmk)])
+    for session in sessions.for_user(state.username):
+        session.set_keys(state.username, read_cipher, derive_reuse_key(new_vmk))
+    health_report_cache["key"] = None
+
+    stop = threading.Event()
+    rotation_worker.update(stop=stop, error=None)
+    if data.get("background", True):
+        rotation_worker["thread"] = threading.Thread(
+            target=_run_rotation, args=(state.username, old_vmk, new_vmk, stop), daemon=True
+        )
+        rotation_worker["thread"].start()
+        return jsonify(dict(rotation_progress(rotation), status="rotation started")), 202
+
+    _run_rotation(state.username, old_vmk, new_vmk, stop)
+    if rotation_worker["error"]:
+        return jsonify({"error": rotation_worker["error"]}), 500
+    return jsonify(dict(rotation_progress(get_rotation(c, state.username)), status="rotation complete"))
+
+@app.route("/account/rotate-vmk", methods=["GET"])
+def rotate_vmk_status():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None or not state.username:
+        return jsonify({"error": "Not logged in"}), 401
+    thread = rotation_worker["thread"]
+    progress = rotation_progress(get_rotation(c, state.username))
+    progress["running"] = thread is not None and thread.is_alive()
+    progress["error"] = rotation_worker["error"]
+    return jsonify(progress)
+
+# rewrites the remaining Fernet tokens as compact records in one go, instead of waiting for each row's next write
+@app.route("/records/migrate", methods=["POST"])
+def migrate_credential_records():
+    state = _session().snapshot()
+    if state.locked:
+        return jsonify({"error": "Vault is locked"}), 423
+    if state.cipher is None or not state.username:
+        return jsonify({"error": "Not logged in"}), 401
+    thread = rotation_worker["thread"]
+    if thread is not None and thread.is_alive():
+        return jsonify({"error": "rotation running"}), 409
+
+    result = migrate_records(c, state.cipher, owner=state.username)
+    return jsonify(result)
+
 @app.route("/check-duplicate", methods=["POST"])
 def check_duplicate():
 
-    global vault_locked
-
-    if vault_locked:
+    state = _session().snapshot()
+    if state.locked:
         return jsonify({"error": "Vault is locked"}), 423
 
 
@@ -484,7 +977,10 @@ def check_duplicate():
     site = data.get("site")
     username = data.get("username")
 
-    c.execute("SELECT 1 FROM credentials WHERE site = ? AND username = ?", (site, username))
+    c.execute(
+        "SELECT 1 FROM credentials WHERE owner IS ? AND site = ? AND username = ?",
+        (state.username, site, username),
+    )
     row = c.fetchone()
 
     # return true if row found, false otherwise
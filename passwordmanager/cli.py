@@ -0,0 +1,381 @@
+import argparse
+import csv
+import datetime
+import getpass
+import json
+import os
+import sys
+from typing import NamedTuple, Optional
+
+from passwordmanager.core import passwordManager as pm
+from passwordmanager.core.export_service import iter_decryptable_credentials
+from passwordmanager.core.health_service import DEFAULT_MAX_AGE_DAYS, build_health_report
+from passwordmanager.core.import_service import drop_existing, import_items, parse_csv
+from passwordmanager.core.kdf import derive_wrap_key
+from passwordmanager.core.login_lockout import lockout_remaining, record_failed_attempt, reset_lockout
+from passwordmanager.core.ownership import claim_unowned_rows
+from passwordmanager.core.record_cipher import MultiRecordCipher, RecordCipher
+from passwordmanager.core.reuse_index import derive_reuse_key, password_fingerprint
+from passwordmanager.core.rotation_service import get_rotation
+from passwordmanager.core.search_service import search_metadata, search_terms
+from passwordmanager.core.vmk import unwrap_vmk
+from passwordmanager.utils.breach_checker import get_breach_checker
+from passwordmanager.utils.password_generator import DEFAULT_LENGTH, MAX_LENGTH, generate_passwords
+
+#####
+# headless command line for scripts: opens the vault file directly through the core services,
+# without the GUI (no Qt) or the API server (no Flask). every run unlocks with the master password,
+# honours the same failed-login lockout as the login window and does one thing. results go to stdout
+# as one JSON document, or NDJSON (a JSON object per line) for list, search and export; errors go to
+# stderr as {"error": ...} with a non-zero exit status.
+#
+#     export PASSWORDMANAGER_MASTER_PASSWORD=...
+#     python -m passwordmanager list | jq -r .site
+#     python -m passwordmanager export --format csv --output backup.csv
+#
+# the master password comes from --password-stdin (first line of stdin), PASSWORDMANAGER_MASTER_PASSWORD
+# or a prompt. list and search print metadata only; get, export and add --generate print passwords.
+#####
+
+MASTER_PASSWORD_ENV = "PASSWORDMANAGER_MASTER_PASSWORD"
+USERNAME_ENV = "PASSWORDMANAGER_USERNAME"
+
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_AUTH = 3
+EXIT_LOCKED = 4
+
+EXPORT_FORMATS = ("ndjson", "csv", "json")
+
+
+class CliError(Exception):
+    def __init__(self, message: str, exit_code: int = EXIT_ERROR, **details):
+        super().__init__(message)
+        self.exit_code = exit_code
+        self.details = details
+
+
+class UnlockedVault(NamedTuple):
+    c: object
+    username: str
+    cipher: object
+    reuse_key: bytes
+    rotation_pending: bool
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def emit(obj, out=None):
+    out = out or sys.stdout
+    out.write(json.dumps(obj, ensure_ascii=False, default=_json_default) + "\n")
+
+
+def _format_created_at(created_at) -> Optional[str]:
+    if isinstance(created_at, datetime.datetime):
+        return created_at.isoformat()
+    return created_at
+
+
+def _metadata(cred_id, site, username, created_at):
+    return {"id": cred_id, "site": site, "username": username, "created_at": _format_created_at(created_at)}
+
+
+# Unlocking #######################################################################
+
+def read_master_password(args) -> str:
+    if args.password_stdin:
+        line = sys.stdin.readline()
+        if not line:
+            raise CliError("--password-stdin: stdin is empty", EXIT_USAGE)
+        return line.rstrip("\r\n")
+    password = os.environ.get(MASTER_PASSWORD_ENV)
+    if password:
+        return password
+    if not sys.stdin.isatty():
+        raise CliError(f"no master password: set {MASTER_PASSWORD_ENV} or pass --password-stdin", EXIT_USAGE)
+    return getpass.getpass("Master password: ")
+
+
+def resolve_username(c, username: Optional[str]) -> str:
+    """The given account, or the only one in the vault."""
+    if username:
+        return username
+    c.execute("SELECT username FROM user_metadata ORDER BY username LIMIT 2")
+    accounts = [row[0] for row in c.fetchall()]
+    if not accounts:
+        raise CliError("no account in this vault")
+    if len(accounts) > 1:
+        raise CliError(f"this vault has several accounts, pass --username or set {USERNAME_ENV}", EXIT_USAGE)
+    return accounts[0]
+
+
+def open_vault(c, username: str, master_password: str) -> UnlockedVault:
+    """Same checks and keys as POST /account/login, including a pending VMK rotation and the one-time row claim."""
+    remaining_seconds = lockout_remaining(c)
+    if remaining_seconds:
+        raise CliError("login locked", EXIT_LOCKED, lockout_seconds=remaining_seconds)
+
+    c.execute("SELECT wrapped_vmk, salt, kdf_params, owner_claimed FROM user_metadata WHERE username = ?", (username,))
+    row = c.fetchone()
+    if not row:
+        record_failed_attempt(c)
+        raise CliError("incorrect credentials", EXIT_AUTH)
+
+    wrapped_vmk, salt, kdf_params_json, owner_claimed = row
+    try:
+        wrap_key = derive_wrap_key(master_password, salt, json.loads(kdf_params_json))
+        vmk = unwrap_vmk(wrap_key, wrapped_vmk)
+    except Exception:
+        record_failed_attempt(c)
+        raise CliError("incorrect credentials", EXIT_AUTH)
+    reset_lockout(c)
+
+    rotation = get_rotation(c, username)
+    if rotation is not None:
+        pending_vmk = unwrap_vmk(wrap_key, rotation["new_wrapped_vmk"])
+        cipher = MultiRecordCipher([RecordCipher(pending_vmk), RecordCipher(vmk)])
+        reuse_key = derive_reuse_key(pending_vmk)
+    else:
+        cipher = RecordCipher(vmk)
+        reuse_key = derive_reuse_key(vmk)
+
+    if not owner_claimed:
+        claim_unowned_rows(c, username, cipher)
+        c.execute("UPDATE user_metadata SET owner_claimed = 1 WHERE username = ?", (username,))
+        c.connection.commit()
+    return UnlockedVault(c, username, cipher, reuse_key, rotation is not None)
+
+
+# Commands ########################################################################
+
+def cmd_unlock(vault: UnlockedVault, args):
+    vault.c.execute("SELECT COUNT(*) FROM credentials WHERE owner = ?", (vault.username,))
+    emit({
+        "status": "unlocked",
+        "username": vault.username,
+        "credentials": vault.c.fetchone()[0],
+        "rotation_pending": vault.rotation_pending,
+    })
+
+
+def cmd_list(vault: UnlockedVault, args):
+    vault.c.execute(
+        "SELECT id, site, username, created_at FROM credentials WHERE owner = ? ORDER BY site, id LIMIT ?",
+        (vault.username, args.limit),
+    )
+    for row in vault.c:
+        emit(_metadata(*row))
+
+
+def cmd_search(vault: UnlockedVault, args):
+    _, rows = search_metadata(vault.c, search_terms(args.query), vault.username, pm.FTS_AVAILABLE, args.limit)
+    for row in rows:
+        emit(_metadata(*row))
+
+
+def cmd_get(vault: UnlockedVault, args):
+    vault.c.execute(
+        "SELECT site, username, password, created_at FROM credentials WHERE id = ? AND owner = ?",
+        (args.id, vault.username),
+    )
+    row = vault.c.fetchone()
+    if row is None:
+        raise CliError("not found", id=args.id)
+    site, username, encrypted_password, created_at = row
+    try:
+        password = vault.cipher.decrypt(encrypted_password).decode()
+    except Exception:
+        raise CliError("cannot decrypt this credential", id=args.id)
+
+    credential = _metadata(args.id, site, username, created_at)
+    credential["password"] = password
+    if args.field:
+        # bare value, for $(...) and pipes
+        sys.stdout.write(f"{credential[args.field]}\n")
+    else:
+        emit(credential)
+
+
+def cmd_add(vault: UnlockedVault, args):
+    if args.generate and not 1 <= args.length <= MAX_LENGTH:
+        raise CliError(f"--length must be between 1 and {MAX_LENGTH}", EXIT_USAGE)
+    if args.generate:
+        password = generate_passwords(1, args.length)[0]
+    elif sys.stdin.isatty():
+        password = getpass.getpass(f"Password for {args.username} at {args.site}: ")
+    else:
+        # the line after the master password when that came from --password-stdin too
+        password = sys.stdin.readline().rstrip("\r\n")
+    if not password:
+        raise CliError("empty password", EXIT_USAGE)
+
+    now = datetime.datetime.utcnow()
+    vault.c.execute(
+        "INSERT INTO credentials (site, username, password, created_at, password_hmac, owner) VALUES (?, ?, ?, ?, ?, ?)",
+        (args.site, args.username, vault.cipher.encrypt(password.encode()), now,
+         password_fingerprint(vault.reuse_key, password), vault.username),
+    )
+    result = {"status": "added", "id": vault.c.lastrowid, "created_at": now.isoformat()}
+    vault.c.connection.commit()
+    if args.generate:
+        result["password"] = password
+    emit(result)
+
+
+def cmd_import(vault: UnlockedVault, args):
+    if args.file == "-":
+        csv_text = sys.stdin.read()
+    else:
+        with open(args.file, encoding="utf-8", errors="replace", newline="") as f:
+            csv_text = f.read()
+
+    items, parse_errors = parse_csv(csv_text)
+    if any(err.startswith("missing required header") for err in parse_errors):
+        raise CliError("missing required columns", details=parse_errors)
+
+    skipped = 0
+    if not args.allow_duplicates:
+        items, skipped = drop_existing(vault.c, items, vault.username)
+    summary = import_items(vault.c, items, vault.cipher, reuse_key=vault.reuse_key, owner=vault.username)
+    vault.c.connection.commit()
+    summary["skipped"] += skipped
+    summary["parse_errors"] = len(parse_errors)
+    emit(summary)
+
+
+def _open_export_output(path: Optional[str]):
+    if not path or path == "-":
+        return sys.stdout
+    # plaintext passwords: readable by the owner only
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    return open(fd, "w", encoding="utf-8", newline="")
+
+
+def cmd_export(vault: UnlockedVault, args):
+    out = _open_export_output(args.output)
+    count = 0
+    try:
+        # a row at a time from the database to the output, the vault is never held in memory
+        items = iter_decryptable_credentials(vault.c, vault.cipher, owner=vault.username)
+        if args.format == "csv":
+            writer = csv.writer(out)
+            writer.writerow(["site", "username", "password"])
+            for item in items:
+                writer.writerow([item["site"], item["username"], item["password"]])
+                count += 1
+        elif args.format == "json":
+            # the same document as GET /export and serialize_export_json, written as it goes
+            exported_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            out.write(f'{{"version":1,"exported_at":{json.dumps(exported_at)},"items":[')
+            for item in items:
+                out.write(("," if count else "") + json.dumps(item, separators=(",", ":"), ensure_ascii=False))
+                count += 1
+            out.write("]}\n")
+        else:
+            for item in items:
+                emit(item, out)
+                count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if out is not sys.stdout:
+        emit({"status": "exported", "count": count, "format": args.format, "output": args.output})
+
+
+def cmd_health(vault: UnlockedVault, args):
+    breach_checker = None if args.no_breach_check else get_breach_checker()
+    emit(build_health_report(
+        vault.c, vault.cipher, max_age_days=args.max_age_days, breach_checker=breach_checker, owner=vault.username
+    ))
+
+
+# Entry point #####################################################################
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="passwordmanager",
+        description="Use the vault from scripts, without the GUI or the API server.",
+    )
+    parser.add_argument("--db", help=f"vault file (default: ${pm.DB_PATH_ENV} or {pm.DB_FILENAME} next to the app)")
+    parser.add_argument("--username", dest="account", default=os.environ.get(USERNAME_ENV),
+                        help="account to unlock, needed when the vault has more than one")
+    parser.add_argument("--password-stdin", action="store_true",
+                        help=f"read the master password from the first line of stdin instead of ${MASTER_PASSWORD_ENV}")
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    unlock = commands.add_parser("unlock", help="check the master password and print the account status")
+    unlock.set_defaults(run=cmd_unlock)
+
+    list_parser = commands.add_parser("list", help="NDJSON of id, site, username and created_at, no passwords")
+    list_parser.add_argument("--limit", type=int, default=-1)
+    list_parser.set_defaults(run=cmd_list)
+
+    search = commands.add_parser("search", help="like list, only the credentials whose site or username match")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=-1)
+    search.set_defaults(run=cmd_search)
+
+    get = commands.add_parser("get", help="one credential with its password")
+    get.add_argument("id", type=int)
+    get.add_argument("--field", choices=("site", "username", "password", "created_at"),
+                     help="print just this value instead of JSON")
+    get.set_defaults(run=cmd_get)
+
+    add = commands.add_parser("add", help="store a credential; the password is read from stdin or prompted for")
+    add.add_argument("site")
+    add.add_argument("username")
+    add.add_argument("--generate", action="store_true", help="store a new random password and print it")
+    add.add_argument("--length", type=int, default=DEFAULT_LENGTH, help=f"of the generated password, up to {MAX_LENGTH}")
+    add.set_defaults(run=cmd_add)
+
+    import_parser = commands.add_parser("import", help="add the rows of a site,username,password CSV file")
+    import_parser.add_argument("file", help="CSV file, - for stdin")
+    import_parser.add_argument("--allow-duplicates", action="store_true",
+                               help="also add rows whose site and username are already stored")
+    import_parser.set_defaults(run=cmd_import)
+
+    export = commands.add_parser("export", help="stream every credential with its password")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export.add_argument("--output", help="file to write (created readable by you only), default stdout")
+    export.set_defaults(run=cmd_export)
+
+    health = commands.add_parser("health", help="weak, reused, old and breached credentials, without passwords")
+    health.add_argument("--max-age-days", type=int, default=DEFAULT_MAX_AGE_DAYS)
+    health.add_argument("--no-breach-check", action="store_true", help="skip the offline breach list")
+    health.set_defaults(run=cmd_health)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        if args.db:
+            pm.db_path = os.path.abspath(args.db)
+        # don't leave an empty vault behind for a mistyped path
+        if not os.path.exists(pm.db_path):
+            raise CliError("no vault found", path=pm.db_path)
+        c = pm.open_database().cursor()
+        username = resolve_username(c, args.account)
+        vault = open_vault(c, username, read_master_password(args))
+        args.run(vault, args)
+        sys.stdout.flush()
+    except CliError as e:
+        emit({"error": str(e), **e.details}, sys.stderr)
+        return e.exit_code
+    except BrokenPipeError:
+        # the reader went away (| head); point stdout at nothing so the exit flush can't fail again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    except (OSError, ValueError) as e:
+        emit({"error": str(e)}, sys.stderr)
+        return EXIT_ERROR
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,35 @@
 import csv
 import io
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
+from passwordmanager.core.ownership import owner_filter
 
-def fetch_decryptable_credentials(c, cipher: Optional[object]) -> List[Dict[str, str]]:
+
+EXPORT_BATCH_SIZE = 500
+
+
+def iter_decryptable_credentials(c, cipher: Optional[object], owner: Optional[str] = None) -> Iterator[Dict[str, str]]:
+    """Yield the rows cipher can open one at a time, EXPORT_BATCH_SIZE rows per read, so exports can stream."""
     if cipher is None:
-        return []
-
-    c.execute("SELECT site, username, password FROM credentials")
-    rows = c.fetchall()
-
-    items: List[Dict[str, str]] = []
-    for site, username, encrypted_password in rows:
-        try:
-            password = cipher.decrypt(encrypted_password).decode()
-            items.append({"site": site, "username": username, "password": password})
-        except Exception:
-            continue
-    return items
+        return
+
+    mine, params = owner_filter(owner)
+    c.execute(f"SELECT site, username, password FROM credentials WHERE {mine}", params)
+    while True:
+        rows = c.fetchmany(EXPORT_BATCH_SIZE)
+        if not rows:
+            return
+        for site, username, encrypted_password in rows:
+            try:
+                password = cipher.decrypt(encrypted_password).decode()
+            except Exception:
+                continue
+            yield {"site": site, "username": username, "password": password}
+
+
+def fetch_decryptable_credentials(c, cipher: Optional[object], owner: Optional[str] = None) -> List[Dict[str, str]]:
+    return list(iter_decryptable_credentials(c, cipher, owner))
 
 
 def serialize_export_json(items: List[Dict[str, str]]) -> str:
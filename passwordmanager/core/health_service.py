@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from passwordmanager.core.ownership import owner_filter
+from passwordmanager.utils.apiPasswordStrength import get_password_strengths
+
+
+#####
+# vault-wide password health report: weak, reused and old credentials
+# every row is decrypted once and the plaintexts are scored in one batch (distinct passwords only).
+# decryption dominates the cost, so callers should cache the report per vault revision
+#####
+
+DEFAULT_MAX_AGE_DAYS = 365
+
+
+def _decrypt_rows(cipher, rows: List[Tuple]) -> List[Tuple[Tuple, Optional[str]]]:
+    decrypted = []
+    for row in rows:
+        try:
+            decrypted.append((row, cipher.decrypt(row[3]).decode()))
+        except Exception:
+            decrypted.append((row, None))
+    return decrypted
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    # the app's connection converts DATETIME columns already, a plain connection hands back text
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, bytes):
+        value = value.decode()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _format_date(value) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.strftime("%m-%d-%Y")
+    return None
+
+
+def build_health_report(
+    c,
+    cipher: Optional[object],
+    now: Optional[datetime] = None,
+    max_age_days: int = DEFAULT_MAX_AGE_DAYS,
+    breach_checker: Optional[object] = None,
+    owner: Optional[str] = None,
+) -> Dict:
+    """
+    Score every credential and group the weak, reused, old and (with a breach_checker) breached ones.
+    The report only carries ids, sites, usernames and dates, never a password.
+    """
+    report: Dict = {
+        "total": 0,
+        "unreadable": 0,
+        "counts": {"weak": 0, "medium": 0, "strong": 0, "reused": 0, "old": 0, "breached": 0},
+        "breach_check": breach_checker is not None,
+        "weak": [],
+        "breached": [],
+        "reused": [],
+        "old": [],
+    }
+    if cipher is None:
+        return report
+
+    now = now or datetime.utcnow()
+    mine, params = owner_filter(owner)
+    c.execute(f"SELECT id, site, username, password, created_at FROM credentials WHERE {mine}", params)
+    rows = c.fetchall()
+    report["total"] = len(rows)
+
+    readable = []
+    for row, password in _decrypt_rows(cipher, rows):
+        if password is None:
+            report["unreadable"] += 1
+        else:
+            readable.append((row, password))
+
+    strengths = get_password_strengths(password for _, password in readable)
+    by_password: Dict[str, List[Dict]] = {}
+    for (row, password), strength in zip(readable, strengths):
+        cred_id, site, username, _, created_at = row
+        created_at = _parse_datetime(created_at)
+        entry = {"id": cred_id, "site": site, "username": username}
+        report["counts"][strength] += 1
+        if strength == "weak":
+            report["weak"].append(dict(entry, strength=strength))
+        by_password.setdefault(password, []).append(entry)
+        if breach_checker is not None and breach_checker.is_breached(password):
+            report["breached"].append(entry)
+
+        if created_at is not None:
+            age_days = (now - created_at).days
+            if age_days >= max_age_days:
+                report["old"].append(dict(entry, created_at=_format_date(created_at), age_days=age_days))
+
+    for entries in by_password.values():
+        if len(entries) > 1:
+            report["reused"].append({"count": len(entries), "credentials": entries})
+            report["counts"]["reused"] += len(entries)
+    report["reused"].sort(key=lambda group: -group["count"])
+    report["old"].sort(key=lambda entry: -entry["age_days"])
+    report["counts"]["old"] = len(report["old"])
+    report["counts"]["breached"] = len(report["breached"])
+    return report
@@ -2,6 +2,8 @@ import csv
 import io
 from typing import Dict, List, Tuple, Optional
 
+from passwordmanager.core.reuse_index import password_fingerprint
+
 
 RequiredHeaders = ("site", "username", "password")
 
@@ -67,7 +69,13 @@ def import_items(
     c,
     items: List[Dict[str, str]],
     current_vmk_cipher: Optional[object],
+    reuse_key: Optional[bytes] = None,
+    *,
+    owner: str,
 ) -> Dict[str, int]:
+    """Encrypt and insert items as owner's rows. A row without an owner is never listed or claimed, so one is required."""
+    if not owner:
+        raise ValueError("owner is required")
     inserted = 0
     skipped = 0
     errors = 0
@@ -85,12 +93,34 @@ def import_items(
 
         try:
             encrypted_password = current_vmk_cipher.encrypt(password.encode("utf-8"))
+            row = {"site": site, "username": username, "password": encrypted_password}
+            if reuse_key is not None:
+                row["password_hmac"] = password_fingerprint(reuse_key, password)
+            row["owner"] = owner
             c.execute(
-                "INSERT INTO credentials (site, username, password) VALUES (?, ?, ?)",
-                (site, username, encrypted_password),
+                f"INSERT INTO credentials ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                tuple(row.values()),
             )
             inserted += 1
         except Exception:
             errors += 1
 
-    return {"inserted": inserted, "skipped": skipped, "errors": errors}
\ No newline at end of file
+    return {"inserted": inserted, "skipped": skipped, "errors": errors}
+
+
+def drop_existing(c, items: List[Dict[str, str]], owner: str) -> Tuple[List[Dict[str, str]], int]:
+    """Leave out the items whose site and username the owner already has. Returns the rest and how many were left out."""
+    kept = []
+    skipped = 0
+    for item in items:
+        site = (item.get("site") or "").strip()
+        username = (item.get("username") or "").strip()
+        c.execute(
+            "SELECT 1 FROM credentials WHERE owner = ? AND site = ? AND username = ?",
+            (owner, site, username),
+        )
+        if c.fetchone():
+            skipped += 1
+            continue
+        kept.append(item)
+    return kept, skipped
@@ -1,5 +1,6 @@
 import base64
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
 from argon2.low_level import hash_secret_raw, Type as Argon2Type
 
 # a lot of these parameters are just the defaults for Argon2id
@@ -31,3 +32,17 @@ def derive_wrap_key(master_password: str, salt: bytes, params: Optional[Dict[str
     return base64.urlsafe_b64encode(dk)
 
 
+# argon2 runs in C and releases the GIL, so independent derivations overlap on a thread pool.
+# two workers covers the old-key check and the new key in change_master_password; each run holds
+# memory_cost KiB while it works, so the pool is kept that small on purpose
+_kdf_pool = {"executor": None}
+KDF_POOL_WORKERS = 2
+
+def derive_wrap_keys(jobs: List[Tuple[str, bytes, Optional[Dict[str, Any]]]]) -> List[bytes]:
+    """derive_wrap_key for every (master_password, salt, params) job, concurrently, results in job order."""
+    if len(jobs) < 2:
+        return [derive_wrap_key(*job) for job in jobs]
+    if _kdf_pool["executor"] is None:
+        _kdf_pool["executor"] = ThreadPoolExecutor(max_workers=KDF_POOL_WORKERS, thread_name_prefix="kdf")
+    futures = [_kdf_pool["executor"].submit(derive_wrap_key, *job) for job in jobs]
+    return [future.result() for future in futures]
@@ -0,0 +1,59 @@
+import time
+from typing import Optional
+
+
+#####
+# failed-login lockout, shared by the API login route and the command line
+# one row (id = 1) counts the failed attempts; from the third one on, logins are refused for
+# 15 s, doubling with every further failure. a successful login deletes the row.
+#####
+
+LOCKOUT_FREE_ATTEMPTS = 2
+BASE_LOCKOUT_SECONDS = 15
+
+
+def lockout_remaining(c, now: Optional[float] = None) -> int:
+    """Seconds until logins are allowed again, 0 when they are."""
+    now = time.time() if now is None else now
+    c.execute("SELECT lockout_until_timestamp FROM login_lockout WHERE id = 1")
+    row = c.fetchone()
+    if not row or row[0] is None or now >= row[0]:
+        return 0
+    return int(row[0] - now)
+
+
+def record_failed_attempt(c, now: Optional[float] = None):
+    now = time.time() if now is None else now
+    c.execute("SELECT failed_attempts, lockout_until_timestamp FROM login_lockout WHERE id = 1")
+    row = c.fetchone()
+
+    if row:
+        failed_attempts, lockout_until = row
+        # attempts made while locked out were refused before they got here, don't count them twice
+        if lockout_until is not None and now < lockout_until:
+            return
+        failed_attempts = (failed_attempts or 0) + 1
+    else:
+        failed_attempts = 1
+
+    if failed_attempts > LOCKOUT_FREE_ATTEMPTS:
+        lockout_until = now + BASE_LOCKOUT_SECONDS * 2 ** (failed_attempts - LOCKOUT_FREE_ATTEMPTS - 1)
+    else:
+        lockout_until = None
+
+    c.execute(
+        """
+        INSERT INTO login_lockout (id, failed_attempts, lockout_until_timestamp)
+        VALUES (1, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            failed_attempts = ?,
+            lockout_until_timestamp = ?
+        """,
+        (failed_attempts, lockout_until, failed_attempts, lockout_until),
+    )
+    c.connection.commit()
+
+
+def reset_lockout(c):
+    c.execute("DELETE FROM login_lockout WHERE id = 1")
+    c.connection.commit()
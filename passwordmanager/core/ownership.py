@@ -0,0 +1,54 @@
+from typing import Dict, Optional, Tuple
+
+
+#####
+# per-account partitioning of the credentials table
+# every row carries the username that owns it, and (owner, ...) composite indexes let each query
+# touch one account's rows only, instead of reading everyone's and dropping what fails to decrypt.
+# rows from before the column existed have no owner yet: the first login of each account claims
+# the ones its key can open (trial decryption, in batches). rows nobody can open stay unowned.
+# services that write rows take owner as a required keyword; None there means every account's rows
+# and is only for maintenance tools, new rows always get an owner.
+#####
+
+CLAIM_BATCH_SIZE = 500
+
+
+def owner_filter(owner: Optional[str], column: str = "owner") -> Tuple[str, Tuple]:
+    """SQL condition and params for one owner's rows. None means no restriction (tools, old tables)."""
+    if owner is None:
+        return "1", ()
+    return f"{column} = ?", (owner,)
+
+
+def claim_unowned_rows(c, owner: str, cipher, batch_size: int = CLAIM_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Give owner every unowned row its cipher can decrypt, committing after each batch so an
+    interrupted run just continues next time. Returns how many rows were claimed and left over.
+    """
+    claimed = 0
+    left = 0
+    last_id = 0
+    while True:
+        c.execute(
+            "SELECT id, password FROM credentials WHERE owner IS NULL AND id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        )
+        rows = c.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        mine = []
+        for cred_id, token in rows:
+            try:
+                cipher.decrypt(token)
+            except Exception:
+                left += 1
+                continue
+            mine.append((owner, cred_id))
+        c.executemany("UPDATE credentials SET owner = ? WHERE id = ?", mine)
+        c.connection.commit()
+        claimed += len(mine)
+
+    return {"claimed": claimed, "left": left}
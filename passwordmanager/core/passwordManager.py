@@ -2,9 +2,12 @@ import sqlite3
 import os
 import sys
 import datetime
+import threading
 
 # Database stuff #################################
 DB_FILENAME = "vault.db"
+# points the app at another database file, for benchmarks and test vaults
+DB_PATH_ENV = "PASSWORDMANAGER_DB"
 
 def get_base_path():
     if getattr(sys, 'frozen', False):
@@ -21,39 +24,72 @@ def convert_datetime(val):
 
 sqlite3.register_converter("datetime", convert_datetime)
 
-db_path = os.path.join(get_base_path(), DB_FILENAME)
-conn = sqlite3.connect(db_path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
-c = conn.cursor()
-c.execute("""
-CREATE TABLE IF NOT EXISTS credentials (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    site TEXT,
-    username TEXT,
-    password BLOB,
-    created_at DATETIME
-)
-""")
-c.execute("""
-CREATE TABLE IF NOT EXISTS user_metadata (
-    username TEXT PRIMARY KEY,
-    wrapped_vmk BLOB NOT NULL,
-    salt BLOB NOT NULL,
-    kdf TEXT NOT NULL,
-    kdf_params TEXT NOT NULL
-)
-""")
-c.execute("PRAGMA table_info(login_lockout)")
-cols = [row[1] for row in c.fetchall()]
-c.execute("""
-CREATE TABLE IF NOT EXISTS login_lockout (
-    id INTEGER PRIMARY KEY CHECK (id = 1),
-    failed_attempts INTEGER NOT NULL DEFAULT 0,
-    lockout_until_timestamp REAL
-)
-""")
-conn.commit()
+db_path = os.environ.get(DB_PATH_ENV) or os.path.join(get_base_path(), DB_FILENAME)
+
+# the database is opened on first use of conn, c or FTS_AVAILABLE (module __getattr__, PEP 562) rather
+# than at import, so importing this module for its helpers stays cheap and startup can open it off the
+# GUI thread. open_database() runs the schema setup and migrations below once; other threads should
+# go through it too, it waits for a setup that is still running
+_open_lock = threading.Lock()
+
+def open_database():
+    global conn, c, FTS_AVAILABLE
+    with _open_lock:
+        if "conn" in globals():
+            return conn
+        conn = sqlite3.connect(db_path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        c = conn.cursor()
+        FTS_AVAILABLE = False
+        _create_tables()
+        ensure_credentials_id_column()
+        ensure_credentials_created_at_column()
+        ensure_credentials_password_hmac_column()
+        ensure_vmk_rotation_table()
+        ensure_credentials_owner_column()
+        ensure_credentials_fts()
+        return conn
+
+def __getattr__(name):
+    if name in ("conn", "c", "FTS_AVAILABLE"):
+        open_database()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _create_tables():
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS credentials (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        site TEXT,
+        username TEXT,
+        password BLOB,
+        created_at DATETIME
+    )
+    """)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS user_metadata (
+        username TEXT PRIMARY KEY,
+        wrapped_vmk BLOB NOT NULL,
+        salt BLOB NOT NULL,
+        kdf TEXT NOT NULL,
+        kdf_params TEXT NOT NULL
+    )
+    """)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS login_lockout (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        failed_attempts INTEGER NOT NULL DEFAULT 0,
+        lockout_until_timestamp REAL
+    )
+    """)
+    conn.commit()
+
 ###################################################################################
 
+# every insert/update/delete made through `conn` bumps total_changes, so it doubles as a cheap
+# vault revision number for caches that need to know whether the data moved underneath them
+def get_vault_revision():
+    return open_database().total_changes
+
 # this is optional, but here for completeness
 # it addresses the case where the credentials table was created earlier before we had the id column
 # it's also aggressively simple: we create a new table with the id field, copy all the data from the old table into the new, drop the old table, and rename the new table to the old table name
@@ -84,5 +120,80 @@ def ensure_credentials_created_at_column():
         c.execute("ALTER TABLE credentials ADD COLUMN created_at DATETIME")
         conn.commit()
 
-ensure_credentials_id_column()
-ensure_credentials_created_at_column()
+# keyed hash of the password (see core/reuse_index.py), indexed so reuse groups are one GROUP BY
+def ensure_credentials_password_hmac_column():
+    c.execute("PRAGMA table_info(credentials)")
+    cols = [row[1] for row in c.fetchall()]
+    if "password_hmac" not in cols:
+        c.execute("ALTER TABLE credentials ADD COLUMN password_hmac BLOB")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_credentials_password_hmac ON credentials(password_hmac)")
+    conn.commit()
+
+# a VMK rotation in progress (see core/rotation_service.py), one row per account at most
+def ensure_vmk_rotation_table():
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS vmk_rotation (
+        username TEXT PRIMARY KEY,
+        new_wrapped_vmk BLOB NOT NULL,
+        last_id INTEGER NOT NULL DEFAULT 0,
+        total INTEGER NOT NULL DEFAULT 0,
+        done INTEGER NOT NULL DEFAULT 0,
+        skipped INTEGER NOT NULL DEFAULT 0,
+        started_at DATETIME
+    )
+    """)
+    conn.commit()
+
+# which account a row belongs to (see core/ownership.py). owner_claimed marks accounts whose
+# pre-existing rows have been claimed already, new accounts start out claimed
+def ensure_credentials_owner_column():
+    c.execute("PRAGMA table_info(credentials)")
+    cols = [row[1] for row in c.fetchall()]
+    if "owner" not in cols:
+        c.execute("ALTER TABLE credentials ADD COLUMN owner TEXT")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_credentials_owner_id ON credentials(owner, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_credentials_owner_site ON credentials(owner, site, username)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_credentials_owner_password_hmac ON credentials(owner, password_hmac)")
+    c.execute("PRAGMA table_info(user_metadata)")
+    cols = [row[1] for row in c.fetchall()]
+    if "owner_claimed" not in cols:
+        c.execute("ALTER TABLE user_metadata ADD COLUMN owner_claimed INTEGER NOT NULL DEFAULT 0")
+    conn.commit()
+
+# full-text index over the plaintext site/username columns, used by the /search route
+# it is an external content table, so it stores no copy of the data, and the triggers keep it in sync
+# with every insert/update/delete. FTS5 is compiled into practically every sqlite3 build, but if it is
+# missing we just leave FTS_AVAILABLE False and search falls back to LIKE
+def ensure_credentials_fts():
+    global FTS_AVAILABLE
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'credentials_fts'")
+    existed = c.fetchone() is not None
+    try:
+        c.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS credentials_fts USING fts5(
+            site, username, content='credentials', content_rowid='id'
+        )
+        """)
+    except sqlite3.OperationalError:
+        return
+    c.execute("""
+    CREATE TRIGGER IF NOT EXISTS credentials_fts_insert AFTER INSERT ON credentials BEGIN
+        INSERT INTO credentials_fts(rowid, site, username) VALUES (new.id, new.site, new.username);
+    END
+    """)
+    c.execute("""
+    CREATE TRIGGER IF NOT EXISTS credentials_fts_delete AFTER DELETE ON credentials BEGIN
+        INSERT INTO credentials_fts(credentials_fts, rowid, site, username) VALUES ('delete', old.id, old.site, old.username);
+    END
+    """)
+    c.execute("""
+    CREATE TRIGGER IF NOT EXISTS credentials_fts_update AFTER UPDATE OF site, username ON credentials BEGIN
+        INSERT INTO credentials_fts(credentials_fts, rowid, site, username) VALUES ('delete', old.id, old.site, old.username);
+        INSERT INTO credentials_fts(rowid, site, username) VALUES (new.id, new.site, new.username);
+    END
+    """)
+    if not existed:
+        # first run on an existing vault: index the rows that are already there
+        c.execute("INSERT INTO credentials_fts(credentials_fts) VALUES ('rebuild')")
+    conn.commit()
+    FTS_AVAILABLE = True
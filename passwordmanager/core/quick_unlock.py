@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from passwordmanager.core.kdf import derive_wrap_key
+from passwordmanager.core.vmk import unwrap_vmk, wrap_vmk
+
+
+#####
+# quick unlock: re-open an auto-locked vault with a short PIN instead of the master password
+# the PIN wraps the VMK with a cheap Argon2id run (about 10 ms instead of the master KDF's quarter
+# second). that is only acceptable because the PIN-wrapped copy never leaves this process: it is
+# held in memory, usable for a bounded window after the lock and a few tries, then dropped. the
+# master password's wrapped VMK and KDF params on disk are untouched.
+# the PIN also belongs to the client session that enrolled it: only that session's lock arms it and
+# only that session can use or drop it, so a new session can't take over someone else's PIN window.
+# the try limit is what makes a short PIN acceptable, so a try is counted before its KDF runs and
+# guesses are checked one at a time under the lock: a burst of requests can't all get past the check.
+#####
+
+QUICK_UNLOCK_KDF_PARAMS = {"time_cost": 1, "memory_cost": 8192, "parallelism": 1}
+QUICK_UNLOCK_WINDOW_SECONDS = 15 * 60
+QUICK_UNLOCK_MAX_ATTEMPTS = 3
+MIN_PIN_LENGTH = 4
+MAX_PIN_LENGTH = 12
+
+
+def validate_pin(pin) -> Optional[str]:
+    # Returns an error message, or None when the PIN is usable
+    if not isinstance(pin, str) or not pin.isdigit():
+        return "PIN must be digits only"
+    if not MIN_PIN_LENGTH <= len(pin) <= MAX_PIN_LENGTH:
+        return f"PIN must be {MIN_PIN_LENGTH} to {MAX_PIN_LENGTH} digits"
+    return None
+
+
+class QuickUnlock:
+    """
+    The PIN-wrapped VMK for one account in one client session. enroll() while unlocked, arm() when
+    the vault locks, unlock() inside the window. Running out of tries or time forgets the wrapped key.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = QUICK_UNLOCK_WINDOW_SECONDS,
+        max_attempts: int = QUICK_UNLOCK_MAX_ATTEMPTS,
+    ):
+        self.window_seconds = window_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.username: Optional[str] = None
+            self.session = None
+            self._salt: Optional[bytes] = None
+            self._wrapped_vmk: Optional[bytes] = None
+            self.expires_at: Optional[float] = None
+            self.attempts_left = 0
+
+    @property
+    def enrolled(self) -> bool:
+        return self._wrapped_vmk is not None
+
+    def enroll(self, username: str, vmk: bytes, pin: str, session=None):
+        error = validate_pin(pin)
+        if error:
+            raise ValueError(error)
+        salt = os.urandom(16)
+        wrapped_vmk = wrap_vmk(derive_wrap_key(pin, salt, QUICK_UNLOCK_KDF_PARAMS), vmk)
+        with self._lock:
+            self._wrapped_vmk = wrapped_vmk
+            self._salt = salt
+            self.username = username
+            self.session = session
+            self.expires_at = None
+            self.attempts_left = 0
+
+    def arm(self, now: Optional[float] = None):
+        """Open the quick-unlock window, called when the vault locks."""
+        with self._lock:
+            if self.enrolled:
+                self.expires_at = (now if now is not None else time.time()) + self.window_seconds
+                self.attempts_left = self.max_attempts
+
+    def belongs_to(self, session) -> bool:
+        with self._lock:
+            return self.enrolled and self.session is session
+
+    def available(self, now: Optional[float] = None) -> bool:
+        with self._lock:
+            if not self.enrolled or self.expires_at is None:
+                return False
+            if (now if now is not None else time.time()) >= self.expires_at or self.attempts_left <= 0:
+                self.clear()
+                return False
+            return True
+
+    def unlock(self, pin: str, now: Optional[float] = None) -> Optional[bytes]:
+        """The VMK for a correct PIN inside the window, otherwise None (and one try fewer)."""
+        with self._lock:
+            if not self.available(now):
+                return None
+            # the try is spent before the KDF runs, whatever the outcome
+            self.attempts_left -= 1
+            try:
+                vmk = unwrap_vmk(derive_wrap_key(str(pin), self._salt, QUICK_UNLOCK_KDF_PARAMS), self._wrapped_vmk)
+            except Exception:
+                if self.attempts_left <= 0:
+                    self.clear()
+                return None
+            # stays enrolled for the next lock, but the window is spent
+            self.expires_at = None
+            self.attempts_left = 0
+            return vmk
+
+    def status(self, now: Optional[float] = None) -> Dict:
+        now = now if now is not None else time.time()
+        with self._lock:
+            available = self.available(now)
+            return {
+                "enrolled": self.enrolled,
+                "available": available,
+                "username": self.username if available else None,
+                "expires_in": int(self.expires_at - now) if available else 0,
+                "attempts_left": self.attempts_left if available else 0,
+            }
@@ -0,0 +1,117 @@
+import os
+from typing import Dict, List, Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from passwordmanager.core.ownership import owner_filter
+
+
+#####
+# compact binary AEAD records for the credentials.password BLOB
+# layout: version byte (0x01) | 12-byte random nonce | AES-256-GCM ciphertext | 16-byte tag, with the
+# version byte as associated data. that is 29 bytes on top of the plaintext, where a Fernet token is
+# base64 text of version, timestamp, IV, padded AES-CBC ciphertext and HMAC (~1.33x plus ~60 bytes).
+# Fernet tokens always start with "g" (base64 of their 0x80 version byte), so both formats can sit in
+# the same column: old rows keep decrypting and turn into records the next time they are written.
+#####
+
+RECORD_VERSION = 0x01
+RECORD_HEADER = bytes([RECORD_VERSION])
+NONCE_SIZE = 12
+TAG_SIZE = 16
+RECORD_OVERHEAD = len(RECORD_HEADER) + NONCE_SIZE + TAG_SIZE
+RECORD_KEY_INFO = b"passwordmanager/record-aead/v1"
+MIGRATION_BATCH_SIZE = 500
+
+
+def derive_record_key(vmk: bytes) -> bytes:
+    # own HKDF label, like the reuse key, so the AEAD key is independent of the Fernet keys
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=RECORD_KEY_INFO).derive(bytes(vmk))
+
+
+def is_record(token) -> bool:
+    return bool(token) and bytes(token[:1]) == RECORD_HEADER
+
+
+class RecordCipher:
+    """Writes AEAD records, reads both records and legacy Fernet tokens. Raises InvalidToken like Fernet."""
+
+    def __init__(self, vmk: bytes):
+        self._fernet = Fernet(vmk)
+        self._aead = AESGCM(derive_record_key(vmk))
+
+    def encrypt(self, data: bytes) -> bytes:
+        nonce = os.urandom(NONCE_SIZE)
+        return RECORD_HEADER + nonce + self._aead.encrypt(nonce, data, RECORD_HEADER)
+
+    def decrypt(self, token) -> bytes:
+        if isinstance(token, str):
+            token = token.encode()
+        token = bytes(token)
+        if not is_record(token):
+            return self._fernet.decrypt(token)
+        if len(token) < RECORD_OVERHEAD:
+            raise InvalidToken
+        nonce = token[1:1 + NONCE_SIZE]
+        try:
+            return self._aead.decrypt(nonce, token[1 + NONCE_SIZE:], RECORD_HEADER)
+        except InvalidTag:
+            raise InvalidToken
+
+
+class MultiRecordCipher:
+    """Encrypts with the first cipher, decrypts with whichever one fits (the MultiFernet idea)."""
+
+    def __init__(self, ciphers: List[RecordCipher]):
+        if not ciphers:
+            raise ValueError("at least one cipher is required")
+        self._ciphers = list(ciphers)
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._ciphers[0].encrypt(data)
+
+    def decrypt(self, token) -> bytes:
+        for cipher in self._ciphers:
+            try:
+                return cipher.decrypt(token)
+            except InvalidToken:
+                pass
+        raise InvalidToken
+
+
+def migrate_records(
+    c, cipher, batch_size: int = MIGRATION_BATCH_SIZE, *, owner: Optional[str]
+) -> Dict[str, int]:
+    """
+    Rewrite every legacy Fernet token the cipher can open as a record, committing after each batch
+    so it can be stopped and re-run at any point. Rows the cipher can't open are counted as skipped.
+    """
+    migrated = 0
+    skipped = 0
+    last_id = 0
+    mine, params = owner_filter(owner)
+    while True:
+        c.execute(
+            f"SELECT id, password FROM credentials WHERE {mine} AND id > ? AND substr(password, 1, 1) != ? ORDER BY id LIMIT ?",
+            params + (last_id, RECORD_HEADER, batch_size),
+        )
+        rows = c.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        rewritten = []
+        for cred_id, token in rows:
+            try:
+                rewritten.append((cipher.encrypt(cipher.decrypt(token)), cred_id))
+            except Exception:
+                skipped += 1
+        c.executemany("UPDATE credentials SET password = ? WHERE id = ?", rewritten)
+        c.connection.commit()
+        migrated += len(rewritten)
+
+    return {"migrated": migrated, "skipped": skipped}
@@ -0,0 +1,98 @@
+import hashlib
+import hmac
+from typing import Dict, List, Optional
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from passwordmanager.core.ownership import owner_filter
+
+
+#####
+# keyed hash index for reused-password detection
+# every credential stores HMAC-SHA256(reuse_key, password) next to its Fernet token. the key is
+# derived from the VMK, so the column means nothing without the vault key, yet equal passwords
+# get equal hashes and reuse groups become a single indexed GROUP BY with nothing to decrypt
+#####
+
+REUSE_KEY_INFO = b"passwordmanager/password-reuse-index/v1"
+BACKFILL_BATCH_SIZE = 500
+
+
+def derive_reuse_key(vmk: bytes) -> bytes:
+    # HKDF with its own info label, so the reuse key never equals (or reveals) the encryption key
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=REUSE_KEY_INFO).derive(bytes(vmk))
+
+
+def password_fingerprint(reuse_key: Optional[bytes], password: str) -> Optional[bytes]:
+    if reuse_key is None:
+        return None
+    return hmac.new(reuse_key, password.encode("utf-8"), hashlib.sha256).digest()
+
+
+def backfill_fingerprints(
+    c,
+    cipher: Optional[object],
+    reuse_key: Optional[bytes],
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    *,
+    owner: Optional[str],
+) -> Dict[str, int]:
+    """
+    Fill password_hmac for rows written before the index existed (or without a key).
+    Works in batches and only touches rows that are still missing a hash, so it can be re-run at any time.
+    """
+    updated = 0
+    errors = 0
+    if cipher is None or reuse_key is None:
+        return {"updated": 0, "errors": 0}
+
+    mine, params = owner_filter(owner)
+    last_id = 0
+    while True:
+        c.execute(
+            f"SELECT id, password FROM credentials WHERE {mine} AND password_hmac IS NULL AND id > ? ORDER BY id LIMIT ?",
+            params + (last_id, batch_size),
+        )
+        rows = c.fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        fingerprints = []
+        for cred_id, encrypted_password in rows:
+            try:
+                password = cipher.decrypt(encrypted_password).decode()
+            except Exception:
+                errors += 1
+                continue
+            fingerprints.append((password_fingerprint(reuse_key, password), cred_id))
+        c.executemany("UPDATE credentials SET password_hmac = ? WHERE id = ?", fingerprints)
+        updated += len(fingerprints)
+
+    return {"updated": updated, "errors": errors}
+
+
+def find_reused(c, owner: Optional[str] = None) -> List[Dict]:
+    """Groups of credentials sharing a password, largest first. Reads only the index, decrypts nothing."""
+    mine, params = owner_filter(owner)
+    c.execute(
+        f"""
+        SELECT id, site, username, password_hmac FROM credentials
+        WHERE {mine} AND password_hmac IN (
+            SELECT password_hmac FROM credentials
+            WHERE {mine} AND password_hmac IS NOT NULL
+            GROUP BY password_hmac
+            HAVING COUNT(*) > 1
+        )
+        ORDER BY password_hmac, id
+        """,
+        params + params,
+    )
+    groups: Dict[bytes, List[Dict]] = {}
+    for cred_id, site, username, fingerprint in c.fetchall():
+        groups.setdefault(fingerprint, []).append({"id": cred_id, "site": site, "username": username})
+
+    reused = [{"count": len(entries), "credentials": entries} for entries in groups.values()]
+    reused.sort(key=lambda group: -group["count"])
+    return reused
@@ -0,0 +1,136 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from passwordmanager.core.ownership import owner_filter
+from passwordmanager.core.reuse_index import password_fingerprint
+
+
+#####
+# vault master key (VMK) rotation
+# a new VMK is generated and wrapped with the same master-password key as the old one, and parked in
+# vmk_rotation until every credential has been re-encrypted. rows are rewritten in id order, one batch
+# per transaction, and the batch commits together with the last processed id, so an interrupted
+# rotation picks up where it stopped. while it runs, callers read with MultiRecordCipher([new, old]), so both
+# rewritten and pending rows decrypt. the new wrapped VMK only replaces the old one once the last
+# batch is done.
+#####
+
+ROTATION_BATCH_SIZE = 200
+
+
+def get_rotation(c, username: str) -> Optional[Dict]:
+    c.execute(
+        """
+        SELECT new_wrapped_vmk, last_id, total, done, skipped, started_at
+        FROM vmk_rotation WHERE username = ?
+        """,
+        (username,),
+    )
+    row = c.fetchone()
+    if not row:
+        return None
+    new_wrapped_vmk, last_id, total, done, skipped, started_at = row
+    return {
+        "new_wrapped_vmk": new_wrapped_vmk,
+        "last_id": last_id,
+        "total": total,
+        "done": done,
+        "skipped": skipped,
+        "started_at": started_at,
+    }
+
+
+def start_rotation(
+    c, username: str, new_wrapped_vmk: bytes, now: Optional[datetime] = None, *, owner: Optional[str]
+) -> Dict:
+    """Record a pending rotation. The caller commits, and only then starts rewriting rows."""
+    mine, params = owner_filter(owner)
+    c.execute(f"SELECT COUNT(*) FROM credentials WHERE {mine}", params)
+    total = c.fetchone()[0]
+    c.execute(
+        """
+        INSERT INTO vmk_rotation (username, new_wrapped_vmk, last_id, total, done, skipped, started_at)
+        VALUES (?, ?, 0, ?, 0, 0, ?)
+        """,
+        (username, new_wrapped_vmk, total, now or datetime.utcnow()),
+    )
+    return get_rotation(c, username)
+
+
+def rotate_batch(
+    c,
+    username: str,
+    read_cipher,
+    new_cipher,
+    new_reuse_key: Optional[bytes],
+    batch_size: int = ROTATION_BATCH_SIZE,
+    *,
+    owner: Optional[str],
+) -> Dict:
+    """
+    Re-encrypt the next batch of rows with new_cipher and move the progress marker past them.
+    Rows read_cipher can't open (another account's, or damaged) are left alone and counted as skipped.
+    Re-running a batch is harmless, a row that already uses the new key just gets a fresh token.
+    Each row is only replaced if it still holds the token that was read: a row some request rewrote
+    in the meantime already uses the new key (every session writes with it while the rotation runs)
+    and counts as done. The caller commits after each call; "finished" is set once there is nothing left.
+    """
+    state = get_rotation(c, username)
+    if state is None:
+        raise ValueError("no rotation in progress")
+
+    mine, params = owner_filter(owner)
+    c.execute(
+        f"SELECT id, password FROM credentials WHERE {mine} AND id > ? ORDER BY id LIMIT ?",
+        params + (state["last_id"], batch_size),
+    )
+    rows = c.fetchall()
+    if not rows:
+        return dict(state, finished=True)
+
+    rewritten = []
+    skipped = 0
+    for cred_id, token in rows:
+        try:
+            password = read_cipher.decrypt(token).decode()
+        except Exception:
+            skipped += 1
+            continue
+        rewritten.append((
+            new_cipher.encrypt(password.encode()),
+            password_fingerprint(new_reuse_key, password),
+            cred_id,
+            token,
+        ))
+    c.executemany("UPDATE credentials SET password = ?, password_hmac = ? WHERE id = ? AND password = ?", rewritten)
+    c.execute(
+        "UPDATE vmk_rotation SET last_id = ?, done = done + ?, skipped = skipped + ? WHERE username = ?",
+        (rows[-1][0], len(rewritten), skipped, username),
+    )
+    return dict(get_rotation(c, username), finished=False)
+
+
+def finish_rotation(c, username: str):
+    """Swap the new wrapped VMK in and drop the rotation record, in the caller's transaction."""
+    c.execute(
+        """
+        UPDATE user_metadata
+        SET wrapped_vmk = (SELECT new_wrapped_vmk FROM vmk_rotation WHERE username = ?)
+        WHERE username = ? AND EXISTS (SELECT 1 FROM vmk_rotation WHERE username = ?)
+        """,
+        (username, username, username),
+    )
+    c.execute("DELETE FROM vmk_rotation WHERE username = ?", (username,))
+
+
+def rotation_progress(state: Optional[Dict]) -> Dict:
+    """The public view of a rotation record (never the wrapped key)."""
+    if state is None:
+        return {"rotating": False}
+    return {
+        "rotating": True,
+        "total": state["total"],
+        "done": state["done"],
+        "skipped": state["skipped"],
+        "last_id": state["last_id"],
+    }
@@ -0,0 +1,51 @@
+import re
+from typing import List, Tuple
+
+
+#####
+# full-text search over site/username (metadata only, nothing is decrypted)
+# served from the credentials_fts index where SQLite has FTS5, otherwise from LIKE scans.
+# every term has to match the start of a word (FTS) or any part (LIKE) of the site or username.
+#####
+
+
+def search_terms(query: str) -> List[str]:
+    # split the query the same way the unicode61 tokenizer splits the columns
+    return [term.lower() for term in re.findall(r"[^\W_]+", query or "")]
+
+
+def search_metadata(
+    c, terms: List[str], owner: str, fts_available: bool, limit: int = -1, offset: int = 0
+) -> Tuple[int, List[Tuple]]:
+    """Total match count and one page of (id, site, username, created_at) rows, best match first. limit -1 is all."""
+    if not terms:
+        return 0, []
+
+    if fts_available:
+        # terms are plain word characters, so quoting them is enough to keep FTS syntax out
+        match = " ".join(f'"{term}"*' for term in terms)
+        c.execute("""
+            SELECT COUNT(*) FROM credentials_fts
+            JOIN credentials cr ON cr.id = credentials_fts.rowid
+            WHERE credentials_fts MATCH ? AND cr.owner = ?
+        """, (match, owner))
+        total = c.fetchone()[0]
+        # bm25 is lower-is-better, a site hit weighs twice a username hit
+        c.execute("""
+            SELECT cr.id, cr.site, cr.username, cr.created_at
+            FROM credentials_fts
+            JOIN credentials cr ON cr.id = credentials_fts.rowid
+            WHERE credentials_fts MATCH ? AND cr.owner = ?
+            ORDER BY bm25(credentials_fts, 2.0, 1.0), cr.id
+            LIMIT ? OFFSET ?
+        """, (match, owner, limit, offset))
+    else:
+        where = " AND ".join(["owner = ?"] + ["(site LIKE ? OR username LIKE ?)"] * len(terms))
+        params = [owner] + [f"%{term}%" for term in terms for _ in range(2)]
+        c.execute(f"SELECT COUNT(*) FROM credentials WHERE {where}", params)
+        total = c.fetchone()[0]
+        c.execute(
+            f"SELECT id, site, username, created_at FROM credentials WHERE {where} ORDER BY site, id LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+    return total, c.fetchall()
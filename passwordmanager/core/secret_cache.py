@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from passwordmanager.core.secure_cleanup import zero_bytearray_in_memory
+
+
+#####
+# short-lived cache of decrypted passwords
+# the GUI asks for the same credential several times in a row (list, open for edit, copy, delete),
+# and every one of those used to be a fresh decrypt. entries are keyed by credential id and the row's
+# revision, which is simply its stored token: every write produces a new token (fresh nonce), so an
+# updated or re-encrypted row can never be answered from a stale entry. plaintext is kept in
+# bytearrays and zeroed when it expires, is evicted, or the cache is cleared (lock, logout, exit).
+#####
+
+SECRET_CACHE_MAX_ENTRIES = 256
+SECRET_CACHE_TTL_SECONDS = 60
+
+
+class SecretCache:
+    """Bounded LRU of decrypted secrets with a time-to-live. Safe to share between threads."""
+
+    def __init__(self, max_entries: int = SECRET_CACHE_MAX_ENTRIES, ttl_seconds: float = SECRET_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # id -> (revision, bytearray, expires_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, cred_id: int, revision, now: Optional[float] = None) -> Optional[bytes]:
+        now = now if now is not None else time.time()
+        with self._lock:
+            entry = self._entries.get(cred_id)
+            if entry is None:
+                return None
+            cached_revision, secret, expires_at = entry
+            if cached_revision != revision or now >= expires_at:
+                self._drop(cred_id)
+                return None
+            self._entries.move_to_end(cred_id)
+            return bytes(secret)
+
+    def put(self, cred_id: int, revision, secret: bytes, now: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._drop(cred_id)
+            self._entries[cred_id] = (revision, bytearray(secret), now + self.ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def discard(self, cred_id: int):
+        with self._lock:
+            self._drop(cred_id)
+
+    def purge_expired(self, now: Optional[float] = None):
+        with self._lock:
+            self._drop_expired(now if now is not None else time.time())
+
+    def clear(self):
+        with self._lock:
+            while self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, cred_id: int):
+        entry = self._entries.pop(cred_id, None)
+        if entry is not None:
+            zero_bytearray_in_memory(entry[1])
+
+    def _drop_expired(self, now: float):
+        for cred_id in [key for key, entry in self._entries.items() if now >= entry[2]]:
+            self._drop(cred_id)
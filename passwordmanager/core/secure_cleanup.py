@@ -1,5 +1,6 @@
 import ctypes
 import atexit
+import sys
 
 def zero_bytearray_in_memory(data):
     if data is None or not isinstance(data, bytearray):
@@ -11,22 +12,33 @@ def zero_bytearray_in_memory(data):
         data[:] = b'\x00' * len(data)
 
 def cleanup_secrets():
-    from passwordmanager.api.routes import current_vmk, current_vmk_cipher
+    # nothing to wipe if the API was never loaded, and importing it during shutdown would fail
+    routes = sys.modules.get("passwordmanager.api.routes")
+    if routes is None:
+        return
     
-    if current_vmk is not None:
-        if isinstance(current_vmk, bytearray):
-            zero_bytearray_in_memory(current_vmk)
-        elif isinstance(current_vmk, bytes):
-            ba = bytearray(current_vmk)
+    for session in routes.sessions.all():
+        state = session.snapshot()
+        session.close()
+        _zero_session_keys(state.vmk, state.cipher)
+
+def _zero_session_keys(vmk, cipher):
+    if vmk is not None:
+        if isinstance(vmk, bytearray):
+            zero_bytearray_in_memory(vmk)
+        elif isinstance(vmk, bytes):
+            ba = bytearray(vmk)
             zero_bytearray_in_memory(ba)
         
-    if current_vmk_cipher is not None:
-        if hasattr(current_vmk_cipher, '_signing_key') and current_vmk_cipher._signing_key is not None:
-            key = current_vmk_cipher._signing_key
+    # session ciphers wrap a Fernet for legacy tokens, older code held the Fernet itself
+    cipher = getattr(cipher, '_fernet', cipher)
+    if cipher is not None:
+        if hasattr(cipher, '_signing_key') and cipher._signing_key is not None:
+            key = cipher._signing_key
             ba = bytearray(key)
             zero_bytearray_in_memory(ba)
-        if hasattr(current_vmk_cipher, '_encryption_key') and current_vmk_cipher._encryption_key is not None:
-            key = current_vmk_cipher._encryption_key
+        if hasattr(cipher, '_encryption_key') and cipher._encryption_key is not None:
+            key = cipher._encryption_key
             ba = bytearray(key)
             zero_bytearray_in_memory(ba)
 
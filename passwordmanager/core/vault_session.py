@@ -0,0 +1,137 @@
+import secrets
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from passwordmanager.core.secret_cache import SecretCache
+
+
+#####
+# per-client vault state
+# every client works in a session: who is logged in, their VMK, the cipher and reuse key derived from
+# it, and the decrypted-secret cache. a session's fields only change together under its lock, and
+# request handlers read one snapshot at the start, so a lock or key swap on another thread can never
+# leave a request with the user of one state and the cipher of another.
+# clients that don't send a session token share the default session, which is how the GUI works.
+# others create their own with POST /session and pass it back in the X-Vault-Session header.
+#####
+
+SESSION_HEADER = "X-Vault-Session"
+MAX_SESSIONS = 64
+
+
+class SessionState(NamedTuple):
+    locked: bool
+    username: Optional[str]
+    vmk: Optional[bytes]
+    cipher: object
+    reuse_key: Optional[bytes]
+    cache: SecretCache
+
+
+class VaultSession:
+    def __init__(self, token: Optional[str] = None):
+        self.token = token
+        self.cache = SecretCache()
+        self.last_activity = time.time()
+        self._lock = threading.RLock()
+        self._state = SessionState(True, None, None, None, None, self.cache)
+
+    def snapshot(self) -> SessionState:
+        with self._lock:
+            return self._state
+
+    @property
+    def locked(self) -> bool:
+        return self.snapshot().locked
+
+    @property
+    def username(self) -> Optional[str]:
+        return self.snapshot().username
+
+    @property
+    def vmk(self) -> Optional[bytes]:
+        return self.snapshot().vmk
+
+    @property
+    def cipher(self):
+        return self.snapshot().cipher
+
+    def open(self, username: str, vmk: bytes, cipher, reuse_key: bytes):
+        with self._lock:
+            self.cache.clear()
+            self._state = SessionState(False, username, vmk, cipher, reuse_key, self.cache)
+            self.last_activity = time.time()
+
+    def close(self) -> Optional[str]:
+        """Lock and forget the keys. Returns who was logged in, if anyone."""
+        with self._lock:
+            username = self._state.username
+            self._state = SessionState(True, None, None, None, None, self.cache)
+            self.cache.clear()
+            return username
+
+    def unlock(self):
+        # legacy /unlock: lifts the lock flag, the keys still need a login
+        with self._lock:
+            self._state = self._state._replace(locked=False)
+
+    def set_keys(self, username: str, cipher, reuse_key: bytes, vmk: Optional[bytes] = None) -> bool:
+        """Swap keys in if username is still logged in here (used by VMK rotation)."""
+        with self._lock:
+            if self._state.locked or self._state.username != username:
+                return False
+            self._state = self._state._replace(
+                cipher=cipher, reuse_key=reuse_key, vmk=vmk if vmk is not None else self._state.vmk
+            )
+            return True
+
+    def touch(self, now: Optional[float] = None):
+        self.last_activity = now if now is not None else time.time()
+
+
+class SessionStore:
+    """
+    The default session plus token sessions. At max_sessions the least recently used session that
+    holds no keys makes room for a new one; while every one of them is logged in, create() refuses.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.default = VaultSession()
+        self._sessions: Dict[str, VaultSession] = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> Optional[VaultSession]:
+        """A new token session, or None when the store is full of logged-in sessions."""
+        session = VaultSession(secrets.token_urlsafe(32))
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                # anyone can ask for a session, so never push out one that is in use
+                keyless = [s for s in self._sessions.values() if s.cipher is None]
+                if not keyless:
+                    return None
+                oldest = min(keyless, key=lambda s: s.last_activity)
+                del self._sessions[oldest.token]
+                oldest.close()
+            self._sessions[session.token] = session
+        return session
+
+    def get(self, token: Optional[str]) -> Optional[VaultSession]:
+        if not token:
+            return self.default
+        with self._lock:
+            return self._sessions.get(token)
+
+    def remove(self, session: VaultSession):
+        session.close()
+        if session.token is not None:
+            with self._lock:
+                self._sessions.pop(session.token, None)
+
+    def all(self) -> List[VaultSession]:
+        with self._lock:
+            return [self.default] + list(self._sessions.values())
+
+    def for_user(self, username: str) -> List[VaultSession]:
+        return [session for session in self.all() if session.username == username]
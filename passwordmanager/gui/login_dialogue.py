@@ -46,12 +46,27 @@ class LoginDialog(QDialog):
         self.confirm_password.setEchoMode(QLineEdit.EchoMode.Password)
         self.confirm_password_label.setVisible(False)
         self.confirm_password.setVisible(False)
+
+        # PIN mode replaces the master password row while a quick unlock is available
+        self.password_label = QLabel("Master Password:")
+        self.pin_label = QLabel("PIN:")
+        self.pin = QLineEdit()
+        self.pin.setMinimumHeight(30)
+        self.pin.setEchoMode(QLineEdit.EchoMode.Password)
+        self.pin_label.setVisible(False)
+        self.pin.setVisible(False)
         
         form.addRow("Username:", self.username)
-        form.addRow("Master Password:", self.password)
+        form.addRow(self.password_label, self.password)
+        form.addRow(self.pin_label, self.pin)
         form.addRow(self.confirm_password_label, self.confirm_password)
         layout.addLayout(form)
 
+        self.use_password_btn = QPushButton("Use master password instead")
+        self.use_password_btn.setFlat(True)
+        self.use_password_btn.setVisible(False)
+        layout.addWidget(self.use_password_btn, alignment=Qt.AlignmentFlag.AlignRight)
+
         layout.addSpacing(20)
 
         buttons = QHBoxLayout()
@@ -72,6 +87,8 @@ class LoginDialog(QDialog):
 
         self.login_btn.clicked.connect(self.handle_login)
         self.create_btn.clicked.connect(self.handle_create)
+        self.pin.returnPressed.connect(self.handle_login)
+        self.use_password_btn.clicked.connect(lambda: self.set_pin_mode(False))
         
         self.password.textChanged.connect(self._on_password_changed)
         self.confirm_password.textChanged.connect(self._on_confirm_password_changed)
@@ -82,11 +99,15 @@ class LoginDialog(QDialog):
         self.lockout_timer.setInterval(1000)
         
         self.lockout_until_timestamp = None
+        # set when the vault was auto-locked and can be re-opened with a PIN
+        self.quick_unlock_user = None
+        self.pin_mode = False
 
         theme_manager.apply_theme_to_window(self, theme_manager.current_mode)
         self.center()
         
         QTimer.singleShot(100, self.check_lockout_status)
+        QTimer.singleShot(100, self.check_quick_unlock)
     
     def _format_time_remaining(self, seconds):
         if seconds <= 0:
@@ -158,7 +179,69 @@ class LoginDialog(QDialog):
             self.status.setText("")
             self.status.setStyleSheet("")
 
+    def check_quick_unlock(self):
+        try:
+            status = apiCallerMethods.quick_unlock_status()
+        except Exception:
+            return
+        if status.get("available"):
+            self.quick_unlock_user = status.get("username")
+            self.username.setText(self.quick_unlock_user or "")
+            self.set_pin_mode(True)
+            self.status.setText("Vault locked. Enter your PIN.")
+            self.status.setStyleSheet("")
+
+    def set_pin_mode(self, enabled):
+        # the PIN only re-opens the locked account, and never goes to the master password login
+        self.pin_mode = enabled
+        self.pin.clear()
+        self.pin_label.setVisible(enabled)
+        self.pin.setVisible(enabled)
+        self.use_password_btn.setVisible(enabled)
+        self.password_label.setVisible(not enabled)
+        self.password.setVisible(not enabled)
+        self.username.setReadOnly(enabled)
+        if enabled:
+            self.hide_create_mode()
+            self.pin.setFocus()
+        else:
+            self.quick_unlock_user = None
+            self.status.setText("")
+            self.status.setStyleSheet("")
+            self.password.setFocus()
+
+    def handle_quick_unlock(self):
+        pin = self.pin.text()
+        if not pin:
+            self.status.setText("Please enter your PIN")
+            self.status.setStyleSheet("")
+            return
+        try:
+            resp = apiCallerMethods.quick_unlock(pin)
+        except Exception as e:
+            self.status.setText(f"Error: {e}")
+            self.status.setStyleSheet("")
+            return
+        if resp.get("status") == "logged in":
+            self.accept()
+            return
+        attempts_left = resp.get("attempts_left", 0)
+        if attempts_left > 0:
+            self.pin.clear()
+            self.status.setText(f"Incorrect PIN, {attempts_left} attempt{'s' if attempts_left != 1 else ''} left")
+            self.status.setStyleSheet("color: red;")
+            return
+        # out of tries or the window closed: the PIN is gone, only the master password opens the vault now
+        self.set_pin_mode(False)
+        message = "Incorrect PIN. " if "attempts_left" in resp else "Quick unlock expired. "
+        self.status.setText(message + "Enter your master password.")
+        self.status.setStyleSheet("color: red;")
+
     def handle_login(self):
+        if self.pin_mode:
+            self.handle_quick_unlock()
+            return
+
         self.hide_create_mode()
         username = self.username.text()
         if not username:
@@ -206,6 +289,8 @@ class LoginDialog(QDialog):
             self.check_lockout_status()
 
     def handle_create(self):
+        if self.pin_mode:
+            self.set_pin_mode(False)
         username = self.username.text()
         password = self.password.text()
         confirm = self.confirm_password.text()
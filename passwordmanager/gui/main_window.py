@@ -3,11 +3,12 @@ from PyQt6.QtWidgets import (
     QDialog, QLineEdit, QFormLayout, QHBoxLayout,
     QTableWidget, QTableWidgetItem, QHeaderView
 )
-from PyQt6.QtCore import Qt, QPoint, QSettings
+from PyQt6.QtCore import Qt, QPoint, QSettings, QTimer
 from PyQt6.QtGui import QFont, QIcon
 import sys
 from passwordmanager.api import apiCallerMethods
 from passwordmanager.utils.theme_manager import theme_manager
+from passwordmanager.utils.startup_trace import startup_trace
 from resources.colors import Colors
 from resources.strings import Strings
 from passwordmanager.gui.widgets.listCredentialsWidget import ListCredentialsWidget
@@ -54,6 +55,12 @@ class MainWindow(QMainWindow):
         # Connect buttons
         self.add_button.clicked.connect(self.open_add_dialog)
         self.logout_button.clicked.connect(self.handle_logout)
+
+        # the API locks an idle vault on its own; notice that and ask for the PIN or password again
+        self.lock_timer = QTimer(self)
+        self.lock_timer.setInterval(5000)
+        self.lock_timer.timeout.connect(self.check_auto_lock)
+        self.lock_timer.start()
         
         # Apply initial theme after all widgets are created
         theme_manager.apply_theme_to_window(self, theme_manager.current_mode)
@@ -151,6 +158,20 @@ class MainWindow(QMainWindow):
     
     def handle_logout(self):
         apiCallerMethods.account_logout()
+        self.show_login()
+
+    def check_auto_lock(self):
+        if not self.isVisible():
+            return
+        try:
+            status = apiCallerMethods.get_status()
+        except Exception:
+            return
+        if isinstance(status, dict) and status.get("vault_locked"):
+            self.show_login()
+
+    def show_login(self):
+        self.lock_timer.stop()
         self.hide()
         login = LoginDialog()
         result = login.exec()
@@ -159,6 +180,7 @@ class MainWindow(QMainWindow):
             theme_manager.apply_theme_to_window(self, theme_manager.current_mode)
             self.show()
             self.refresh_credentials()
+            self.lock_timer.start()
         else:
             self.close()
     
@@ -180,5 +202,6 @@ class MainWindow(QMainWindow):
         # Ensure theme is applied correctly when window is shown
         theme_manager.apply_theme_to_window(window, theme_manager.current_mode)
         window.show()
+        startup_trace.mark("main_window_shown")
         window.refresh_credentials()
         app.exec()
\ No newline at end of file
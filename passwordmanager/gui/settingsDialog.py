@@ -2,7 +2,7 @@ from PyQt6.QtWidgets import (
     QApplication,
     QPushButton, QVBoxLayout, QLabel,
     QDialog, QLineEdit, QFormLayout, QHBoxLayout, QWidget,
-    QFileDialog, QMessageBox, QRadioButton, QButtonGroup, QComboBox, QSlider
+    QFileDialog, QMessageBox, QRadioButton, QButtonGroup, QComboBox, QSlider, QInputDialog
 )
 from PyQt6.QtGui import QFont, QIcon
 from PyQt6.QtCore import Qt, QSettings
@@ -144,6 +144,14 @@ class settingsDialog(QDialog):
 
         form_layout.addRow("Password:", self.change_password_button)
 
+        # Quick unlock PIN, used after the vault auto-locks
+        self.quick_unlock_button = QPushButton("Set PIN")
+        self.quick_unlock_button.setStyleSheet(
+            theme_manager.get_settings_button_style()
+        )
+        self.quick_unlock_button.clicked.connect(self.handle_set_quick_unlock_pin)
+        form_layout.addRow("Quick unlock:", self.quick_unlock_button)
+
         # Export Section
         export_layout = QVBoxLayout()
          
@@ -403,6 +411,30 @@ class settingsDialog(QDialog):
         change_password_window.exec()
         overlay.deleteLater()
 
+    # Quick Unlock PIN
+    def handle_set_quick_unlock_pin(self):
+        if not self.is_vault_unlocked():
+            QMessageBox.information(
+                self, "Vault Locked", "Please unlock and log in to set a PIN."
+            )
+            return
+        pin, ok = QInputDialog.getText(
+            self, "Quick Unlock PIN",
+            "PIN (4-12 digits) to re-open the vault after it locks itself:",
+            QLineEdit.EchoMode.Password,
+        )
+        if not ok or not pin:
+            return
+        try:
+            resp = apiCallerMethods.setup_quick_unlock(pin)
+        except Exception as e:
+            QMessageBox.warning(self, "Quick Unlock", f"Failed to set PIN: {e}")
+            return
+        if resp.get("status"):
+            QMessageBox.information(self, "Quick Unlock", "PIN set. It works until you log out.")
+        else:
+            QMessageBox.warning(self, "Quick Unlock", resp.get("error", "Failed to set PIN"))
+
     # Export/Import Support
     def is_vault_unlocked(self) -> bool:
         try:
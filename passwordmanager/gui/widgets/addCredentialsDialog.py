@@ -6,7 +6,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
 from passwordmanager.api import apiCallerMethods
-from passwordmanager.utils.apiPasswordStrength import get_password_strength
+from passwordmanager.utils.pattern_strength import get_pattern_feedback
+from passwordmanager.utils.breach_checker import get_breach_checker
 from passwordmanager.utils.theme_manager import theme_manager
 from resources.colors import Colors
 from resources.strings import Strings  
@@ -58,6 +59,14 @@ class AddCredentialsDialog(QDialog):
         self.strength_label = QLabel("Password strength: ")
         layout.addWidget(self.strength_label)
 
+        # Breach warning, only shown when a breach list is installed and the password is on it
+        self.breach_checker = get_breach_checker()
+        self.breach_label = QLabel("This password appears in a known data breach.")
+        self.breach_label.setStyleSheet("color: red;")
+        self.breach_label.setWordWrap(True)
+        self.breach_label.hide()
+        layout.addWidget(self.breach_label)
+
         # Buttons
         button_layout = QHBoxLayout()
         
@@ -158,17 +167,21 @@ class AddCredentialsDialog(QDialog):
     # Password strength checker
     def update_strength_label(self):
         password = self.password_input.text()
-        strength = get_password_strength(password)
+        strength, warning = get_pattern_feedback(password)
+        hint = f" ({warning})" if warning and password else ""
 
         if strength == "weak":
-            self.strength_label.setText("Password strength: Weak")
+            self.strength_label.setText(f"Password strength: Weak{hint}")
             self.strength_label.setStyleSheet("color: red;")
         elif strength == "medium":
-            self.strength_label.setText("Password strength: Medium")
+            self.strength_label.setText(f"Password strength: Medium{hint}")
             self.strength_label.setStyleSheet("color: orange;")
         else:
             self.strength_label.setText("Password strength: Strong")
             self.strength_label.setStyleSheet("color: lightgreen;")
+
+        breached = self.breach_checker is not None and self.breach_checker.is_breached(password)
+        self.breach_label.setVisible(breached)
         
     def closeEvent(self, event):
         theme_manager.unregister_window(self)
@@ -4,7 +4,8 @@ from PyQt6.QtWidgets import (
     QMessageBox, QSizePolicy
 )
 from PyQt6.QtGui import QFont, QClipboard, QIcon, QPixmap, QCursor, QTransform
-from PyQt6.QtCore import Qt, QSettings, QPropertyAnimation, QEasingCurve, QSize
+from PyQt6.QtCore import Qt, QSettings, QPropertyAnimation, QEasingCurve, QSize, QTimer, QThread, pyqtSignal
+from PyQt6 import sip
 import sys
 from passwordmanager.api import apiCallerMethods
 from passwordmanager.utils.theme_manager import theme_manager
@@ -12,14 +13,47 @@ from resources.colors import Colors
 from resources.strings import Strings
 from passwordmanager.gui.widgets.editCredentialsDialog import EditCredentialsDialog
 from passwordmanager.gui.settingsDialog import settingsDialog
-from passwordmanager.utils.apiPasswordStrength import get_password_strength
+from passwordmanager.utils.pattern_strength import get_pattern_strength
+from passwordmanager.utils.search_engine import SearchEngine
+from passwordmanager.utils.startup_trace import startup_trace
 from datetime import datetime
 
 # Base sizes before applying display scale
 BASE_CARD_HEIGHT = 45
+# Height of a collapsed card (its top row), the unit the list is scrolled and virtualized in
+CARD_ROW_HEIGHT = 50
 BASE_BUTTON_HEIGHT = 32
 BASE_BUTTON_WIDTH = 30
 
+# How long the search bar waits after the last keystroke before filtering
+SEARCH_DEBOUNCE_MS = 150
+# A search first ranks only the best matches, enough for the first screens; the full ranking
+# follows once typing has paused this long, or as soon as the list is scrolled past the head
+SEARCH_HEAD_SIZE = 100
+SEARCH_TAIL_DELAY_MS = 400
+
+# Fewest cards kept laid out around the visible rows; at least a screenful above and below them
+CARD_CHUNK_SIZE = 40
+# Cards scrolled or filtered out of view are kept for when they come back, up to this many
+CARD_CACHE_LIMIT = 400
+
+
+class CredentialLoader(QThread):
+    """Fetches the credentials and builds their search index off the GUI thread."""
+    loaded = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, generation, parent=None):
+        super().__init__(parent)
+        self.generation = generation
+
+    def run(self):
+        try:
+            credentials = apiCallerMethods.get_all_credentials() or []
+            self.loaded.emit(self.generation, SearchEngine(credentials))
+        except Exception as e:
+            self.failed.emit(self.generation, str(e))
+
 
 class ListCredentialsWidget(QWidget):
     def __init__(self, parent=None):
@@ -29,6 +63,20 @@ class ListCredentialsWidget(QWidget):
 
         # Keep a copy of all credentials for sorting/filtering
         self.all_credentials = []
+        self.search_index = SearchEngine()
+
+        # Cards built for the current load, keyed by position in all_credentials (least recently shown first).
+        # display_positions is what the list shows, in order; only display_positions[window[0]:window[1]]
+        # have their cards laid out, None means the window has to be laid out again
+        self.cards = {}
+        self.display_positions = []
+        self.window = (0, 0)
+        self.status_label = None
+
+        # Background loading: each load gets a generation so a slow, superseded fetch is ignored
+        self.loading = False
+        self.load_generation = 0
+        self.loaders = set()
         
         # Track password visibility states for "show all" feature
         self.password_buttons = []  # List of dicts: {button, password_text, password_copy_button, is_visible}
@@ -43,11 +91,31 @@ class ListCredentialsWidget(QWidget):
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Search")
         self.search_bar.textChanged.connect(self.filter_credentials)
+
+        # debounce searching so a burst of keystrokes results in one filter pass
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_filters)
+
+        # ranks the rest of a search's matches (tail_query) after its head is on screen
+        self.tail_query = None
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setSingleShot(True)
+        self.tail_timer.setInterval(SEARCH_TAIL_DELAY_MS)
+        self.tail_timer.timeout.connect(self.complete_matches)
+
+        # moves the window of built cards once the event loop has had a chance to run
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(0)
+        self.render_timer.timeout.connect(self.render_window)
         top_row.addWidget(self.search_bar, 2)  # take 2/3 of remaining space
         top_row.addSpacing(10)
 
-        # hidden sort combobox (used only for logic)
-        self.sort_dropdown = QComboBox()
+        # hidden sort combobox (used only for logic); parented so it is deleted with the list
+        self.sort_dropdown = QComboBox(self)
+        self.sort_dropdown.hide()
         sort_options = [
             "Sort: Date Added (Newest First)",  # keep API order
             "Sort: Site (A–Z)",
@@ -112,14 +180,18 @@ class ListCredentialsWidget(QWidget):
         self.scroll_area.setWidgetResizable(True)
         self.scroll_area.setStyleSheet("border: none;")
         layout.addWidget(self.scroll_area)
-
-        # inner rectangular container for credentials cards
-        self.credentials_container = QWidget()
-        self.credentials_container.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
-        self.credentials_layout = QVBoxLayout(self.credentials_container)
-        self.credentials_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        self.credentials_layout.setContentsMargins(10, 0, 10, 0)  # Left and right margins
-        self.scroll_area.setWidget(self.credentials_container)
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self.schedule_render)
+        scroll_bar.rangeChanged.connect(self.schedule_render)
+
+        # inner rectangular container for credentials cards. it sits in a holder that never changes, so a
+        # reload can swap in an empty one without reparenting (which walks every card) the old one
+        self.credentials_holder = QWidget()
+        self.holder_layout = QVBoxLayout(self.credentials_holder)
+        self.holder_layout.setContentsMargins(0, 0, 0, 0)
+        self.scroll_area.setWidget(self.credentials_holder)
+        self.credentials_container = None
+        self.new_credentials_container()
 
         self.parentWidget = parent
 
@@ -127,95 +199,234 @@ class ListCredentialsWidget(QWidget):
         theme_manager.apply_theme_to_window(self, theme_manager.current_mode)
 
     def load_credentials(self):
-        """Fetch all credentials from the API and rebuild the list with current filters/sort."""
+        """Fetch all credentials on a worker thread, then rebuild the list with current filters/sort."""
         # reset stored credentials
         self.all_credentials = []
-        self.password_buttons = []
+        self.search_index = SearchEngine()
+        self.clear_cards()
 
-        # clear all previous cards
-        for i in reversed(range(self.credentials_layout.count())):
-            widget = self.credentials_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
-        try:
-            credentials = apiCallerMethods.get_all_credentials()
-            self.all_credentials = credentials or []
-
-            if not self.all_credentials:
-                colors = theme_manager.get_theme_colors()
-                label = QLabel("No credentials stored yet.")
-                label.setStyleSheet(f"color: {colors['text']};")
-                self.credentials_layout.addWidget(label)
-            else:
-                # Apply current search + sort settings
-                self.apply_filters()
+        # reset search bar when reloading data (without triggering a filter pass)
+        self.search_timer.stop()
+        self.search_bar.blockSignals(True)
+        self.search_bar.clear()
+        self.search_bar.blockSignals(False)
+
+        self.loading = True
+        self.load_generation += 1
+        self.show_status_message("Loading credentials...")
+
+        loader = CredentialLoader(self.load_generation, self)
+        loader.loaded.connect(self.on_credentials_loaded)
+        loader.failed.connect(self.on_credentials_failed)
+        # keep a reference until the thread is done, even if a newer load replaces it
+        self.loaders.add(loader)
+        loader.finished.connect(lambda l=loader: self.loaders.discard(l))
+        loader.start()
+
+    def on_credentials_loaded(self, generation, search_index):
+        if generation != self.load_generation:
+            return
+        self.loading = False
+        self.search_index = search_index
+        self.all_credentials = search_index.credentials
 
-        except Exception as e:
-            colors = theme_manager.get_theme_colors()
-            error_label = QLabel(f"Error loading credentials: {e}")
-            error_label.setStyleSheet(f"color: {colors['text']};")
-            self.credentials_layout.addWidget(error_label)
+        # Apply current search + sort settings
+        self.apply_filters()
+        # first list of the session on screen (later loads are ignored by the trace)
+        startup_trace.mark("main_window_populated")
 
-        # reset search bar when reloading data
-        self.search_bar.clear()
+    def on_credentials_failed(self, generation, error):
+        if generation != self.load_generation:
+            return
+        self.loading = False
+        self.show_status_message(f"Error loading credentials: {error}")
 
-    def apply_filters(self):
+    def new_credentials_container(self):
+        """Put an empty container for the cards in place of the current one, styled like it. Returns the old one."""
+        old_container = self.credentials_container
+        self.credentials_container = QWidget()
+        self.credentials_container.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
+        self.credentials_layout = QVBoxLayout(self.credentials_container)
+        self.credentials_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.credentials_layout.setContentsMargins(10, 0, 10, 0)  # Left and right margins
+        # stand-ins for the rows above and below the built window, so the scroll bar covers every row
+        self.top_spacer = QWidget(self.credentials_container)
+        self.bottom_spacer = QWidget(self.credentials_container)
+        self.top_spacer.hide()
+        self.bottom_spacer.hide()
+        if old_container is not None:
+            self.credentials_container.setStyleSheet(old_container.styleSheet())
+            self.holder_layout.removeWidget(old_container)
+        self.holder_layout.addWidget(self.credentials_container)
+        return old_container
+
+    def clear_cards(self, delete_now=False):
         """
-        Apply current search text and sort selection to self.all_credentials,
-        then rebuild the visible cards.
+        Remove every card and message from the list and forget the cached cards.
+        delete_now frees them right away instead of in the event loop; only for callers that aren't
+        running inside one of the cards' own handlers (and would otherwise restyle the old ones).
         """
+        self.render_timer.stop()
+        self.tail_timer.stop()
+        self.tail_query = None
+        # swap the whole container out rather than unparenting card by card, which re-lays-out the
+        # remaining cards each time; the old one and its cards go once control is back in the event loop
+        old_container = self.new_credentials_container()
+        if old_container is not None:
+            old_container.hide()
+            if delete_now:
+                sip.delete(old_container)
+            else:
+                old_container.deleteLater()
         self.password_buttons = []
-        
-        # clear current
-        for i in reversed(range(self.credentials_layout.count())):
-            widget = self.credentials_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-
+        self.cards = {}
+        self.display_positions = []
+        self.window = (0, 0)
+        self.status_label = None
+
+    def show_status_message(self, text):
+        if self.status_label is None:
+            self.status_label = QLabel()
+            self.credentials_layout.addWidget(self.status_label)
         colors = theme_manager.get_theme_colors()
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet(f"color: {colors['text']};")
+        self.status_label.show()
+
+    def hide_status_message(self):
+        if self.status_label is not None:
+            self.status_label.hide()
 
+    def apply_filters(self):
+        """
+        Apply current search text and sort selection to self.all_credentials.
+        Only the rows around the visible part of the list get a card (render_window);
+        scrolling moves that window, so the cost of a pass doesn't grow with the vault.
+        """
+        if self.loading:
+            self.show_status_message("Loading credentials...")
+            return
         if not self.all_credentials:
-            label = QLabel("No credentials stored yet.")
-            label.setStyleSheet(f"color: {colors['text']};")
-            self.credentials_layout.addWidget(label)
+            self.show_status_message("No credentials stored yet.")
             return
 
-        # start from all credentials
-        creds = list(self.all_credentials)
-
-        # 1) Sort
-        sort_text = self.sort_dropdown.currentText()
-
-        # Keep backend order as "Date Added (Newest First)"
-        if "Site (A–Z)" in sort_text:
-            creds.sort(key=lambda c: c.get("site", "").lower())
-        elif "Site (Z–A)" in sort_text:
-            creds.sort(key=lambda c: c.get("site", "").lower(), reverse=True)
-        # else: leave `creds` in the order received from API
-
-        # 2) Filter by search text
-        search = self.search_bar.text().lower().strip()
-        if search:
-            creds = [
-                c for c in creds
-                if search in c.get("site", "").lower()
-                or search in c.get("username", "").lower()
-            ]
-
-        if not creds:
-            label = QLabel("No credentials match your search.")
-            label.setStyleSheet(f"color: {colors['text']};")
-            self.credentials_layout.addWidget(label)
-            return
+        # 1) Filter by search text: matches are shown best first, in the selected sort order otherwise
+        query = self.search_bar.text().strip()
+        self.tail_timer.stop()
+        self.tail_query = None
+        if query:
+            self.display_positions = self.search_index.matches(query, limit=SEARCH_HEAD_SIZE)
+            if len(self.display_positions) == SEARCH_HEAD_SIZE:
+                self.tail_query = query
+                self.tail_timer.start()
+        else:
+            # 2) Sort (cached by the search index per load)
+            sort_text = self.sort_dropdown.currentText()
+
+            # Keep backend order as "Date Added (Newest First)"
+            if "Site (A–Z)" in sort_text:
+                self.display_positions = self.search_index.ordered("site")
+            elif "Site (Z–A)" in sort_text:
+                self.display_positions = self.search_index.ordered("site", reverse=True)
+            else:
+                self.display_positions = self.search_index.ordered()
 
-        # 3) Rebuild cards
-        for cred in creds:
-            self.add_credential_card(cred)
-        
-        # 4) Update show all button state based on stored visibility
+        if not self.display_positions:
+            self.show_status_message("No credentials match your search.")
+        else:
+            self.hide_status_message()
+
+        # 3) Update show all button state based on stored visibility
         self.update_show_all_button_state()
 
+        # 4) Back to the top of the new list and build the cards that are on screen there
+        self.render_timer.stop()
+        self.window = None
+        self.scroll_area.verticalScrollBar().setValue(0)
+        self.render_window()
+
+    def complete_matches(self):
+        """Replace the head of the current search with all of its matches; the head stays where it is."""
+        query = self.tail_query
+        self.tail_timer.stop()
+        self.tail_query = None
+        if query is None or query != self.search_bar.text().strip():
+            return
+        self.display_positions = self.search_index.matches(query)
+        self.window = None
+        self.render_window()
+
+    def row_pitch(self):
+        """Height of a collapsed card plus the gap below it."""
+        return CARD_ROW_HEIGHT + max(0, self.credentials_layout.spacing())
+
+    def schedule_render(self, *_):
+        """Move the window once the scroll position or viewport size settles (coalesces scroll events)."""
+        if not self.render_timer.isActive():
+            self.render_timer.start()
+
+    def render_window(self):
+        """
+        Lay out cards for the visible rows plus a screenful above and below, building the missing
+        ones, and let the spacers stand in for the rest. Nothing happens while the visible rows are
+        still inside the current window.
+        """
+        total = len(self.display_positions)
+        pitch = self.row_pitch()
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        screen_rows = self.scroll_area.viewport().height() // pitch + 1
+        first = min(total, scroll_bar.value() // pitch)
+        last = min(total, first + screen_rows)
+        if self.window is not None and self.window[0] <= first and last <= self.window[1]:
+            return
+
+        margin = max(screen_rows, CARD_CHUNK_SIZE // 2)
+        if self.tail_query is not None and last + margin >= total:
+            # scrolled towards the end of a search's head, rank the rest now (this lays the window out)
+            self.complete_matches()
+            return
+        start = max(0, first - margin)
+        end = min(total, last + margin)
+        old_window = set() if self.window is None else set(self.display_positions[self.window[0]:self.window[1]])
+        self.window = (start, end)
+        window_positions = self.display_positions[start:end]
+
+        for i in reversed(range(self.credentials_layout.count())):
+            self.credentials_layout.takeAt(i)
+        self.top_spacer.setFixedHeight(start * pitch)
+        self.top_spacer.setVisible(start > 0)
+        self.credentials_layout.addWidget(self.top_spacer)
+        for pos in window_positions:
+            card = self.cards.pop(pos, None)
+            if card is None:
+                card = self.add_credential_card(self.all_credentials[pos])
+            # most recently used last, for trimming the cache
+            self.cards[pos] = card
+            self.credentials_layout.addWidget(card)
+            card.show()
+        self.bottom_spacer.setFixedHeight((total - end) * pitch)
+        self.bottom_spacer.setVisible(end < total)
+        self.credentials_layout.addWidget(self.bottom_spacer)
+        if self.status_label is not None:
+            self.credentials_layout.addWidget(self.status_label)
+
+        for pos in old_window.difference(window_positions):
+            if pos in self.cards:
+                self.cards[pos].hide()
+        self.trim_card_cache(len(window_positions))
+
+    def trim_card_cache(self, keep):
+        """Delete the least recently shown cards outside the window once more than CARD_CACHE_LIMIT are kept."""
+        excess = len(self.cards) - keep - CARD_CACHE_LIMIT
+        if excess <= 0:
+            return
+        dropped = set()
+        for pos in list(self.cards)[:excess]:
+            card = self.cards.pop(pos)
+            card.deleteLater()
+            dropped.add(card)
+        self.password_buttons = [p for p in self.password_buttons if p["card"] not in dropped]
+
     # create a rectangular card for one credential
     def add_credential_card(self, cred):
         colors = theme_manager.get_theme_colors()
@@ -253,7 +464,7 @@ class ListCredentialsWidget(QWidget):
             border-radius: 10px;
             padding: 6px;
         """)
-        top_row_widget.setFixedHeight(50)
+        top_row_widget.setFixedHeight(CARD_ROW_HEIGHT)
         top_row_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         top_row = QHBoxLayout(top_row_widget)
         top_row.setContentsMargins(12, 6, 12, 6)
@@ -352,154 +563,165 @@ class ListCredentialsWidget(QWidget):
         top_row.addWidget(password_copy_button)
         top_row.addWidget(dropdown_btn)
         
-        # EXPANDABLE AREA
-        expand_area = QWidget()
-        expand_area.setMaximumHeight(0)  # collapsed initially
-        expand_area.setMinimumHeight(0)
-        expand_area.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
-        # Include tooltip styling in expand_area so buttons inside inherit it
-        expand_area.setStyleSheet(f"""
-            background-color: transparent;
-            QToolTip {{
-                background-color: {colors['card_bg']};
-                color: {colors['text']};
-                border: 1px solid {colors['accent']};
-                padding: 4px;
-            }}
-        """)
-        
-        expand_layout = QHBoxLayout(expand_area)
-        expand_layout.setContentsMargins(10, 8, 10, 12)
-        expand_layout.setSpacing(8)
-        
-        # Password strength label
-        strength_label = QLabel()
-        strength = get_password_strength(password_text)
-        if strength == "weak":
-            strength_label.setText("Password strength: Weak")
-            strength_label.setStyleSheet("color: red; font-size: 13px;")
-        elif strength == "medium":
-            strength_label.setText("Password strength: Medium")
-            strength_label.setStyleSheet("color: orange; font-size: 13px;")
-        else:
-            strength_label.setText("Password strength: Strong")
-            strength_label.setStyleSheet("color: green; font-size: 13px;")
-        strength_label.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Preferred)
-        
-        # Edit button
-        edit_button = QPushButton()
-        edit_icon = QIcon(QPixmap(Strings.EDIT_ICON_PATH))
-        edit_button.setIcon(edit_icon)
-        edit_button.setStyleSheet(theme_manager.get_small_button_style())
-        edit_button.setFixedHeight(btn_height)
-        edit_button.setFixedWidth(btn_width)
-        edit_button.clicked.connect(lambda _, id=cred['id']: self.edit_credential(id))
-        
-        # Delete button
-        delete_button = QPushButton()
-        delete_icon = QIcon(QPixmap(Strings.DELETE_ICON_PATH))
-        delete_button.setIcon(delete_icon)
-        delete_button.setStyleSheet(theme_manager.get_delete_button_style())
-        delete_button.setFixedHeight(btn_height)
-        delete_button.setFixedWidth(btn_width)
-        delete_button.clicked.connect(lambda _, id=cred['id']: self.delete_credential(id))
-        
-        # Date label
-        raw_date = cred.get("created_at")
-        formatted_date = ""
-        if raw_date:
-            try:
-                parsed = datetime.fromisoformat(str(raw_date).replace("Z", "").replace("T", " "))
-                formatted_date = parsed.strftime("%m-%d-%Y")
-            except:
-                formatted_date = str(raw_date) if raw_date else ""
-        
-        date_label = QLabel(f"Added: {formatted_date}")
-        date_label.setStyleSheet(f"color: {colors['text']}; font-size: 13px;")
-        date_label.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Preferred)
-        date_label.setWordWrap(False)
-        
-        # Visual button to show/hide password (controls the password button in top row)
-        visual_button = QPushButton(self)
-        visual_button.setIcon(self.show_icon)
-        visual_button.setFixedSize(btn_width, btn_height)
-        visual_button.setText("")
-        visual_button.setToolTip("Show password")
-        visual_button.setStyleSheet(theme_manager.get_small_button_style())
-        # Force tooltip styling directly on button - brute force fix for black rectangle
-        button_style = theme_manager.get_small_button_style()
-        tooltip_style = f"""
-            QToolTip {{
-                background-color: {colors['card_bg']};
-                color: {colors['text']};
-                border: 1px solid {colors['accent']};
-                padding: 4px;
-            }}
-        """
-        visual_button.setStyleSheet(button_style + tooltip_style)
-        
-        # Use global show all state to set initial visibility
+        # Password visibility state, shared by the top row and the (lazily built) expand area
         is_visible = {"state": self.all_passwords_visible}
-        
-        # Set initial state based on global state
         if self.all_passwords_visible:
             password_copy_button.setText(password_text)
-            visual_button.setIcon(self.hide_icon)
-            visual_button.setToolTip("Hide password")
-        else:
-            password_copy_button.setText("••••••••••••")
-            visual_button.setIcon(self.show_icon)
-            visual_button.setToolTip("Show password")
-        
-        def toggle_visual():
-            if is_visible["state"]:
-                password_copy_button.setText("••••••••••••")
-                visual_button.setIcon(self.show_icon)
-                visual_button.setToolTip("Show password")
-                is_visible["state"] = False
-            else:
-                password_copy_button.setText(password_text)
-                visual_button.setIcon(self.hide_icon)
-                visual_button.setToolTip("Hide password")
-                is_visible["state"] = True
-            self.update_show_all_button_state()
-        
-        visual_button.clicked.connect(toggle_visual)
-        
-        # Store reference for "show all" feature
+
+        # Store reference for "show all" feature; "button" stays None until the card is first expanded
         password_info = {
-            "button": visual_button,
+            "card": card_container,
+            "button": None,
             "password_text": password_text,
             "password_copy_button": password_copy_button,
             "is_visible": is_visible
         }
         self.password_buttons.append(password_info)
-        
+
         # Connect password button click to copy (now that it's in top row)
         password_copy_button.clicked.connect(
             lambda _, p=password_text: self.copy_to_clipboard(p, password_copy_button)
         )
-        
-        # Add widgets to expand layout (password button removed, now in top row)
-        # Labels aligned to the left
-        expand_layout.addWidget(strength_label)
-        expand_layout.addSpacing(15)  # Spacing between strength and date
-        expand_layout.addWidget(date_label)
-        expand_layout.addStretch()
-        # Buttons aligned to the right
-        expand_layout.addWidget(visual_button)
-        visual_button.setToolTip("Show password")
-        expand_layout.addWidget(edit_button)
-        expand_layout.addWidget(delete_button)
-        
-        # Animation for expand/collapse
-        animation = QPropertyAnimation(expand_area, b"maximumHeight")
-        animation.setDuration(180)
-        animation.setEasingCurve(QEasingCurve.Type.InOutCubic)
-        
+
+        # EXPANDABLE AREA
+        # Most cards are never expanded, so the strength check, labels, buttons and animation
+        # are only built the first time a card is opened and then kept for later toggles
+        expand = {"area": None, "animation": None}
+
+        def build_expand_area():
+            expand_area = QWidget()
+            expand_area.setMaximumHeight(0)  # collapsed initially
+            expand_area.setMinimumHeight(0)
+            expand_area.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+            # Include tooltip styling in expand_area so buttons inside inherit it
+            expand_area.setStyleSheet(f"""
+                background-color: transparent;
+                QToolTip {{
+                    background-color: {colors['card_bg']};
+                    color: {colors['text']};
+                    border: 1px solid {colors['accent']};
+                    padding: 4px;
+                }}
+            """)
+
+            expand_layout = QHBoxLayout(expand_area)
+            expand_layout.setContentsMargins(10, 8, 10, 12)
+            expand_layout.setSpacing(8)
+
+            # Password strength label
+            strength_label = QLabel()
+            strength = get_pattern_strength(password_text)
+            if strength == "weak":
+                strength_label.setText("Password strength: Weak")
+                strength_label.setStyleSheet("color: red; font-size: 13px;")
+            elif strength == "medium":
+                strength_label.setText("Password strength: Medium")
+                strength_label.setStyleSheet("color: orange; font-size: 13px;")
+            else:
+                strength_label.setText("Password strength: Strong")
+                strength_label.setStyleSheet("color: green; font-size: 13px;")
+            strength_label.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Preferred)
+
+            # Edit button
+            edit_button = QPushButton()
+            edit_icon = QIcon(QPixmap(Strings.EDIT_ICON_PATH))
+            edit_button.setIcon(edit_icon)
+            edit_button.setStyleSheet(theme_manager.get_small_button_style())
+            edit_button.setFixedHeight(btn_height)
+            edit_button.setFixedWidth(btn_width)
+            edit_button.clicked.connect(lambda _, id=cred['id']: self.edit_credential(id))
+
+            # Delete button
+            delete_button = QPushButton()
+            delete_icon = QIcon(QPixmap(Strings.DELETE_ICON_PATH))
+            delete_button.setIcon(delete_icon)
+            delete_button.setStyleSheet(theme_manager.get_delete_button_style())
+            delete_button.setFixedHeight(btn_height)
+            delete_button.setFixedWidth(btn_width)
+            delete_button.clicked.connect(lambda _, id=cred['id']: self.delete_credential(id))
+
+            # Date label
+            raw_date = cred.get("created_at")
+            formatted_date = ""
+            if raw_date:
+                try:
+                    parsed = datetime.fromisoformat(str(raw_date).replace("Z", "").replace("T", " "))
+                    formatted_date = parsed.strftime("%m-%d-%Y")
+                except:
+                    formatted_date = str(raw_date) if raw_date else ""
+
+            date_label = QLabel(f"Added: {formatted_date}")
+            date_label.setStyleSheet(f"color: {colors['text']}; font-size: 13px;")
+            date_label.setSizePolicy(QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Preferred)
+            date_label.setWordWrap(False)
+
+            # Visual button to show/hide password (controls the password button in top row)
+            visual_button = QPushButton(self)
+            visual_button.setFixedSize(btn_width, btn_height)
+            visual_button.setText("")
+            # Force tooltip styling directly on button - brute force fix for black rectangle
+            button_style = theme_manager.get_small_button_style()
+            tooltip_style = f"""
+                QToolTip {{
+                    background-color: {colors['card_bg']};
+                    color: {colors['text']};
+                    border: 1px solid {colors['accent']};
+                    padding: 4px;
+                }}
+            """
+            visual_button.setStyleSheet(button_style + tooltip_style)
+
+            # Pick up whatever state "show all" left this card in before it was expanded
+            if is_visible["state"]:
+                visual_button.setIcon(self.hide_icon)
+                visual_button.setToolTip("Hide password")
+            else:
+                visual_button.setIcon(self.show_icon)
+                visual_button.setToolTip("Show password")
+
+            def toggle_visual():
+                if is_visible["state"]:
+                    password_copy_button.setText("••••••••••••")
+                    visual_button.setIcon(self.show_icon)
+                    visual_button.setToolTip("Show password")
+                    is_visible["state"] = False
+                else:
+                    password_copy_button.setText(password_text)
+                    visual_button.setIcon(self.hide_icon)
+                    visual_button.setToolTip("Hide password")
+                    is_visible["state"] = True
+                self.update_show_all_button_state()
+
+            visual_button.clicked.connect(toggle_visual)
+            password_info["button"] = visual_button
+
+            # Add widgets to expand layout (password button removed, now in top row)
+            # Labels aligned to the left
+            expand_layout.addWidget(strength_label)
+            expand_layout.addSpacing(15)  # Spacing between strength and date
+            expand_layout.addWidget(date_label)
+            expand_layout.addStretch()
+            # Buttons aligned to the right
+            expand_layout.addWidget(visual_button)
+            expand_layout.addWidget(edit_button)
+            expand_layout.addWidget(delete_button)
+
+            # Animation for expand/collapse
+            animation = QPropertyAnimation(expand_area, b"maximumHeight")
+            animation.setDuration(180)
+            animation.setEasingCurve(QEasingCurve.Type.InOutCubic)
+
+            card_layout.addWidget(expand_area)
+            expand["area"] = expand_area
+            expand["animation"] = animation
+
         is_expanded = {"state": False}
-        
+
         def toggle_expand():
+            if expand["area"] is None:
+                build_expand_area()
+            expand_area = expand["area"]
+            animation = expand["animation"]
             if not is_expanded["state"]:
                 is_expanded["state"] = True
                 expand_area.adjustSize()
@@ -514,16 +736,14 @@ class ListCredentialsWidget(QWidget):
                 animation.setEndValue(0)
                 animation.start()
                 dropdown_btn.setIcon(QIcon(rotate_arrow(arrow_pix, 0)))
-        
+
         dropdown_btn.clicked.connect(toggle_expand)
         top_row_widget.mousePressEvent = lambda e: toggle_expand() if e.button() == Qt.MouseButton.LeftButton else None
-        
-        # Add top row and expand area to card layout
+
+        # Only the top row exists up front, the expand area is appended on first expand
         card_layout.addWidget(top_row_widget)
-        card_layout.addWidget(expand_area)
-        
-        # Add the card to the list
-        self.credentials_layout.addWidget(card_container)       
+
+        return card_container
 
     def copy_to_clipboard(self, password, copy_button):
         QApplication.clipboard().setText(password)
@@ -593,8 +813,9 @@ class ListCredentialsWidget(QWidget):
         self.load_credentials()
 
     def filter_credentials(self):
-        """Called when search text changes – just reapply filters."""
-        self.apply_filters()
+        """Called when search text changes – reapply filters once typing pauses."""
+        self.tail_timer.stop()
+        self.search_timer.start()
 
     def open_settings_dialog(self):
         overlay = QWidget(self.parentWidget)
@@ -619,6 +840,10 @@ class ListCredentialsWidget(QWidget):
     def closeEvent(self, event):
         """Clean up when widget is closed"""
         theme_manager.unregister_window(self)
+        self.render_timer.stop()
+        # a QThread must not be destroyed while it is still running
+        for loader in list(self.loaders):
+            loader.wait()
         super().closeEvent(event)
 
     def show_filter_menu(self):
@@ -641,7 +866,8 @@ class ListCredentialsWidget(QWidget):
         valid_buttons = []
         for p in self.password_buttons:
             try:
-                _ = p["button"].isVisible()
+                if p["button"] is not None:
+                    _ = p["button"].isVisible()
                 _ = p["password_copy_button"].isVisible()
                 valid_buttons.append(p)
             except RuntimeError:
@@ -659,13 +885,13 @@ class ListCredentialsWidget(QWidget):
                 if new_state:
                     # Show password
                     p["password_copy_button"].setText(p["password_text"])
-                    p["button"].setIcon(self.hide_icon)
-                    p["button"].setToolTip("Hide password")
                 else:
                     # Hide password
                     p["password_copy_button"].setText("••••••••••••")
-                    p["button"].setIcon(self.show_icon)
-                    p["button"].setToolTip("Show password")
+                # cards that were never expanded have no visual button yet, it reads is_visible when built
+                if p["button"] is not None:
+                    p["button"].setIcon(self.hide_icon if new_state else self.show_icon)
+                    p["button"].setToolTip("Hide password" if new_state else "Show password")
             except RuntimeError:
                 continue
         
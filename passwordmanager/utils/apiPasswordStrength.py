@@ -1,5 +1,8 @@
 # apiPasswordStrength.py
 import math
+from functools import lru_cache, reduce
+from operator import or_
+from typing import Dict, Iterable, List
 
 def get_password_strength(password: str) -> str:
     # Returns: 'weak', 'medium', or 'strong' based on entropy calculation
@@ -45,3 +48,59 @@ def get_password_strength(password: str) -> str:
         return "medium"
     else:
         return "weak"
+
+
+# Batch scoring ##############################################################
+# same estimate as get_password_strength, but each distinct character is classified once
+# (and cached across calls), and a password seen twice is only scored once
+_LOWER, _UPPER, _DIGIT, _SHIFT_NUMBER, _OTHER = 1, 2, 4, 8, 16
+_CLASS_SIZES = ((_LOWER, 26), (_UPPER, 26), (_DIGIT, 10), (_SHIFT_NUMBER, 10), (_OTHER, 20))
+# log2(charSetSize) for every combination of classes, None when the set is empty
+_LOG2_SIZES = []
+for _mask in range(32):
+    _size = sum(size for flag, size in _CLASS_SIZES if _mask & flag)
+    _LOG2_SIZES.append(math.log2(_size) if _size else None)
+
+
+@lru_cache(maxsize=4096)
+def _char_classes(c: str) -> int:
+    classes = 0
+    if c.islower():
+        classes |= _LOWER
+    if c.isupper():
+        classes |= _UPPER
+    if c.isdigit():
+        classes |= _DIGIT
+    if c in "!@#$%^&*()":
+        classes |= _SHIFT_NUMBER
+    elif not c.isalnum():
+        classes |= _OTHER
+    return classes
+
+
+def _score(password: str) -> str:
+    if not password:
+        return "weak"
+    log2_size = _LOG2_SIZES[reduce(or_, map(_char_classes, set(password)), 0)]
+    if log2_size is None:
+        # only characters outside every class (e.g. CJK), there is nothing to estimate from
+        return "weak"
+    entropy = len(password) * log2_size
+    if entropy >= 80:
+        return "strong"
+    elif entropy > 40:
+        return "medium"
+    else:
+        return "weak"
+
+
+def get_password_strengths(passwords: Iterable[str]) -> List[str]:
+    # Returns one 'weak' / 'medium' / 'strong' per password, in order
+    scored: Dict[str, str] = {}
+    results = []
+    for password in passwords:
+        strength = scored.get(password)
+        if strength is None:
+            strength = scored[password] = _score(password)
+        results.append(strength)
+    return results
@@ -0,0 +1,121 @@
+import math
+import os
+import string
+from typing import List, Sequence
+
+from passwordmanager.utils.wordlist import get_wordlist
+
+#####
+# password and passphrase generation
+# random bytes are read in bulk and mapped onto the alphabet with rejection sampling: a byte is only
+# used if it falls below the largest multiple of the alphabet size, so every character stays equally
+# likely. for ASCII alphabets the mapping and the rejection are a single bytes.translate call.
+#####
+
+LOWERCASE = string.ascii_lowercase
+UPPERCASE = string.ascii_uppercase
+DIGITS = string.digits
+SYMBOLS = "!@#$%^&*()"
+# characters that are easy to confuse when a password is read out or typed from paper
+AMBIGUOUS = "Il1O0o"
+
+DEFAULT_LENGTH = 16
+MAX_LENGTH = 1024
+MAX_COUNT = 10000
+DEFAULT_WORDS = 6
+MAX_WORDS = 64
+DEFAULT_SEPARATOR = "-"
+
+
+def build_alphabet(
+    lowercase: bool = True,
+    uppercase: bool = True,
+    digits: bool = True,
+    symbols: bool = True,
+    exclude: str = "",
+    exclude_ambiguous: bool = False,
+) -> str:
+    """The selected character classes minus the excluded characters, raises ValueError if nothing is left."""
+    chars = ""
+    for enabled, chars_in_class in (
+        (lowercase, LOWERCASE), (uppercase, UPPERCASE), (digits, DIGITS), (symbols, SYMBOLS)
+    ):
+        if enabled:
+            chars += chars_in_class
+    removed = set(exclude or "")
+    if exclude_ambiguous:
+        removed.update(AMBIGUOUS)
+    alphabet = "".join(char for char in chars if char not in removed)
+    if not alphabet:
+        raise ValueError("no characters left to generate from")
+    return alphabet
+
+
+def random_indices(n: int, bound: int) -> List[int]:
+    """n uniform random integers in [0, bound), drawn from bulk os.urandom output."""
+    if bound < 1:
+        raise ValueError("bound must be positive")
+    if bound <= 1 << 8:
+        width, fmt = 1, "B"
+    elif bound <= 1 << 16:
+        width, fmt = 2, "H"
+    else:
+        width, fmt = 4, "I"
+    space = 1 << (8 * width)
+    limit = space - space % bound
+
+    indices: List[int] = []
+    while len(indices) < n:
+        missing = n - len(indices)
+        # ask for enough that one round is almost always sufficient
+        units = missing * space // limit + 16
+        for value in memoryview(os.urandom(units * width)).cast(fmt):
+            if value < limit:
+                indices.append(value % bound)
+        del indices[n:]
+    return indices
+
+
+def _random_text(n: int, alphabet: str) -> str:
+    size = len(alphabet)
+    if not alphabet.isascii() or size > 256:
+        return "".join(alphabet[i] for i in random_indices(n, size))
+    limit = 256 - 256 % size
+    table = bytes(ord(alphabet[b % size]) if b < limit else 0 for b in range(256))
+    rejected = bytes(range(limit, 256))
+    chunks = []
+    produced = 0
+    while produced < n:
+        chunk = os.urandom((n - produced) * 256 // limit + 16).translate(table, rejected)
+        chunks.append(chunk)
+        produced += len(chunk)
+    return b"".join(chunks)[:n].decode("ascii")
+
+
+def generate_passwords(count: int = 1, length: int = DEFAULT_LENGTH, alphabet: str = None) -> List[str]:
+    alphabet = alphabet or build_alphabet()
+    text = _random_text(count * length, alphabet)
+    return [text[i:i + length] for i in range(0, count * length, length)]
+
+
+def password_entropy_bits(length: int, alphabet: str) -> float:
+    return length * math.log2(len(alphabet)) if alphabet else 0.0
+
+
+def generate_passphrases(
+    count: int = 1,
+    words: int = DEFAULT_WORDS,
+    separator: str = DEFAULT_SEPARATOR,
+    capitalize: bool = False,
+    wordlist: Sequence[str] = None,
+) -> List[str]:
+    wordlist = wordlist if wordlist is not None else get_wordlist()
+    picks = [wordlist[i] for i in random_indices(count * words, len(wordlist))]
+    if capitalize:
+        picks = [word.capitalize() for word in picks]
+    return [separator.join(picks[i:i + words]) for i in range(0, count * words, words)]
+
+
+def passphrase_entropy_bits(words: int, wordlist: Sequence[str] = None) -> float:
+    wordlist = wordlist if wordlist is not None else get_wordlist()
+    return words * math.log2(len(wordlist)) if wordlist else 0.0
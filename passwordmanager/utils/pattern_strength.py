@@ -0,0 +1,527 @@
+import datetime
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from passwordmanager.utils.apiPasswordStrength import get_password_strengths
+
+#####
+# pattern-aware strength estimate (in the spirit of zxcvbn)
+# the password is split into dictionary words (plain, reversed, l33t), keyboard walks, repeats,
+# sequences and dates, plus brute-force filler; each piece gets a guess count, and the cheapest
+# way to cover the whole password is what an attacker would try first.
+# the dictionaries are only read and compiled into a trie on the first call.
+#####
+
+DICTIONARY_DIR = Path(__file__).parent.parent / "dictionaries"
+DICTIONARY_FILES = {
+    "passwords": "passwords.txt",
+    "english": "english.txt",
+    "names": "names.txt",
+}
+
+# the match search is quadratic in the length, longer passwords are analysed in chunks of this size
+MAX_PATTERN_LENGTH = 32
+MIN_DICTIONARY_WORD = 3
+BRUTEFORCE_CARDINALITY = 10
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+REFERENCE_YEAR = datetime.date.today().year
+MIN_YEAR_SPACE = 20
+
+# guesses needed for scores 1..4
+SCORE_THRESHOLDS = (1e3 + 5, 1e6 + 5, 1e8 + 5, 1e10 + 5)
+
+L33T_TABLE = {
+    "4": "a", "@": "a", "8": "b", "(": "c", "{": "c", "3": "e", "6": "g", "1": "il", "!": "i",
+    "|": "il", "0": "o", "$": "s", "5": "s", "+": "t", "7": "lt", "%": "x", "2": "z",
+}
+
+WARNINGS = {
+    "passwords": "This is a commonly used password",
+    "english": "A single common word is easy to guess",
+    "names": "Names are easy to guess",
+    "spatial": "Keyboard patterns are easy to guess",
+    "repeat": "Repeats like \"abcabc\" are easy to guess",
+    "sequence": "Sequences like \"abc\" or \"6543\" are easy to guess",
+    "date": "Dates and years are easy to guess",
+}
+
+
+# Dictionaries ###############################################################
+class _Trie:
+    """Character trie; a node's None key maps dictionary name -> rank for words ending there."""
+
+    def __init__(self):
+        self.root: Dict = {}
+
+    def add(self, word: str, dictionary: str, rank: int):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node.setdefault(None, {}).setdefault(dictionary, rank)
+
+
+@lru_cache(maxsize=1)
+def _dictionary_trie() -> _Trie:
+    trie = _Trie()
+    for dictionary, filename in DICTIONARY_FILES.items():
+        path = DICTIONARY_DIR / filename
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            rank = 0
+            for line in f:
+                word = line.strip().lower()
+                if word:
+                    rank += 1
+                    trie.add(word, dictionary, rank)
+    return trie
+
+
+# Keyboard graphs ############################################################
+def _build_graph(rows: List[str], shifted_rows: List[str], offsets: List[float], max_dx: float) -> Dict:
+    positions = {}
+    shifted = set()
+    for row, (keys, shifted_keys, offset) in enumerate(zip(rows, shifted_rows, offsets)):
+        for col, key in enumerate(keys):
+            if key == " ":
+                continue
+            position = (col + offset, row)
+            positions[key] = position
+            if shifted_keys and shifted_keys[col] != key:
+                positions[shifted_keys[col]] = position
+                shifted.add(shifted_keys[col])
+
+    # neighbours per position, and the direction of each step so turns can be counted
+    cells = set(positions.values())
+    neighbours = {}
+    for x, y in cells:
+        neighbours[(x, y)] = {
+            (nx, ny) for nx, ny in cells
+            if (nx, ny) != (x, y) and abs(ny - y) <= 1 and abs(nx - x) <= (1 if ny == y else max_dx)
+        }
+    average_degree = sum(len(n) for n in neighbours.values()) / len(neighbours)
+    return {
+        "positions": positions,
+        "shifted": shifted,
+        "neighbours": neighbours,
+        "starting_positions": len(cells),
+        "average_degree": average_degree,
+    }
+
+
+@lru_cache(maxsize=1)
+def _keyboard_graphs() -> Dict[str, Dict]:
+    qwerty = _build_graph(
+        ["`1234567890-=", "qwertyuiop[]\\", "asdfghjkl;'", "zxcvbnm,./"],
+        ["~!@#$%^&*()_+", "QWERTYUIOP{}|", "ASDFGHJKL:\"", "ZXCVBNM<>?"],
+        [0, 0.5, 0.75, 1.25],
+        0.75,
+    )
+    keypad = _build_graph(
+        [" /*-", "789+", "456 ", "123 ", "0.  "],
+        ["", "", "", "", ""],
+        [0, 0, 0, 0, 0],
+        1,
+    )
+    return {"qwerty": qwerty, "keypad": keypad}
+
+
+# Matchers ###################################################################
+def _match(pattern: str, i: int, j: int, token: str, guesses: float, **extra) -> Dict:
+    match = {"pattern": pattern, "i": i, "j": j, "token": token, "guesses": guesses}
+    match.update(extra)
+    return match
+
+
+def _uppercase_variations(token: str) -> float:
+    upper = sum(1 for char in token if char.isupper())
+    lower = sum(1 for char in token if char.islower())
+    if upper == 0:
+        return 1
+    if lower == 0 or (upper == 1 and (token[0].isupper() or token[-1].isupper())):
+        return 2
+    return sum(math.comb(upper + lower, k) for k in range(1, min(upper, lower) + 1))
+
+
+def _dictionary_matches(password: str, reverse: bool = False) -> List[Dict]:
+    text = password[::-1] if reverse else password
+    lowered = text.lower()
+    root = _dictionary_trie().root
+    n = len(text)
+    best: Dict[tuple, Dict] = {}
+    for i in range(n):
+        # every node reachable from i, with the number of l33t substitutions used to get there
+        frontier = [(root, 0)]
+        for j in range(i, n):
+            char = lowered[j]
+            following = []
+            for node, subs in frontier:
+                child = node.get(char)
+                if child is not None:
+                    following.append((child, subs))
+                for plain in L33T_TABLE.get(char, ""):
+                    child = node.get(plain)
+                    if child is not None:
+                        following.append((child, subs + 1))
+            if not following:
+                break
+            frontier = following
+            if j - i + 1 < MIN_DICTIONARY_WORD:
+                continue
+            for node, subs in frontier:
+                ranks = node.get(None)
+                if not ranks:
+                    continue
+                token = text[i:j + 1]
+                for dictionary, rank in ranks.items():
+                    guesses = rank * _uppercase_variations(token) * (2 ** subs) * (2 if reverse else 1)
+                    if reverse:
+                        start, end, token_out = n - 1 - j, n - 1 - i, password[n - 1 - j:n - i]
+                    else:
+                        start, end, token_out = i, j, token
+                    key = (start, end)
+                    if key not in best or guesses < best[key]["guesses"]:
+                        best[key] = _match(
+                            "dictionary", start, end, token_out, guesses,
+                            dictionary=dictionary, l33t=subs > 0, reversed=reverse,
+                        )
+    return list(best.values())
+
+
+def _spatial_guesses(graph: Dict, length: int, turns: int, shifted: int) -> float:
+    starts = graph["starting_positions"]
+    degree = graph["average_degree"]
+    guesses = 0.0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, j - 1) * starts * degree ** j
+    if shifted:
+        unshifted = length - shifted
+        if unshifted == 0:
+            guesses *= 2
+        else:
+            guesses *= sum(math.comb(shifted + unshifted, k) for k in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+
+def _spatial_matches(password: str) -> List[Dict]:
+    matches = []
+    n = len(password)
+    for name, graph in _keyboard_graphs().items():
+        positions = graph["positions"]
+        neighbours = graph["neighbours"]
+        i = 0
+        while i < n - 1:
+            j = i
+            turns = 0
+            direction = None
+            while j + 1 < n:
+                here = positions.get(password[j])
+                there = positions.get(password[j + 1])
+                if here is None or there is None or there not in neighbours[here]:
+                    break
+                step = (there[0] - here[0], there[1] - here[1])
+                if step != direction:
+                    turns += 1
+                    direction = step
+                j += 1
+            if j - i + 1 >= 3:
+                token = password[i:j + 1]
+                shifted = sum(1 for char in token if char in graph["shifted"])
+                matches.append(_match(
+                    "spatial", i, j, token, _spatial_guesses(graph, len(token), turns, shifted), graph=name,
+                ))
+                i = j
+            else:
+                i += 1
+    return matches
+
+
+_GREEDY_REPEAT = re.compile(r"(.+)\1+", re.DOTALL)
+_LAZY_REPEAT = re.compile(r"(.+?)\1+", re.DOTALL)
+_LAZY_ANCHORED_REPEAT = re.compile(r"^(.+?)\1+$", re.DOTALL)
+
+
+def _repeat_matches(password: str) -> List[Dict]:
+    matches = []
+    last = 0
+    while last < len(password):
+        greedy = _GREEDY_REPEAT.search(password, last)
+        if not greedy:
+            break
+        lazy = _LAZY_REPEAT.search(password, last)
+        if len(greedy.group(0)) > len(lazy.group(0)):
+            # "abcabc" style: the repeating unit is the shortest one that tiles the greedy match
+            found = greedy
+            base = _LAZY_ANCHORED_REPEAT.match(found.group(0)).group(1)
+        else:
+            found = lazy
+            base = found.group(1)
+        token = found.group(0)
+        base_guesses = _most_guessable(base)["guesses"]
+        matches.append(_match(
+            "repeat", found.start(), found.end() - 1, token,
+            base_guesses * (len(token) // len(base)), base=base,
+        ))
+        last = found.end()
+    return matches
+
+
+def _sequence_matches(password: str) -> List[Dict]:
+    matches = []
+    n = len(password)
+
+    def add(i, j, delta):
+        if j - i < 2:
+            return
+        token = password[i:j + 1]
+        first = token[0]
+        if first in "aAzZ019":
+            base = 4
+        elif first.isdigit():
+            base = 10
+        else:
+            base = 26
+        if delta < 0:
+            base *= 2
+        matches.append(_match("sequence", i, j, token, base * len(token), ascending=delta > 0))
+
+    i = 0
+    while i < n - 1:
+        delta = ord(password[i + 1]) - ord(password[i])
+        j = i + 1
+        if delta == 0 or abs(delta) > 5:
+            i += 1
+            continue
+        while j + 1 < n and ord(password[j + 1]) - ord(password[j]) == delta:
+            j += 1
+        add(i, j, delta)
+        i = j
+    return matches
+
+
+_YEAR = re.compile(r"(19\d\d|20\d\d)")
+_SEPARATED_DATE = re.compile(r"^(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})$")
+
+
+def _two_digit_year(year: int) -> int:
+    if year > 99:
+        return year
+    return year + (1900 if year > 50 else 2000)
+
+
+def _valid_date(day: int, month: int, year: int) -> bool:
+    return 1 <= day <= 31 and 1 <= month <= 12 and 1000 <= year <= 2050
+
+
+def _date_from_parts(parts: List[int], year_first: bool) -> Optional[int]:
+    """Return the year if the three numbers form a plausible date, trying common orders."""
+    if year_first:
+        year, a, b = parts
+        orders = [(a, b), (b, a)]
+    else:
+        a, b, year = parts
+        orders = [(a, b), (b, a)]
+    year = _two_digit_year(year)
+    for day, month in orders:
+        if _valid_date(day, month, year):
+            return year
+    return None
+
+
+def _year_space(year: int) -> int:
+    return max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+
+
+def _date_matches(password: str) -> List[Dict]:
+    matches = []
+    n = len(password)
+
+    for found in _YEAR.finditer(password):
+        i, j = found.start(), found.end() - 1
+        matches.append(_match("date", i, j, found.group(0), _year_space(int(found.group(0))), separator=""))
+
+    for i in range(n):
+        for j in range(i + 5, min(i + 10, n)):
+            token = password[i:j + 1]
+            year = None
+            separator = ""
+            separated = _SEPARATED_DATE.match(token)
+            if separated:
+                first, separator, middle, last = separated.groups()
+                if len(first) == 4:
+                    year = _date_from_parts([int(first), int(middle), int(last)], year_first=True)
+                elif len(last) in (2, 4) and len(first) <= 2:
+                    year = _date_from_parts([int(first), int(middle), int(last)], year_first=False)
+            elif token.isdigit() and len(token) in (6, 8):
+                size = 4 if len(token) == 8 else 2
+                year = _date_from_parts(
+                    [int(token[:size]), int(token[size:size + 2]), int(token[size + 2:])], year_first=True
+                ) or _date_from_parts(
+                    [int(token[:2]), int(token[2:4]), int(token[4:])], year_first=False
+                )
+            if year is not None:
+                guesses = 365 * _year_space(year) * (4 if separator else 1)
+                matches.append(_match("date", i, j, token, guesses, separator=separator))
+    return matches
+
+
+# Scoring ####################################################################
+def _submatch_floor(match: Dict, password_length: int) -> float:
+    if len(match["token"]) == password_length:
+        return 1
+    if len(match["token"]) == 1:
+        return MIN_SUBMATCH_GUESSES_SINGLE_CHAR
+    return MIN_SUBMATCH_GUESSES_MULTI_CHAR
+
+
+def _all_matches(password: str) -> List[Dict]:
+    return (
+        _dictionary_matches(password)
+        + _dictionary_matches(password, reverse=True)
+        + _spatial_matches(password)
+        + _repeat_matches(password)
+        + _sequence_matches(password)
+        + _date_matches(password)
+    )
+
+
+def _most_guessable(password: str) -> Dict:
+    """
+    Cheapest way to cover the password with non-overlapping matches and brute-force gaps.
+    Cost of a sequence of l pieces: l! * product(guesses) + 10000^(l-1), as in zxcvbn,
+    so chopping a password into many small pieces is not free.
+    """
+    n = len(password)
+    if n == 0:
+        return {"guesses": 1, "sequence": []}
+
+    matches_by_end: Dict[int, List[Dict]] = {}
+    for match in _all_matches(password):
+        match["guesses"] = max(match["guesses"], _submatch_floor(match, n))
+        matches_by_end.setdefault(match["j"], []).append(match)
+
+    # best[k][l] = (guesses, product, sequence) for password[:k + 1] covered by l pieces
+    best: List[Dict[int, tuple]] = [dict() for _ in range(n)]
+    match_ends: List[int] = []
+
+    def update(match: Dict, length: int, previous_product: float, previous_sequence: tuple):
+        k = match["j"]
+        product = previous_product * match["guesses"]
+        guesses = math.factorial(length) * product + MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (length - 1)
+        for other_length, other in best[k].items():
+            if other_length <= length and other[0] <= guesses:
+                return
+        best[k][length] = (guesses, product, previous_sequence + (match,))
+
+    def bruteforce(i: int, k: int) -> Dict:
+        token = password[i:k + 1]
+        guesses = max(BRUTEFORCE_CARDINALITY ** len(token), MIN_SUBMATCH_GUESSES_SINGLE_CHAR + 1)
+        if len(token) < n:
+            floor = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if len(token) == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+            guesses = max(guesses, floor)
+        return _match("bruteforce", i, k, token, guesses)
+
+    for k in range(n):
+        for match in matches_by_end.get(k, ()):
+            i = match["i"]
+            if i == 0:
+                update(match, 1, 1, ())
+            else:
+                for length, (_, product, sequence) in list(best[i - 1].items()):
+                    update(match, length + 1, product, sequence)
+
+        update(bruteforce(0, k), 1, 1, ())
+        # two brute-force pieces in a row are never better than one, so a gap can only
+        # follow a position where some pattern match ends
+        for i in match_ends:
+            gap = bruteforce(i, k)
+            for length, (_, product, sequence) in list(best[i - 1].items()):
+                if sequence[-1]["pattern"] != "bruteforce":
+                    update(gap, length + 1, product, sequence)
+        if any(entry[2][-1]["pattern"] != "bruteforce" for entry in best[k].values()):
+            match_ends.append(k + 1)
+
+    guesses, _, sequence = min(best[n - 1].values(), key=lambda entry: entry[0])
+    return {"guesses": guesses, "sequence": list(sequence)}
+
+
+def _score(guesses: float) -> int:
+    for score, threshold in enumerate(SCORE_THRESHOLDS):
+        if guesses < threshold:
+            return score
+    return 4
+
+
+def _warning(sequence: List[Dict]) -> str:
+    patterns = [match for match in sequence if match["pattern"] != "bruteforce"]
+    if not patterns:
+        return ""
+    weakest = max(patterns, key=lambda match: len(match["token"]))
+    if weakest["pattern"] == "dictionary":
+        return WARNINGS[weakest["dictionary"]]
+    return WARNINGS[weakest["pattern"]]
+
+
+def estimate_strength(password: str) -> Dict:
+    """
+    Estimate how many guesses an attacker needs, with the patterns that make up the password.
+    Returns guesses, log10 of that, a 0-4 score, weak/medium/strong and a short warning.
+    """
+    password = password or ""
+    # chunk estimates multiply, except that a chunk seen before only doubles the count,
+    # the same way a repeat does, so a very long "aaaa..." stays weak
+    guesses = 1
+    sequence: List[Dict] = []
+    seen_chunks = set()
+    for start in range(0, len(password), MAX_PATTERN_LENGTH):
+        text = password[start:start + MAX_PATTERN_LENGTH]
+        if text in seen_chunks:
+            guesses *= 2
+            continue
+        seen_chunks.add(text)
+        chunk = _most_guessable(text)
+        guesses *= chunk["guesses"]
+        for match in chunk["sequence"]:
+            match["i"] += start
+            match["j"] += start
+        sequence.extend(chunk["sequence"])
+    result = {"guesses": guesses, "sequence": sequence}
+    score = _score(guesses)
+    if score >= 4:
+        strength = "strong"
+    elif score >= 2:
+        strength = "medium"
+    else:
+        strength = "weak"
+    return {
+        "guesses": guesses,
+        "guesses_log10": math.log10(guesses) if guesses > 0 else 0.0,
+        "score": score,
+        "strength": strength,
+        "warning": _warning(result["sequence"]) if score < 4 else "",
+        "sequence": [
+            {key: value for key, value in match.items() if key not in ("token", "base")}
+            for match in result["sequence"]
+        ],
+    }
+
+
+_STRENGTH_ORDER = {"weak": 0, "medium": 1, "strong": 2}
+
+
+def get_pattern_feedback(password: str) -> Tuple[str, str]:
+    # Returns ('weak' | 'medium' | 'strong', warning); never rates a password above get_password_strength
+    entropy_strength = get_password_strengths([password])[0]
+    estimate = estimate_strength(password)
+    strength = min(entropy_strength, estimate["strength"], key=_STRENGTH_ORDER.__getitem__)
+    return strength, estimate["warning"]
+
+
+def get_pattern_strength(password: str) -> str:
+    return get_pattern_feedback(password)[0]
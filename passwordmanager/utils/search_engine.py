@@ -0,0 +1,326 @@
+import bisect
+import heapq
+import itertools
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from passwordmanager.utils.search_index import CredentialSearchIndex, MAX_GRAM
+
+#####
+# ranked, typo tolerant search over site and username
+# matches are ranked by tier: exact > prefix > word boundary > substring > fuzzy > subsequence,
+# and within a tier by how much of the field the query covers. a typo within the edit distance
+# ("lgoin", "acount") is a better guess than letters scattered in order across a field. because
+# tiers are strict, the search stops as soon as the top-k is filled from the better tiers.
+#####
+
+TIER_SCORES = {
+    "exact": 1000,
+    "prefix": 900,
+    "boundary": 800,
+    "substring": 700,
+    "fuzzy": 500,
+    "subsequence": 300,
+}
+
+# characters that start a new "word" inside a site or username (sub.domain.com, first_last@...)
+_BOUNDARY = re.compile(r"[.\-_@/:+\s]+")
+
+# fuzzy matching only kicks in for queries long enough to carry a typo
+MIN_FUZZY_LENGTH = 4
+# cap on how many trigram candidates get a full edit distance check
+MAX_FUZZY_CANDIDATES = 100
+# cap on how many trigram candidates get a subsequence check. a smaller vault is checked in full
+MAX_SUBSEQUENCE_CANDIDATES = 1000
+# trigrams found in more than this share of the vault ("com", ".co") say little about a candidate
+COMMON_GRAM_SHARE = 0.25
+# ranking penalty per edit, and for an edit that changes the first letter
+EDIT_PENALTY = 10
+FIRST_LETTER_PENALTY = 15
+
+
+def max_edit_distance(query: str) -> int:
+    if len(query) < MIN_FUZZY_LENGTH:
+        return 0
+    if len(query) < 8:
+        return 1
+    return 2
+
+
+def prefix_distance(query: str, text: str, limit: int) -> Optional[int]:
+    """
+    Smallest edit distance between query and any prefix of text, or None if it exceeds limit.
+    Swapping two neighbouring characters counts as one edit (optimal string alignment), the most
+    common typo ("comapny", "secrue"). One DP pass covers every prefix length, so "gthub" against
+    "github.com" is a single call. Only the diagonal band |i - j| <= limit can stay under the
+    limit, so nothing else is computed.
+    """
+    m = len(query)
+    over = limit + 1
+    previous = [i if i <= limit else over for i in range(m + 1)]
+    before = previous
+    best = previous[m]
+    last_tc = ""
+    for j, tc in enumerate(text[:m + limit], 1):
+        current = [over] * (m + 1)
+        current[0] = row_min = j if j <= limit else over
+        for i in range(max(1, j - limit), min(m, j + limit) + 1):
+            qc = query[i - 1]
+            cost = previous[i - 1] + (qc != tc)
+            if previous[i] + 1 < cost:
+                cost = previous[i] + 1
+            if current[i - 1] + 1 < cost:
+                cost = current[i - 1] + 1
+            if i > 1 and qc == last_tc and query[i - 2] == tc and qc != tc and before[i - 2] + 1 < cost:
+                cost = before[i - 2] + 1
+            current[i] = cost
+            if cost < row_min:
+                row_min = cost
+        if current[m] < best:
+            best = current[m]
+        if row_min > limit:
+            break
+        before, previous = previous, current
+        last_tc = tc
+    return best if best <= limit else None
+
+
+class _SortedTable:
+    """Field texts sorted for prefix lookups, with parallel position and length lists for ranking."""
+
+    def __init__(self, entries: List[Tuple[str, int, int]]):
+        entries.sort()
+        self.texts = [text for text, _, _ in entries]
+        self.positions = [pos for _, pos, _ in entries]
+        self.lengths = [length for _, _, length in entries]
+
+    def prefix_range(self, query: str, within: Optional[range] = None) -> range:
+        lo, hi = (within.start, within.stop) if within is not None else (0, len(self.texts))
+        start = bisect.bisect_left(self.texts, query, lo, hi)
+        # "\uffff" sorts after anything that can follow the query
+        end = bisect.bisect_left(self.texts, query + "\uffff", start, hi)
+        return range(start, end)
+
+    def next_chars(self, prefix: str, within: range) -> Iterator[Tuple[str, range]]:
+        """Each character that follows `prefix` in the texts of `within`, with the range it covers."""
+        depth, stop = len(prefix), within.stop
+        # texts equal to the prefix itself sort first
+        i = bisect.bisect_right(self.texts, prefix, within.start, stop)
+        while i < stop:
+            char = self.texts[i][depth]
+            end = bisect.bisect_left(self.texts, prefix + char + "\uffff", i, stop)
+            yield char, range(i, end)
+            i = end
+
+
+class SearchEngine(CredentialSearchIndex):
+    def build(self, credentials: Iterable[dict]):
+        super().build(credentials)
+        self.fields: List[Tuple[str, str]] = []
+        self._key_lengths: List[int] = []
+        prefix_entries = []
+        boundary_entries = []
+
+        for pos, key in enumerate(self.keys):
+            site, username = key.split("\n", 1)
+            self.fields.append((site, username))
+            self._key_lengths.append(len(key))
+            for field in (site, username):
+                if not field:
+                    continue
+                prefix_entries.append((field, pos, len(field)))
+                # every later word in the field gets its own entry, with the rest of the field attached
+                for match in _BOUNDARY.finditer(field):
+                    if match.end() < len(field):
+                        boundary_entries.append((field[match.end():], pos, len(key)))
+
+        self._prefix_table = _SortedTable(prefix_entries)
+        self._boundary_table = _SortedTable(boundary_entries)
+        # positions by trigrams shared with the last query, for the fuzzy and subsequence tiers
+        self._gram_ranking: Tuple[Optional[str], List[int]] = (None, [])
+
+    def rank(self, query: str, limit: Optional[int] = 20) -> List[Tuple[int, int, str]]:
+        """
+        Return up to `limit` matches as (position, score, tier), best first.
+        limit=None returns every match.
+        """
+        query = (query or "").lower().strip()
+        if not query or not self.keys:
+            return []
+
+        results: List[Tuple[int, int, str]] = []
+        seen: Set[int] = set()
+
+        def full() -> bool:
+            return limit is not None and len(results) >= limit
+
+        def take(tier: str, items: Iterable[int], positions, penalties):
+            # items index into `positions` and `penalties`, a lower penalty ranks higher. ties go
+            # by item so a limited search returns exactly the head of the unlimited one
+            if full():
+                return
+            key = lambda item: (penalties[item], item)
+            base = TIER_SCORES[tier]
+            if limit is None:
+                best, count = sorted(items, key=key), None
+            else:
+                # a position can have several entries (one per field or word) and may already be
+                # taken, so over-fetch, and go back for more while the entries fetched fall short
+                count = 2 * (limit - len(results)) + len(seen)
+                best = heapq.nsmallest(count, items, key=key)
+            done = 0
+            while True:
+                for item in best[done:]:
+                    pos = positions[item]
+                    if pos in seen:
+                        continue
+                    results.append((pos, base - min(max(penalties[item] - len(query), 0), 99), tier))
+                    seen.add(pos)
+                    if full():
+                        return
+                if count is None or len(best) < count:
+                    return
+                done = len(best)
+                count = done + 2 * (limit - len(results))
+                best = heapq.nsmallest(count, items, key=key)
+
+        prefix = self._prefix_table
+        hits = prefix.prefix_range(query)
+        exact_end = hits.start
+        while exact_end < hits.stop and prefix.texts[exact_end] == query:
+            exact_end += 1
+        take("exact", range(hits.start, exact_end), prefix.positions, prefix.lengths)
+        take("prefix", range(exact_end, hits.stop), prefix.positions, prefix.lengths)
+        if full():
+            return results
+
+        boundary = self._boundary_table
+        take("boundary", boundary.prefix_range(query), boundary.positions, boundary.lengths)
+        if full():
+            return results
+
+        key_positions = range(len(self.keys))
+        take("substring", self.search(query), key_positions, self._key_lengths)
+        if full():
+            return results
+
+        penalties = self._fuzzy_matches(query, seen)
+        take("fuzzy", penalties, key_positions, penalties)
+        if full():
+            return results
+
+        penalties = self._subsequence_matches(query, seen)
+        take("subsequence", penalties, key_positions, penalties)
+        return results
+
+    def matches(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Matching positions in rank order, used by the list widget to filter and order cards.
+        With a limit the result is the head of the full list, so the rest can be appended later.
+        """
+        return [pos for pos, _, _ in self.rank(query, limit=limit)]
+
+    def _subsequence_matches(self, query: str, seen: Set[int]) -> Dict[int, int]:
+        if len(query) < MAX_GRAM:
+            return {}
+        if len(self.keys) <= MAX_SUBSEQUENCE_CANDIDATES:
+            candidates = [pos for pos in range(len(self.keys)) if pos not in seen]
+        else:
+            # a regex over every key takes tens of milliseconds at 50k entries, so only the keys
+            # sharing the most trigrams with the query are checked
+            candidates = self._trigram_candidates(query, MAX_SUBSEQUENCE_CANDIDATES, seen)
+
+        pattern = re.compile(".*?".join(re.escape(char) for char in query))
+        found = {}
+        for pos in candidates:
+            # "." does not match the newline between site and username, so a match stays in one field
+            match = pattern.search(self.keys[pos])
+            if match:
+                # the tighter the match, the better
+                found[pos] = match.end() - match.start()
+        return found
+
+    def _trigram_candidates(self, query: str, count: int, exclude) -> List[int]:
+        """Up to `count` positions not in `exclude`, most trigrams shared with the query first."""
+        last_query, ranked = self._gram_ranking
+        if last_query != query:
+            trigrams = {query[i:i + MAX_GRAM] for i in range(len(query) - MAX_GRAM + 1)}
+            postings = sorted((self.grams.get(gram, ()) for gram in trigrams), key=len)
+            common = COMMON_GRAM_SHARE * len(self.keys)
+            counts: Counter = Counter()
+            for posting in [posting for posting in postings if len(posting) <= common] or postings[:1]:
+                counts.update(posting)
+            ranked = sorted(counts, key=counts.__getitem__, reverse=True)
+            self._gram_ranking = (query, ranked)
+        return list(itertools.islice((pos for pos in ranked if pos not in exclude), count))
+
+    def _one_edit_ranges(self, table: _SortedTable, query: str) -> Iterator[Tuple[range, int]]:
+        """
+        Ranges of `table` whose texts start one deletion, swap, substitution or insertion away from
+        the query, with the penalty. A substituted or inserted letter can only be one that follows
+        the same head in the table, so those are read off the table instead of tried one by one.
+        People rarely get the first letter wrong, so changing it costs a little more, except for
+        swapping the first two ("lgoin").
+        """
+        within = range(len(table.texts))
+        for i in range(len(query) + 1):
+            head, tail = query[:i], query[i:]
+            if head:
+                within = table.prefix_range(head, within)
+                if not within:
+                    return
+            penalty = FIRST_LETTER_PENALTY if i == 0 else EDIT_PENALTY
+            if tail:
+                yield table.prefix_range(head + tail[1:], within), penalty
+            if len(tail) > 1 and tail[0] != tail[1]:
+                yield table.prefix_range(head + tail[1] + tail[0] + tail[2:], within), EDIT_PENALTY
+            for char, after in table.next_chars(head, within):
+                if tail and char != tail[0]:
+                    yield table.prefix_range(head + char + tail[1:], after), penalty
+                yield table.prefix_range(head + char + tail, after), penalty
+
+    def _fuzzy_matches(self, query: str, seen: Set[int]) -> Dict[int, int]:
+        distance = max_edit_distance(query)
+        if distance == 0:
+            return {}
+
+        # one edit: a word within one edit of the query starts with one of its one-edit variants,
+        # so prefix lookups find all of them, however few trigrams the typo leaves ("lgoin" shares
+        # none with "login")
+        found: Dict[int, int] = {}
+        for table in (self._prefix_table, self._boundary_table):
+            # different edits often land on the same words ("outlok" + "o" in either place)
+            ranges: Dict[range, int] = {}
+            for items, penalty in self._one_edit_ranges(table, query):
+                if items and penalty < ranges.get(items, penalty + 1):
+                    ranges[items] = penalty
+            for items, penalty in ranges.items():
+                for pos in table.positions[items.start:items.stop]:
+                    if pos in seen:
+                        continue
+                    penalty_here = len(query) + penalty + self._key_lengths[pos] // 10
+                    if penalty_here < found.get(pos, penalty_here + 1):
+                        found[pos] = penalty_here
+        if distance == 1 or len(found) >= MAX_FUZZY_CANDIDATES:
+            return found
+
+        # two edits, for longer queries that found few one-edit matches: only the candidates sharing
+        # the most trigrams get the full check. candidates share field endings ("@gmail.com"), so
+        # each word is measured once
+        span = len(query) + distance
+        distances: Dict[str, Optional[int]] = {}
+        for pos in self._trigram_candidates(query, MAX_FUZZY_CANDIDATES, seen | found.keys()):
+            best = None
+            for field in self.fields[pos]:
+                # try the query against the start of every word in the field
+                for start in [0] + [m.end() for m in _BOUNDARY.finditer(field)]:
+                    word = field[start:start + span]
+                    if word not in distances:
+                        distances[word] = prefix_distance(query, word, distance)
+                    d = distances[word]
+                    if d is not None and (best is None or d < best):
+                        best = d
+            if best is not None:
+                found[pos] = len(query) + best * EDIT_PENALTY + self._key_lengths[pos] // 10
+        return found
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+#####
+# client-side search index for the credential list
+# keys are lowercased once when the data changes, and every trigram points at the
+# credentials that contain it, so a keystroke never re-lowercases or rescans the vault
+#####
+
+MAX_GRAM = 3
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + MAX_GRAM] for i in range(len(text) - MAX_GRAM + 1)}
+
+
+class CredentialSearchIndex:
+    def __init__(self, credentials: Optional[Iterable[dict]] = None):
+        self.build(credentials or [])
+
+    def build(self, credentials: Iterable[dict]):
+        """Rebuild the index. Only call this when the credential list itself changes."""
+        self.credentials: List[dict] = list(credentials)
+        self.sites: List[str] = []
+        # site and username joined with a newline so a query can't match across both fields
+        self.keys: List[str] = []
+        self.grams: Dict[str, Set[int]] = {}
+        self._orders: Dict[tuple, List[int]] = {}
+        self._last_query: Optional[str] = None
+        self._last_result: Set[int] = set()
+
+        for pos, cred in enumerate(self.credentials):
+            site = (cred.get("site") or "").lower()
+            username = (cred.get("username") or "").lower()
+            key = f"{site}\n{username}"
+            self.sites.append(site)
+            self.keys.append(key)
+            for gram in _grams(site) | _grams(username):
+                self.grams.setdefault(gram, set()).add(pos)
+
+    def __len__(self):
+        return len(self.credentials)
+
+    def search(self, query: str) -> Set[int]:
+        """Return the positions whose site or username contains `query` (case-insensitive)."""
+        query = (query or "").lower().strip()
+        if not query:
+            result = set(range(len(self.keys)))
+        elif self._last_query and self._last_query in query:
+            # narrowing the previous query: the answer is a subset of the last result
+            result = {pos for pos in self._last_result if query in self.keys[pos]}
+        else:
+            result = self._lookup(query)
+
+        self._last_query = query
+        self._last_result = result
+        return result
+
+    def _lookup(self, query: str) -> Set[int]:
+        if len(query) < MAX_GRAM:
+            # one or two characters match most of the vault anyway, a plain scan is cheapest
+            return {pos for pos, key in enumerate(self.keys) if query in key}
+        if len(query) == MAX_GRAM:
+            return set(self.grams.get(query, ()))
+
+        # intersect the postings of every trigram, smallest first, then confirm
+        postings = []
+        for i in range(len(query) - MAX_GRAM + 1):
+            posting = self.grams.get(query[i:i + MAX_GRAM])
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+        return {pos for pos in candidates if query in self.keys[pos]}
+
+    def ordered(self, sort_key: Optional[str] = None, reverse: bool = False) -> List[int]:
+        """Positions in display order. Site orders are computed once per build and cached."""
+        if sort_key is None:
+            return list(range(len(self.keys)))
+        cache_key = (sort_key, reverse)
+        if cache_key not in self._orders:
+            self._orders[cache_key] = sorted(
+                range(len(self.sites)), key=self.sites.__getitem__, reverse=reverse
+            )
+        return self._orders[cache_key]
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+#####
+# startup trace: milliseconds from process start to each launch phase
+# main.py and the windows mark phases as they reach them (imports done, API server ready, login
+# window shown, main window populated); each phase is recorded the first time only. the clock starts
+# at process creation where the OS tells us (Linux /proc), otherwise when this module is imported.
+# PASSWORDMANAGER_STARTUP_LOG=<file> keeps the trace as JSON, =- prints each phase to stderr.
+#####
+
+STARTUP_LOG_ENV = "PASSWORDMANAGER_STARTUP_LOG"
+
+
+def _process_age_seconds() -> float:
+    """How long ago the process started, 0 where that can't be read cheaply."""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            # the command name can contain spaces, the fields after it can't
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+class StartupTrace:
+    def __init__(self, start: Optional[float] = None, log_path: Optional[str] = None):
+        self.start = start if start is not None else time.perf_counter()
+        self.log_path = log_path
+        self.events: List[Tuple[str, float]] = []
+        self.listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> Optional[float]:
+        """Record phase (first time only). Returns its time in ms, None if it was already recorded."""
+        elapsed_ms = round((time.perf_counter() - self.start) * 1000, 1)
+        with self._lock:
+            if any(name == phase for name, _ in self.events):
+                return None
+            self.events.append((phase, elapsed_ms))
+            self._write(phase, elapsed_ms)
+        for listener in list(self.listeners):
+            listener(phase)
+        return elapsed_ms
+
+    def phases(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self.events)
+
+    def summary(self) -> str:
+        return ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.phases().items())
+
+    def _write(self, phase: str, elapsed_ms: float):
+        if not self.log_path:
+            return
+        try:
+            if self.log_path == "-":
+                print(f"startup +{elapsed_ms:.1f} ms {phase}", file=sys.stderr)
+            else:
+                with open(self.log_path, "w", encoding="utf-8") as f:
+                    json.dump({"pid": os.getpid(), "phases": dict(self.events)}, f, indent=2)
+        except OSError:
+            pass
+
+
+startup_trace = StartupTrace(time.perf_counter() - _process_age_seconds(), os.environ.get(STARTUP_LOG_ENV))
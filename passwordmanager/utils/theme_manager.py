@@ -462,6 +462,9 @@ class ThemeManager:
                 """)
                 
         elif window_class_name == "ListCredentialsWidget":
+            # the cards are rebuilt in the new colors below (load_credentials), drop them now instead of restyling them
+            if hasattr(window, 'clear_cards'):
+                window.clear_cards(delete_now=True)
             # Apply tooltip styling globally - simple inline approach
             tooltip_style = f"""
             QToolTip {{
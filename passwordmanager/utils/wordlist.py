@@ -0,0 +1,130 @@
+import mmap
+import os
+import struct
+from typing import Iterable
+
+from passwordmanager.utils.pattern_strength import DICTIONARY_DIR
+
+#####
+# passphrase wordlist in a compact binary format, memory-mapped on first use
+# layout: header (magic, version, word count), then count + 1 little-endian uint32 offsets into the
+# blob, then the UTF-8 blob of all words back to back. word i is blob[offsets[i]:offsets[i + 1]],
+# so picking a word is two integer reads and a slice, and no Python list of strings is ever built.
+#
+# the bundled passphrase_words.bin is the EFF large wordlist (dictionaries/eff_large_wordlist.txt,
+# CC BY 3.0 US, Electronic Frontier Foundation), built with
+#     wordlist_from_text("eff_large_wordlist.txt", "passphrase_words.bin")
+# which keeps 7,772 of its 7,776 words (the four with hyphens are dropped), about 12.9 bits a word.
+# PASSWORDMANAGER_WORDLIST points at another file built the same way, to override it.
+#####
+
+WORDLIST_ENV = "PASSWORDMANAGER_WORDLIST"
+DEFAULT_WORDLIST_PATH = DICTIONARY_DIR / "passphrase_words.bin"
+
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 9
+
+
+class Wordlist:
+    """Read-only sequence of words backed by a memory-mapped wordlist file."""
+    MAGIC = b"PMWL"
+    HEADER = struct.Struct("<4sBI")  # magic, version, word count
+    OFFSET = struct.Struct("<II")
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map.size() < self.HEADER.size:
+                raise ValueError("not a wordlist file")
+            magic, version, count = self.HEADER.unpack_from(self._map, 0)
+            if magic != self.MAGIC or version != 1:
+                raise ValueError("not a wordlist file")
+            self._count = count
+            self._blob_start = self.HEADER.size + 4 * (count + 1)
+            if count == 0 or self._map.size() < self._blob_start:
+                raise ValueError("truncated wordlist file")
+            blob_size = struct.unpack_from("<I", self._map, self._blob_start - 4)[0]
+            if self._map.size() != self._blob_start + blob_size:
+                raise ValueError("truncated wordlist file")
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("wordlist index out of range")
+        start, end = self.OFFSET.unpack_from(self._map, self.HEADER.size + 4 * index)
+        return self._map[self._blob_start + start:self._blob_start + end].decode("utf-8")
+
+
+def build_wordlist(words: Iterable[str], target_path: str) -> int:
+    """Write words (first occurrence wins, blanks skipped) as a wordlist file. Returns the word count."""
+    unique = list(dict.fromkeys(word.strip() for word in words if word and word.strip()))
+    if not unique:
+        raise ValueError("no words to write")
+    encoded = [word.encode("utf-8") for word in unique]
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    with open(target_path, "wb") as target:
+        target.write(Wordlist.HEADER.pack(Wordlist.MAGIC, 1, len(encoded)))
+        target.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        target.write(b"".join(encoded))
+    return len(encoded)
+
+
+def wordlist_from_text(source_path: str, target_path: str) -> int:
+    """
+    Convert a text list into a wordlist file. Diceware-style lines ("11111<tab>abacus") keep the last
+    column; words are lowercased and must be 3-9 letters so a passphrase stays easy to type.
+    """
+    def words():
+        with open(source_path, encoding="utf-8") as source:
+            for line in source:
+                parts = line.split()
+                if not parts:
+                    continue
+                word = parts[-1].lower()
+                if MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH and word.isalpha():
+                    yield word
+
+    return build_wordlist(words(), target_path)
+
+
+_default_wordlist = {"wordlist": None}
+
+
+def default_wordlist_file() -> str:
+    return os.environ.get(WORDLIST_ENV) or str(DEFAULT_WORDLIST_PATH)
+
+
+def get_wordlist() -> Wordlist:
+    """The shared passphrase wordlist, mapped the first time a passphrase is generated."""
+    if _default_wordlist["wordlist"] is None:
+        _default_wordlist["wordlist"] = Wordlist(default_wordlist_file())
+    return _default_wordlist["wordlist"]
+
+
+def reset_wordlist():
+    """Close the shared wordlist so the next get_wordlist() maps the configured file again."""
+    if _default_wordlist["wordlist"] is not None:
+        _default_wordlist["wordlist"].close()
+        _default_wordlist["wordlist"] = None
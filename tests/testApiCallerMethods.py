@@ -20,7 +20,10 @@ class TestApiCallerMethods(unittest.TestCase):
         cls.server_thread.start()
         # wait for server readiness
         for _ in range(50):
-            status = acm.get_status()
+            try:
+                status = acm.get_status()
+            except acm.requests.exceptions.ConnectionError:
+                status = None
             if isinstance(status, dict):
                 break
             time.sleep(0.1)
@@ -78,6 +81,11 @@ class TestApiCallerMethods(unittest.TestCase):
         self.assertIsInstance(pw, str)
         self.assertEqual(len(pw), 16)
 
+    def test_get_new_generated_password_options(self):
+        data = acm.get_new_generated_password(length=12, count=3, symbols=False)
+        self.assertEqual(len(data["passwords"]), 3)
+        self.assertTrue(all(len(pw) == 12 and pw.isalnum() for pw in data["passwords"]))
+
     def test_update_credential(self):
         # create a credential
         site = "acm-upd-" + "".join(random.choices(string.digits, k=6))
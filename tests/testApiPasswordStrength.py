@@ -1,7 +1,7 @@
 import unittest
 import math
 from unittest.mock import patch
-from passwordmanager.utils.apiPasswordStrength import get_password_strength
+from passwordmanager.utils.apiPasswordStrength import get_password_strength, get_password_strengths
 
 
 class TestApiPasswordStrength(unittest.TestCase):
@@ -143,4 +143,16 @@ class TestApiPasswordStrength(unittest.TestCase):
         # Lowercase + other symbols (charSetSize = 46, log2(46) ≈ 5.52)
         self.assertEqual(get_password_strength("abc[]"), "weak")
         # 18 chars: entropy = 18 * log2(46) ≈ 99.4 -> strong
-        self.assertEqual(get_password_strength("abcdefghijklmn[]{}"), "strong")
\ No newline at end of file
+        self.assertEqual(get_password_strength("abcdefghijklmn[]{}"), "strong")
+
+    def test_batch_matches_single(self):
+        """Test that batch scoring agrees with scoring one password at a time"""
+        passwords = [
+            "", "   ", "abcde", "abcdefghij", "ABCDEFGHIJKLMNOPQR", "123!@#", "abc[]",
+            "abcdefghijklmn[]{}", "Passw0rd!", "Passw0rd!", "ÄÖÜäöü123", "pässwörd",
+        ]
+        self.assertEqual(get_password_strengths(passwords), [get_password_strength(p) for p in passwords])
+
+    def test_batch_handles_unclassified_characters(self):
+        """Test that characters outside every class score weak instead of failing the batch"""
+        self.assertEqual(get_password_strengths(["中文密码", "abcdefghijklmnopqr"]), ["weak", "strong"])
@@ -0,0 +1,119 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+import passwordmanager.utils.breach_checker as breach_checker
+from passwordmanager.utils.breach_checker import (
+    BloomFilter,
+    BreachChecker,
+    convert_hash_dump,
+    get_breach_checker,
+    sha1_digest,
+    write_hash_file,
+)
+
+BREACHED = ["password", "123456", "qwerty", "letmein", "Passw0rd!"]
+
+
+class TestBreachChecker(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.hash_path = os.path.join(self.tmpdir.name, "breached.bin")
+        extra = [sha1_digest(f"filler-{i}") for i in range(1000)]
+        write_hash_file([sha1_digest(p) for p in BREACHED] + extra, self.hash_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lookup(self):
+        with BreachChecker(self.hash_path) as checker:
+            self.assertEqual(checker.count, 1005)
+            for password in BREACHED:
+                self.assertTrue(checker.is_breached(password), password)
+            self.assertFalse(checker.is_breached("correct horse battery staple"))
+            self.assertFalse(checker.is_breached("Password"))
+            self.assertFalse(checker.is_breached(""))
+
+    def test_bloom_prefilter_round_trip(self):
+        bloom = BloomFilter.from_hash_file(self.hash_path)
+        bloom_path = self.hash_path + ".bloom"
+        bloom.save(bloom_path)
+        loaded = BloomFilter.load(bloom_path)
+        self.assertEqual(loaded.bit_count, bloom.bit_count)
+        with BreachChecker(self.hash_path, loaded) as checker:
+            for password in BREACHED:
+                self.assertTrue(checker.is_breached(password))
+            self.assertFalse(checker.is_breached("not in the list at all"))
+
+    def test_bloom_built_from_file_matches_adding_digests(self):
+        expected = BloomFilter.for_capacity(1005)
+        with open(self.hash_path, "rb") as f:
+            data = f.read()
+        for offset in range(0, len(data), 20):
+            expected.add(data[offset:offset + 20])
+        with patch.object(breach_checker, "BLOOM_BUILD_CHUNK", 64):
+            self.assertEqual(BloomFilter.from_hash_file(self.hash_path).bits, expected.bits)
+
+        with open(self.hash_path, "ab") as f:
+            f.write(b"\x00" * 3)
+        with self.assertRaises(ValueError):
+            BloomFilter.from_hash_file(self.hash_path)
+
+    def test_bloom_has_no_false_negatives(self):
+        bloom = BloomFilter.for_capacity(500)
+        digests = [sha1_digest(str(i)) for i in range(500)]
+        for digest in digests:
+            bloom.add(digest)
+        self.assertTrue(all(digest in bloom for digest in digests))
+        false_positives = sum(sha1_digest(f"x{i}") in bloom for i in range(2000))
+        self.assertLess(false_positives, 100)
+
+    def test_convert_hash_dump(self):
+        dump = os.path.join(self.tmpdir.name, "dump.txt")
+        hexes = sorted(sha1_digest(p).hex().upper() for p in BREACHED)
+        with open(dump, "w") as f:
+            f.write("\n".join(f"{h}:{n}" for n, h in enumerate(hexes)) + "\n")
+        target = os.path.join(self.tmpdir.name, "converted.bin")
+        self.assertEqual(convert_hash_dump(dump, target), len(BREACHED))
+        with BreachChecker(target) as checker:
+            self.assertTrue(checker.is_breached("qwerty"))
+
+        with open(dump, "w") as f:
+            f.write("\n".join(reversed(hexes)))
+        with self.assertRaises(ValueError):
+            convert_hash_dump(dump, target)
+
+    def test_rejects_bad_files(self):
+        bad = os.path.join(self.tmpdir.name, "bad.bin")
+        with open(bad, "wb") as f:
+            f.write(b"x" * 21)
+        with self.assertRaises(ValueError):
+            BreachChecker(bad)
+        with self.assertRaises(ValueError):
+            BloomFilter.load(bad)
+
+    def test_empty_file(self):
+        empty = os.path.join(self.tmpdir.name, "empty.bin")
+        open(empty, "wb").close()
+        with BreachChecker(empty) as checker:
+            self.assertFalse(checker.is_breached("password"))
+
+    def test_default_checker_is_optional(self):
+        missing = os.path.join(self.tmpdir.name, "missing.bin")
+        with patch.dict(os.environ, {breach_checker.BREACH_FILE_ENV: missing}), \
+                patch.dict(breach_checker._default_checker, {"loaded": False, "checker": None}):
+            self.assertIsNone(get_breach_checker())
+
+        BloomFilter.from_hash_file(self.hash_path).save(self.hash_path + ".bloom")
+        with patch.dict(os.environ, {breach_checker.BREACH_FILE_ENV: self.hash_path}), \
+                patch.dict(breach_checker._default_checker, {"loaded": False, "checker": None}):
+            checker = get_breach_checker()
+            self.assertIsNotNone(checker.bloom)
+            self.assertTrue(checker.is_breached("letmein"))
+            self.assertIs(get_breach_checker(), checker)
+            checker.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import csv
+import json
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from benchmarks.generate_vault import TEST_MASTER_PASSWORD, TEST_USERNAME
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROWS = 30
+
+
+def make_vault(path):
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.generate_vault", "--output", path, "--rows", str(ROWS), "--fast-kdf"],
+        cwd=REPO_ROOT, check=True, capture_output=True, timeout=120,
+    )
+
+
+def run_cli(db_path, *args, stdin="", password=TEST_MASTER_PASSWORD):
+    env = dict(os.environ)
+    env.pop("PASSWORDMANAGER_MASTER_PASSWORD", None)
+    if password is not None:
+        env["PASSWORDMANAGER_MASTER_PASSWORD"] = password
+    return subprocess.run(
+        [sys.executable, "-m", "passwordmanager", "--db", db_path, *args],
+        cwd=REPO_ROOT, input=stdin, capture_output=True, text=True, timeout=120, env=env,
+    )
+
+
+def ndjson(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+class TestCli(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.tmpdir.name, "vault.db")
+        make_vault(cls.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def cli(self, *args, **kwargs):
+        result = run_cli(self.db_path, *args, **kwargs)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout
+
+    def test_imports_neither_qt_nor_flask(self):
+        result = subprocess.run(
+            [sys.executable, "-c", "import sys, json, passwordmanager.cli; "
+             "print(json.dumps([m for m in ('PyQt6', 'flask', 'requests') if m in sys.modules]))"],
+            cwd=REPO_ROOT, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), [])
+
+    def test_unlock_picks_the_only_account(self):
+        status = json.loads(self.cli("unlock"))
+        self.assertEqual(status["username"], TEST_USERNAME)
+        self.assertGreaterEqual(status["credentials"], ROWS)
+        self.assertFalse(status["rotation_pending"])
+
+    def test_list_and_search_print_metadata_only(self):
+        rows = ndjson(self.cli("list"))
+        self.assertGreaterEqual(len(rows), ROWS)
+        self.assertTrue(all(set(row) == {"id", "site", "username", "created_at"} for row in rows))
+        self.assertEqual(len(ndjson(self.cli("list", "--limit", "3"))), 3)
+
+        site = rows[0]["site"]
+        found = ndjson(self.cli("search", site))
+        self.assertIn(rows[0]["id"], [row["id"] for row in found])
+        self.assertTrue(all("password" not in row for row in found))
+
+    def test_add_then_get(self):
+        added = json.loads(self.cli("add", "cli.example", "ann", stdin="s3cret-value\n"))
+        self.assertEqual(added["status"], "added")
+        self.assertNotIn("password", added)
+
+        credential = json.loads(self.cli("get", str(added["id"])))
+        self.assertEqual((credential["site"], credential["username"]), ("cli.example", "ann"))
+        self.assertEqual(credential["password"], "s3cret-value")
+        self.assertEqual(self.cli("get", str(added["id"]), "--field", "password"), "s3cret-value\n")
+
+        generated = json.loads(self.cli("add", "cli.example", "bea", "--generate", "--length", "24"))
+        self.assertEqual(len(generated["password"]), 24)
+        self.assertEqual(self.cli("get", str(generated["id"]), "--field", "password").strip(), generated["password"])
+
+    def test_master_password_from_stdin(self):
+        result = run_cli(self.db_path, "--password-stdin", "unlock", stdin=TEST_MASTER_PASSWORD + "\n", password=None)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        result = run_cli(self.db_path, "unlock", password=None)
+        self.assertEqual(result.returncode, 2)
+
+    def test_import_skips_existing(self):
+        csv_text = "site,username,password\nimport.example,dan,one\nimport.example,eve,two\n"
+        first = json.loads(self.cli("import", "-", stdin=csv_text))
+        self.assertEqual((first["inserted"], first["skipped"]), (2, 0))
+        again = json.loads(self.cli("import", "-", stdin=csv_text))
+        self.assertEqual((again["inserted"], again["skipped"]), (0, 2))
+
+        result = run_cli(self.db_path, "import", "-", stdin="site,password\nx,y\n")
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(json.loads(result.stderr)["error"], "missing required columns")
+
+    def test_export_formats_agree(self):
+        items = ndjson(self.cli("export"))
+        self.assertGreaterEqual(len(items), ROWS)
+        self.assertTrue(all(item["password"] for item in items))
+
+        document = json.loads(self.cli("export", "--format", "json"))
+        self.assertEqual(document["version"], 1)
+        self.assertEqual(document["items"], items)
+
+        path = os.path.join(self.tmpdir.name, "export.csv")
+        summary = json.loads(self.cli("export", "--format", "csv", "--output", path))
+        self.assertEqual(summary["count"], len(items))
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        with open(path, encoding="utf-8", newline="") as f:
+            self.assertEqual(list(csv.DictReader(f)), items)
+
+    def test_health_report(self):
+        report = json.loads(self.cli("health", "--no-breach-check"))
+        self.assertGreaterEqual(report["total"], ROWS)
+        self.assertFalse(report["breach_check"])
+        self.assertNotIn("password", json.dumps(report["weak"]))
+
+    def test_get_unknown_id(self):
+        result = run_cli(self.db_path, "get", "999999")
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(json.loads(result.stderr), {"error": "not found", "id": 999999})
+
+    def test_missing_vault_is_not_created(self):
+        path = os.path.join(self.tmpdir.name, "missing.db")
+        result = run_cli(path, "unlock")
+        self.assertEqual(result.returncode, 1)
+        self.assertFalse(os.path.exists(path))
+
+
+class TestCliLockout(unittest.TestCase):
+    def test_wrong_password_counts_towards_lockout(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "vault.db")
+            make_vault(db_path)
+            for _ in range(3):
+                result = run_cli(db_path, "unlock", password="wrong")
+                self.assertEqual(result.returncode, 3)
+                self.assertEqual(json.loads(result.stderr)["error"], "incorrect credentials")
+
+            # even the right password waits out the lockout
+            result = run_cli(db_path, "unlock")
+            self.assertEqual(result.returncode, 4)
+            self.assertGreater(json.loads(result.stderr)["lockout_seconds"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
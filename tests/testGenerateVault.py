@@ -0,0 +1,107 @@
+import json
+import random
+import sqlite3
+import unittest
+from types import SimpleNamespace
+
+from benchmarks.generate_vault import (
+    FAST_KDF_PARAMS,
+    bulk_insert,
+    create_test_account,
+    synthetic_credentials,
+)
+from passwordmanager.core.kdf import derive_wrap_key
+from passwordmanager.core.record_cipher import RecordCipher
+from passwordmanager.core.reuse_index import derive_reuse_key
+from passwordmanager.core.vmk import unwrap_vmk
+
+
+class TestGenerateVault(unittest.TestCase):
+    def setUp(self):
+        conn = sqlite3.connect(":memory:")
+        c = conn.cursor()
+        c.execute("""
+            CREATE TABLE credentials (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, site TEXT, username TEXT, password BLOB,
+                created_at TIMESTAMP, password_hmac TEXT, owner TEXT
+            )
+        """)
+        c.execute("CREATE INDEX idx_credentials_owner_site ON credentials(owner, site)")
+        c.execute("CREATE TABLE site_log (site TEXT)")
+        c.execute("CREATE TRIGGER credentials_log AFTER INSERT ON credentials BEGIN INSERT INTO site_log VALUES (new.site); END")
+        c.execute("""
+            CREATE TABLE user_metadata (
+                username TEXT PRIMARY KEY, wrapped_vmk BLOB, salt BLOB, kdf TEXT, kdf_params TEXT, owner_claimed INTEGER
+            )
+        """)
+        conn.commit()
+        self.pm = SimpleNamespace(conn=conn, c=c, db_path=":memory:")
+
+    def tearDown(self):
+        self.pm.conn.close()
+
+    def test_synthetic_credentials_are_reproducible_and_varied(self):
+        first = list(synthetic_credentials(2000, random.Random(7)))
+        second = list(synthetic_credentials(2000, random.Random(7)))
+        self.assertEqual(len(first), 2000)
+        self.assertEqual([row[:3] for row in first], [row[:3] for row in second])
+
+        logins = [(site, username) for site, username, _, _ in first]
+        passwords = [password for _, _, password, _ in first]
+        self.assertLess(len(set(logins)), len(logins))
+        self.assertLess(len(set(passwords)), len(passwords))
+        self.assertTrue(any(site.count(".") > 1 for site, _ in logins))
+        self.assertTrue(any("@" in username for _, username in logins))
+        self.assertTrue(any(len(password) >= 16 for password in passwords))
+
+    def test_account_opens_with_master_password(self):
+        vmk = create_test_account(self.pm, "load", "master-pw", FAST_KDF_PARAMS)
+        self.pm.c.execute("SELECT wrapped_vmk, salt, kdf_params, owner_claimed FROM user_metadata WHERE username = 'load'")
+        wrapped, salt, params, claimed = self.pm.c.fetchone()
+        self.assertEqual(unwrap_vmk(derive_wrap_key("master-pw", salt, json.loads(params)), wrapped), vmk)
+        self.assertEqual(claimed, 1)
+        with self.assertRaises(ValueError):
+            create_test_account(self.pm, "load", "other", FAST_KDF_PARAMS)
+
+    def test_bulk_insert_restores_indexes_and_triggers(self):
+        vmk = create_test_account(self.pm, "load", "master-pw", FAST_KDF_PARAMS)
+        cipher = RecordCipher(vmk)
+        credentials = list(synthetic_credentials(50, random.Random(1)))
+
+        self.assertEqual(bulk_insert(self.pm, "load", cipher, derive_reuse_key(vmk), credentials, batch_size=20), 50)
+
+        self.pm.c.execute("SELECT site, username, password, owner FROM credentials ORDER BY id")
+        rows = self.pm.c.fetchall()
+        self.assertEqual([(site, username) for site, username, _, _ in rows], [row[:2] for row in credentials])
+        self.assertEqual(cipher.decrypt(rows[0][2]).decode(), credentials[0][2])
+        self.assertEqual({row[3] for row in rows}, {"load"})
+
+        self.pm.c.execute("SELECT name FROM sqlite_master WHERE tbl_name = 'credentials' AND sql IS NOT NULL ORDER BY name")
+        self.assertEqual(
+            [row[0] for row in self.pm.c.fetchall()], ["credentials", "credentials_log", "idx_credentials_owner_site"]
+        )
+        # the trigger was off for the load and is back for later writes
+        self.pm.c.execute("INSERT INTO credentials (site) VALUES ('after')")
+        self.pm.c.execute("SELECT site FROM site_log")
+        self.assertEqual(self.pm.c.fetchall(), [("after",)])
+
+    def test_bulk_insert_with_worker_processes(self):
+        vmk = create_test_account(self.pm, "load", "master-pw", FAST_KDF_PARAMS)
+        cipher = RecordCipher(vmk)
+        credentials = list(synthetic_credentials(50, random.Random(2)))
+
+        inserted = bulk_insert(
+            self.pm, "load", cipher, derive_reuse_key(vmk), credentials, batch_size=7, workers=2, vmk=vmk
+        )
+        self.assertEqual(inserted, 50)
+        self.pm.c.execute("SELECT site, username, password FROM credentials ORDER BY id")
+        self.assertEqual(
+            [(site, username, cipher.decrypt(token).decode()) for site, username, token in self.pm.c.fetchall()],
+            [row[:3] for row in credentials],
+        )
+        with self.assertRaises(ValueError):
+            bulk_insert(self.pm, "load", cipher, None, credentials, workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sqlite3
+from datetime import datetime
+
+from passwordmanager.core.health_service import build_health_report
+
+
+class FakeCipher:
+    def decrypt(self, token: bytes) -> bytes:
+        # Return payload for tokens prefixed with b"ok:", else raise to simulate undecryptable
+        if token.startswith(b"ok:"):
+            return token.split(b"ok:", 1)[1]
+        raise ValueError("undecryptable")
+
+
+class TestHealthService(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.c = self.conn.cursor()
+        self.c.execute(
+            """
+            CREATE TABLE credentials (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT,
+                username TEXT,
+                password BLOB,
+                created_at DATETIME
+            )
+            """
+        )
+        rows = [
+            ("weak.com", "alice", b"ok:abc", "2026-01-01 00:00:00"),
+            ("reuse-a.com", "bob", b"ok:Shared#Password-2024", "2026-01-01 00:00:00"),
+            ("reuse-b.com", "bob", b"ok:Shared#Password-2024", "2020-01-01 00:00:00"),
+            ("strong.com", "carol", b"ok:V3ry-L0ng&Unique!Passphrase", None),
+            ("broken.com", "dave", b"garbage", "2026-01-01 00:00:00"),
+        ]
+        self.c.executemany(
+            "INSERT INTO credentials (site, username, password, created_at) VALUES (?, ?, ?, ?)", rows
+        )
+        self.conn.commit()
+        self.now = datetime(2026, 6, 1)
+
+    def tearDown(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def test_no_cipher_returns_empty_report(self):
+        report = build_health_report(self.c, None)
+        self.assertEqual(report["total"], 0)
+        self.assertEqual(report["weak"], [])
+
+    def test_groups_weak_reused_and_old(self):
+        report = build_health_report(self.c, FakeCipher(), now=self.now)
+        self.assertEqual(report["total"], 5)
+        self.assertEqual(report["unreadable"], 1)
+        self.assertEqual([item["site"] for item in report["weak"]], ["weak.com"])
+        self.assertEqual(len(report["reused"]), 1)
+        self.assertEqual(report["reused"][0]["count"], 2)
+        self.assertEqual(
+            {item["site"] for item in report["reused"][0]["credentials"]}, {"reuse-a.com", "reuse-b.com"}
+        )
+        self.assertEqual([item["site"] for item in report["old"]], ["reuse-b.com"])
+        self.assertEqual(report["old"][0]["created_at"], "01-01-2020")
+        self.assertEqual(report["counts"]["reused"], 2)
+        self.assertEqual(report["counts"]["old"], 1)
+        self.assertEqual(report["counts"]["weak"] + report["counts"]["medium"] + report["counts"]["strong"], 4)
+
+    def test_report_never_contains_passwords(self):
+        report = build_health_report(self.c, FakeCipher(), now=self.now)
+        self.assertNotIn("Shared#Password-2024", repr(report))
+        self.assertNotIn("abc'", repr(report))
+
+    def test_max_age_days(self):
+        report = build_health_report(self.c, FakeCipher(), now=self.now, max_age_days=30)
+        self.assertEqual(report["counts"]["old"], 3)
+
+    def test_breached_passwords(self):
+        class FakeBreachChecker:
+            def is_breached(self, password):
+                return password == "abc"
+
+        report = build_health_report(self.c, FakeCipher(), now=self.now, breach_checker=FakeBreachChecker())
+        self.assertTrue(report["breach_check"])
+        self.assertEqual([item["site"] for item in report["breached"]], ["weak.com"])
+        self.assertEqual(report["counts"]["breached"], 1)
+
+        report = build_health_report(self.c, FakeCipher(), now=self.now)
+        self.assertFalse(report["breach_check"])
+        self.assertEqual(report["breached"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
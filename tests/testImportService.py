@@ -18,7 +18,8 @@ class TestImportService(unittest.TestCase):
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 site TEXT,
                 username TEXT,
-                password BLOB
+                password BLOB,
+                owner TEXT
             )
             """
         )
@@ -76,7 +77,7 @@ class TestImportService(unittest.TestCase):
 
     def test_import_items_reports_errors_when_no_cipher(self):
         items = [{"site": "ex.com", "username": "u1", "password": "p1"}]
-        summary = import_items(self.c, items, None)
+        summary = import_items(self.c, items, None, owner="alice")
         self.assertEqual(summary["inserted"], 0)
         self.assertEqual(summary["skipped"], 0)
         self.assertEqual(summary["errors"], 1)
@@ -90,11 +91,23 @@ class TestImportService(unittest.TestCase):
             {"site": "ex.com", "username": "u1", "password": None},
             {"site": "ex.com", "username": "u2", "password": "p2"},
         ]
-        summary = import_items(self.c, items, BadCipher())
+        summary = import_items(self.c, items, BadCipher(), owner="alice")
         self.assertEqual(summary["inserted"], 0)
         self.assertEqual(summary["skipped"], 0)
         self.assertEqual(summary["errors"], 2)
 
+    def test_import_items_writes_owner_and_requires_one(self):
+        items = [{"site": "ex.com", "username": "u1", "password": "p1"}]
+        self.assertEqual(import_items(self.c, items, FakeCipher(), owner="alice")["inserted"], 1)
+        self.c.execute("SELECT password, owner FROM credentials")
+        self.assertEqual(self.c.fetchall(), [(b"enc:p1", "alice")])
+        # a row without an owner would never be listed or claimed
+        for owner in (None, ""):
+            with self.assertRaises(ValueError):
+                import_items(self.c, items, FakeCipher(), owner=owner)
+        with self.assertRaises(TypeError):
+            import_items(self.c, items, FakeCipher())
+
     # ---------- Endpoint tests ----------
     def test_import_locked_423(self):
         with app.test_client() as client:
@@ -0,0 +1,32 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from passwordmanager.core import kdf
+from passwordmanager.core.kdf import derive_wrap_key, derive_wrap_keys
+
+# cheap parameters, the tests only care that the results match the sequential ones
+FAST_PARAMS = {"time_cost": 1, "memory_cost": 1024, "parallelism": 1}
+
+
+class TestDeriveWrapKeys(unittest.TestCase):
+    def test_matches_sequential_in_job_order(self):
+        salt_a, salt_b = os.urandom(16), os.urandom(16)
+        jobs = [("first", salt_a, FAST_PARAMS), ("second", salt_b, FAST_PARAMS), ("first", salt_b, FAST_PARAMS)]
+        self.assertEqual(derive_wrap_keys(jobs), [derive_wrap_key(*job) for job in jobs])
+
+    def test_single_job_skips_the_pool(self):
+        salt = os.urandom(16)
+        with patch.object(kdf, "ThreadPoolExecutor") as executor:
+            result = derive_wrap_keys([("pw", salt, FAST_PARAMS)])
+        executor.assert_not_called()
+        self.assertEqual(result, [derive_wrap_key("pw", salt, FAST_PARAMS)])
+        self.assertEqual(derive_wrap_keys([]), [])
+
+    def test_errors_propagate(self):
+        with self.assertRaises(Exception):
+            derive_wrap_keys([("pw", b"short", FAST_PARAMS), ("pw", os.urandom(16), FAST_PARAMS)])
+
+
+if __name__ == "__main__":
+    unittest.main()
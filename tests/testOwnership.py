@@ -0,0 +1,46 @@
+import unittest
+import sqlite3
+
+from cryptography.fernet import Fernet
+
+from passwordmanager.core.ownership import owner_filter, claim_unowned_rows
+
+
+class TestOwnership(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.c = self.conn.cursor()
+        self.c.execute("CREATE TABLE credentials (id INTEGER PRIMARY KEY AUTOINCREMENT, password BLOB, owner TEXT)")
+        self.alice = Fernet(Fernet.generate_key())
+        self.bob = Fernet(Fernet.generate_key())
+        for i in range(5):
+            self.c.execute("INSERT INTO credentials (password) VALUES (?)", (self.alice.encrypt(b"a"),))
+            self.c.execute("INSERT INTO credentials (password) VALUES (?)", (self.bob.encrypt(b"b"),))
+        self.c.execute("INSERT INTO credentials (password, owner) VALUES (?, 'carol')", (self.alice.encrypt(b"c"),))
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def _owners(self):
+        self.c.execute("SELECT owner FROM credentials ORDER BY id")
+        return [row[0] for row in self.c.fetchall()]
+
+    def test_claim_by_trial_decryption(self):
+        self.assertEqual(claim_unowned_rows(self.c, "alice", self.alice, batch_size=3), {"claimed": 5, "left": 5})
+        # rows that already have an owner are never taken over
+        self.assertEqual(self._owners(), ["alice", None] * 5 + ["carol"])
+
+        self.assertEqual(claim_unowned_rows(self.c, "bob", self.bob), {"claimed": 5, "left": 0})
+        self.assertEqual(claim_unowned_rows(self.c, "bob", self.bob), {"claimed": 0, "left": 0})
+
+    def test_owner_filter(self):
+        claim_unowned_rows(self.c, "alice", self.alice)
+        for owner, expected in (("alice", 5), ("nobody", 0), (None, 11)):
+            mine, params = owner_filter(owner)
+            self.c.execute(f"SELECT COUNT(*) FROM credentials WHERE {mine}", params)
+            self.assertEqual(self.c.fetchone()[0], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import math
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from passwordmanager.utils import password_generator
+from passwordmanager.utils.password_generator import (
+    AMBIGUOUS, DIGITS, SYMBOLS, build_alphabet, generate_passphrases, generate_passwords,
+    passphrase_entropy_bits, password_entropy_bits, random_indices,
+)
+from passwordmanager.utils.wordlist import get_wordlist
+
+
+class TestBuildAlphabet(unittest.TestCase):
+    def test_default_is_the_original_72_characters(self):
+        self.assertEqual(
+            build_alphabet(),
+            "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()",
+        )
+
+    def test_classes_and_exclusions(self):
+        self.assertEqual(build_alphabet(lowercase=False, uppercase=False, symbols=False), DIGITS)
+        alphabet = build_alphabet(exclude="abc!", exclude_ambiguous=True)
+        for char in "abc!" + AMBIGUOUS:
+            self.assertNotIn(char, alphabet)
+        self.assertIn("d", alphabet)
+
+    def test_nothing_left_raises(self):
+        with self.assertRaises(ValueError):
+            build_alphabet(lowercase=False, uppercase=False, digits=False, symbols=False)
+        with self.assertRaises(ValueError):
+            build_alphabet(lowercase=False, uppercase=False, symbols=False, exclude=DIGITS)
+
+
+class TestRandomIndices(unittest.TestCase):
+    def test_range_and_count(self):
+        for bound in (1, 3, 72, 256, 257, 70000):
+            indices = random_indices(500, bound)
+            self.assertEqual(len(indices), 500)
+            self.assertTrue(all(0 <= i < bound for i in indices))
+
+    def test_rejects_bytes_above_the_last_full_multiple(self):
+        # with bound 100 only bytes below 200 are usable, 250 must be skipped rather than folded to 50
+        stream = iter([bytes([250, 10, 199, 200]) + bytes(100)])
+        with patch.object(password_generator.os, "urandom", lambda n: next(stream)[:n]):
+            self.assertEqual(random_indices(2, 100), [10, 99])
+
+    def test_roughly_uniform(self):
+        counts = Counter(random_indices(30000, 3))
+        for value in range(3):
+            self.assertGreater(counts[value], 9000)
+
+
+class TestGeneratePasswords(unittest.TestCase):
+    def test_batch(self):
+        alphabet = build_alphabet(symbols=False)
+        passwords = generate_passwords(1000, 20, alphabet)
+        self.assertEqual(len(passwords), 1000)
+        self.assertTrue(all(len(pw) == 20 for pw in passwords))
+        self.assertTrue(all(set(pw) <= set(alphabet) for pw in passwords))
+        self.assertFalse(any(set(pw) & set(SYMBOLS) for pw in passwords))
+        self.assertEqual(len(set(passwords)), 1000)
+
+    def test_non_ascii_alphabet(self):
+        passwords = generate_passwords(5, 8, "äöü")
+        self.assertTrue(all(len(pw) == 8 and set(pw) <= set("äöü") for pw in passwords))
+
+    def test_entropy(self):
+        self.assertAlmostEqual(password_entropy_bits(16, build_alphabet()), 16 * math.log2(72))
+
+
+class TestGeneratePassphrases(unittest.TestCase):
+    def test_words_and_separator(self):
+        wordlist = get_wordlist()
+        words = {wordlist[i] for i in range(len(wordlist))}
+        phrases = generate_passphrases(50, 5, separator=" ")
+        self.assertEqual(len(phrases), 50)
+        for phrase in phrases:
+            parts = phrase.split(" ")
+            self.assertEqual(len(parts), 5)
+            self.assertTrue(set(parts) <= words)
+
+    def test_capitalize_and_custom_wordlist(self):
+        phrase = generate_passphrases(1, 3, capitalize=True, wordlist=["alpha"])[0]
+        self.assertEqual(phrase, "Alpha-Alpha-Alpha")
+
+    def test_entropy(self):
+        self.assertAlmostEqual(passphrase_entropy_bits(4, ["a", "b"]), 4.0)
+        self.assertGreater(passphrase_entropy_bits(6), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,13 +6,17 @@ import tempfile
 import os
 import sys
 import datetime
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from unittest.mock import patch
+from cryptography.fernet import Fernet
 from passwordmanager.api.routes import app
+import passwordmanager.api.routes as routes_module
 from passwordmanager.core.passwordManager import c, conn
 import passwordmanager.core.passwordManager as pm
+from passwordmanager.core.vault_session import SESSION_HEADER, SessionStore
 
 class TestVaultAPI(unittest.TestCase):
     @classmethod
@@ -74,10 +78,10 @@ class TestVaultAPI(unittest.TestCase):
         self.assertEqual(r.status_code, 200)
 
         # get current wrapped vmk before change for comparison
-        c.execute("SELECT wrapped_vmk FROM user_metadata WHERE username = ?", (username,))
+        c.execute("SELECT wrapped_vmk, salt FROM user_metadata WHERE username = ?", (username,))
         row_before = c.fetchone()
         self.assertIsNotNone(row_before)
-        wrapped_before = row_before[0]
+        wrapped_before, salt_before = row_before
 
         # trying to change the master password without including required parameters should return 400
         bad = self.client.put("/account/password", json={})
@@ -106,6 +110,8 @@ class TestVaultAPI(unittest.TestCase):
 
         self.assertNotEqual(wrapped_before, wrapped_after,
                             "wrapped VMK must change after password rotation")
+        c.execute("SELECT salt FROM user_metadata WHERE username = ?", (username,))
+        self.assertNotEqual(c.fetchone()[0], salt_before, "salt must be rotated with the password")
 
         # login to dummy account with old password should fail
         self.client.post("/account/logout")
@@ -119,6 +125,260 @@ class TestVaultAPI(unittest.TestCase):
         self.assertEqual(r.status_code, 200)
         self.assertEqual(r.get_json().get("status"), "logged in")
 
+    def test_rotate_vmk_reencrypts_credentials(self):
+        username = ''.join(random.choices(string.ascii_letters + string.digits, k=50))
+        self.client.post("/account/create", json={"username": username, "master_password": "rotate-pw"})
+        self.client.post("/account/login", json={"username": username, "master_password": "rotate-pw"})
+
+        ids = []
+        for i in range(5):
+            r = self.client.post("/add", json={"site": f"unittest-rotate-{i}", "username": "u", "password": f"pw-{i % 2}"})
+            ids.append(r.get_json()["id"])
+        placeholders = ",".join("?" * len(ids))
+        c.execute(f"SELECT password, password_hmac FROM credentials WHERE id IN ({placeholders}) ORDER BY id", ids)
+        before = c.fetchall()
+        c.execute("SELECT wrapped_vmk FROM user_metadata WHERE username = ?", (username,))
+        wrapped_before = c.fetchone()[0]
+
+        r = self.client.post("/account/rotate-vmk", json={"master_password": "WRONG", "background": False})
+        self.assertEqual(r.status_code, 403)
+        r = self.client.post("/account/rotate-vmk", json={})
+        self.assertEqual(r.status_code, 400)
+
+        r = self.client.post("/account/rotate-vmk", json={"master_password": "rotate-pw", "background": False})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.get_json()["status"], "rotation complete")
+        self.assertFalse(self.client.get("/account/rotate-vmk").get_json()["rotating"])
+
+        c.execute(f"SELECT password, password_hmac FROM credentials WHERE id IN ({placeholders}) ORDER BY id", ids)
+        after = c.fetchall()
+        for (token_before, hmac_before), (token_after, hmac_after) in zip(before, after):
+            self.assertNotEqual(token_before, token_after)
+            self.assertNotEqual(hmac_before, hmac_after)
+        c.execute("SELECT wrapped_vmk FROM user_metadata WHERE username = ?", (username,))
+        self.assertNotEqual(c.fetchone()[0], wrapped_before)
+
+        # readable now, after logging in again, and the reuse index still sees the shared passwords
+        for i, cred_id in enumerate(ids):
+            self.assertEqual(self.client.get(f"/get/{cred_id}").get_json()["password"], f"pw-{i % 2}")
+        self.client.post("/account/logout")
+        self.client.post("/account/login", json={"username": username, "master_password": "rotate-pw"})
+        self.assertEqual(self.client.get(f"/get/{ids[0]}").get_json()["password"], "pw-0")
+        reused = self.client.get("/health/reused").get_json()
+        self.assertEqual(sorted(group["count"] for group in reused["groups"] if group["credentials"][0]["id"] in ids), [2, 3])
+
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+
+    def test_rotate_vmk_requires_login(self):
+        self.client.post("/lock")
+        r = self.client.post("/account/rotate-vmk", json={"master_password": "x"})
+        self.assertEqual(r.status_code, 423)
+        self.assertEqual(self.client.get("/account/rotate-vmk").status_code, 423)
+        self.client.post("/unlock")
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+
+    def test_independent_sessions(self):
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        username = ''.join(random.choices(string.ascii_letters + string.digits, k=50))
+        self.client.post("/account/create", json={"username": username, "master_password": "session-pw"})
+
+        r = self.client.post("/session")
+        self.assertEqual(r.status_code, 201)
+        other = {r.get_json()["header"]: r.get_json()["session"]}
+        # a fresh session starts locked, whatever the default session is doing
+        self.assertTrue(self.client.get("/status", headers=other).get_json()["vault_locked"])
+        self.assertEqual(self.client.get("/list", headers=other).status_code, 423)
+
+        r = self.client.post("/account/login", json={"username": username, "master_password": "session-pw"}, headers=other)
+        self.assertEqual(r.status_code, 200)
+        r = self.client.post("/add", json={"site": "unittest-session", "username": "u", "password": "theirs"}, headers=other)
+        other_id = r.get_json()["id"]
+        self.assertEqual(self.client.get(f"/get/{other_id}", headers=other).get_json()["password"], "theirs")
+        self.assertEqual(routes_module.sessions.default.username, "unittest-user")
+
+        # locking one session leaves the other open
+        self.client.post("/lock", headers=other)
+        self.assertEqual(self.client.get(f"/get/{other_id}", headers=other).status_code, 423)
+        self.assertEqual(self.client.get("/list").status_code, 200)
+
+        # logging out ends a token session, unknown tokens are refused
+        self.client.post("/account/logout", headers=other)
+        self.assertEqual(self.client.get("/status", headers=other).status_code, 401)
+        self.assertEqual(self.client.get("/status", headers={"X-Vault-Session": "made-up"}).status_code, 401)
+        self.assertFalse(self.client.get("/status").get_json()["vault_locked"])
+
+    def test_secret_cache_skips_repeat_decrypts(self):
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        r = self.client.post("/add", json={"site": "unittest-cache", "username": "u", "password": "cache-pw"})
+        cred_id = r.get_json()["id"]
+
+        cipher = routes_module.sessions.default.cipher
+        with patch.object(cipher, "decrypt", wraps=cipher.decrypt) as decrypt:
+            for _ in range(3):
+                self.assertEqual(self.client.get(f"/get/{cred_id}").get_json()["password"], "cache-pw")
+            self.assertEqual(decrypt.call_count, 1)
+
+            # an update replaces the token, so the next read decrypts the new one
+            self.client.put("/update", json={"id": cred_id, "site": "unittest-cache", "username": "u", "password": "new-pw"})
+            self.assertEqual(self.client.get(f"/get/{cred_id}").get_json()["password"], "new-pw")
+            self.assertEqual(decrypt.call_count, 2)
+
+        self.assertGreater(len(routes_module.sessions.default.cache), 0)
+        self.client.post("/lock")
+        self.assertEqual(len(routes_module.sessions.default.cache), 0)
+        self.client.post("/unlock")
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+
+    def test_records_and_legacy_tokens(self):
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        r = self.client.post("/add", json={"site": "unittest-record", "username": "u", "password": "record-pw"})
+        new_id = r.get_json()["id"]
+        c.execute("SELECT password FROM credentials WHERE id = ?", (new_id,))
+        self.assertEqual(c.fetchone()[0][:1], b"\x01")
+
+        # a row written before the record format still reads, and the bulk migration converts it
+        c.execute(
+            "INSERT INTO credentials (site, username, password, owner) VALUES (?, ?, ?, ?)",
+            ("unittest-legacy", "u", Fernet(routes_module.sessions.default.vmk).encrypt(b"legacy-pw"), "unittest-user"),
+        )
+        legacy_id = c.lastrowid
+        conn.commit()
+        self.assertEqual(self.client.get(f"/get/{legacy_id}").get_json()["password"], "legacy-pw")
+
+        r = self.client.post("/records/migrate")
+        self.assertEqual(r.status_code, 200)
+        self.assertGreaterEqual(r.get_json()["migrated"], 1)
+        c.execute("SELECT password FROM credentials WHERE id = ?", (legacy_id,))
+        self.assertEqual(c.fetchone()[0][:1], b"\x01")
+        self.assertEqual(self.client.get(f"/get/{legacy_id}").get_json()["password"], "legacy-pw")
+        self.assertEqual(self.client.post("/records/migrate").get_json()["migrated"], 0)
+
+    def test_rows_are_scoped_to_their_owner(self):
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        vmk = routes_module.sessions.default.vmk
+        r = self.client.post("/add", json={"site": "unittest-mine", "username": "u", "password": "mine"})
+        mine_id = r.get_json()["id"]
+
+        username = ''.join(random.choices(string.ascii_letters + string.digits, k=50))
+        self.client.post("/account/create", json={"username": username, "master_password": "owner-pw"})
+        self.client.post("/account/login", json={"username": username, "master_password": "owner-pw"})
+        r = self.client.post("/add", json={"site": "unittest-theirs", "username": "u", "password": "theirs"})
+        theirs_id = r.get_json()["id"]
+        self.assertEqual([row["id"] for row in self.client.get("/list").get_json()], [theirs_id])
+        self.assertEqual(self.client.get(f"/get/{mine_id}").status_code, 404)
+        self.assertEqual(self.client.delete(f"/delete/{mine_id}").status_code, 404)
+        self.assertEqual(self.client.get("/search?q=unittest").get_json()["total"], 1)
+
+        # rows from before the owner column are claimed, by trial decryption, on the owner's next login
+        c.execute(
+            "INSERT INTO credentials (site, username, password) VALUES (?, ?, ?)",
+            ("unittest-unowned", "u", Fernet(vmk).encrypt(b"old-pw")),
+        )
+        unowned_id = c.lastrowid
+        c.execute("UPDATE user_metadata SET owner_claimed = 0 WHERE username IN ('unittest-user', ?)", (username,))
+        conn.commit()
+        self.client.post("/account/login", json={"username": username, "master_password": "owner-pw"})
+        c.execute("SELECT owner FROM credentials WHERE id = ?", (unowned_id,))
+        self.assertIsNone(c.fetchone()[0])
+
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        c.execute("SELECT owner FROM credentials WHERE id = ?", (unowned_id,))
+        self.assertEqual(c.fetchone()[0], "unittest-user")
+        self.assertEqual(self.client.get(f"/get/{unowned_id}").get_json()["password"], "old-pw")
+        c.execute("SELECT owner_claimed FROM user_metadata WHERE username = 'unittest-user'")
+        self.assertEqual(c.fetchone()[0], 1)
+
+    def test_quick_unlock_after_lock(self):
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        r = self.client.post("/add", json={"site": "unittest-quick", "username": "u", "password": "quick-pw"})
+        cred_id = r.get_json()["id"]
+
+        self.assertEqual(self.client.post("/account/quick-unlock/setup", json={"pin": "12"}).status_code, 400)
+        r = self.client.post("/account/quick-unlock/setup", json={"pin": "4321"})
+        self.assertEqual(r.status_code, 200)
+
+        # nothing to re-open while the vault is unlocked
+        self.assertEqual(self.client.post("/account/quick-unlock", json={"pin": "4321"}).status_code, 403)
+
+        self.client.post("/lock")
+        self.assertIsNone(routes_module.sessions.default.vmk)
+        status = self.client.get("/account/quick-unlock").get_json()
+        self.assertTrue(status["available"])
+        self.assertEqual(status["username"], "unittest-user")
+
+        r = self.client.post("/account/quick-unlock", json={"pin": "0000"})
+        self.assertEqual(r.status_code, 401)
+        self.assertEqual(r.get_json()["attempts_left"], 2)
+        r = self.client.post("/account/quick-unlock", json={"pin": "4321"})
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(self.client.get(f"/get/{cred_id}").get_json()["password"], "quick-pw")
+
+        # logging out forgets the PIN
+        self.client.post("/account/logout")
+        self.assertFalse(self.client.get("/account/quick-unlock").get_json()["enrolled"])
+        self.assertEqual(self.client.post("/account/quick-unlock", json={"pin": "4321"}).status_code, 403)
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+
+    def test_quick_unlock_belongs_to_its_session(self):
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        self.client.post("/account/quick-unlock/setup", json={"pin": "8642"})
+        self.client.post("/lock")
+        r = self.client.post("/session")
+        other = {r.get_json()["header"]: r.get_json()["session"]}
+        try:
+            # another client neither sees nor uses the PIN window, and can't drop it
+            self.assertFalse(self.client.get("/account/quick-unlock", headers=other).get_json()["available"])
+            self.assertEqual(self.client.post("/account/quick-unlock", json={"pin": "8642"}, headers=other).status_code, 403)
+            self.client.delete("/account/quick-unlock", headers=other)
+            # logging out a session without a user leaves someone else's PIN alone
+            self.client.post("/account/logout", headers=other)
+            self.assertTrue(self.client.get("/account/quick-unlock").get_json()["available"])
+            self.assertEqual(self.client.post("/account/quick-unlock", json={"pin": "8642"}).status_code, 200)
+        finally:
+            self.client.delete("/account/quick-unlock")
+            self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+
+    def test_session_limit(self):
+        saved = routes_module.sessions
+        routes_module.sessions = SessionStore(max_sessions=1)
+        try:
+            self.assertEqual(self.client.post("/session").status_code, 201)
+            # a session that holds no keys makes room for a new one
+            r = self.client.post("/session")
+            self.assertEqual(r.status_code, 201)
+            header = {r.get_json()["header"]: r.get_json()["session"]}
+            self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"},
+                             headers=header)
+            # a logged-in one is never pushed out, the new session is refused instead
+            self.assertEqual(self.client.post("/session").status_code, 429)
+            self.assertFalse(self.client.get("/status", headers=header).get_json()["vault_locked"])
+        finally:
+            routes_module.sessions.remove(routes_module.sessions.get(header[SESSION_HEADER]))
+            routes_module.sessions = saved
+
+    def test_idle_auto_lock(self):
+        self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+        self.client.post("/account/quick-unlock/setup", json={"pin": "97531"})
+        saved = routes_module.auto_lock["idle_seconds"]
+        try:
+            routes_module.auto_lock["idle_seconds"] = 60
+            routes_module.sessions.default.last_activity = time.time() - 61
+            # the status check itself doesn't count as activity, and sees the lock
+            self.assertTrue(self.client.get("/status").get_json()["vault_locked"])
+            self.assertEqual(self.client.get("/list").status_code, 423)
+            self.assertTrue(self.client.get("/account/quick-unlock").get_json()["available"])
+            self.assertEqual(self.client.post("/account/quick-unlock", json={"pin": "97531"}).status_code, 200)
+
+            # recent activity keeps it open, and 0 turns auto-lock off
+            self.assertFalse(self.client.get("/status").get_json()["vault_locked"])
+            routes_module.auto_lock["idle_seconds"] = 0
+            routes_module.sessions.default.last_activity = time.time() - 10 ** 6
+            self.assertEqual(self.client.get("/list").status_code, 200)
+        finally:
+            routes_module.auto_lock["idle_seconds"] = saved
+            self.client.delete("/account/quick-unlock")
+            self.client.post("/account/login", json={"username": "unittest-user", "master_password": "unittest-pass"})
+
     # def test_account_password_change_flow(self):
     #     # create a new user for this test. we don't have a method to delete accounts yet and
     #     # there are no repeat usernames allowed, so for now username is a random string of length 50
@@ -264,6 +524,60 @@ class TestVaultAPI(unittest.TestCase):
         status = self.client.get("/status").get_json()
         self.assertFalse(status.get("vault_locked", True))
         
+    # /metrics reports the routes in Prometheus text format, to loopback clients only
+    def test_metrics_endpoint(self):
+        if routes_module.metrics is None:
+            # PASSWORDMANAGER_METRICS=0
+            self.assertEqual(self.client.get("/metrics").status_code, 404)
+            return
+        self.client.get("/status")
+        self.client.get("/list")
+        r = self.client.get("/metrics")
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(r.mimetype.startswith("text/plain"))
+        text = r.get_data(as_text=True)
+        self.assertIn('passwordmanager_http_requests_total{route="/list",method="GET",status="200"}', text)
+        self.assertIn('passwordmanager_request_phase_calls_total{route="/list",phase="db"}', text)
+        self.assertIn("# TYPE passwordmanager_http_request_duration_seconds histogram", text)
+
+        r = self.client.get("/metrics", environ_base={"REMOTE_ADDR": "192.168.1.20"})
+        self.assertEqual(r.status_code, 404)
+
+    # /debug/profiling switches request profiling on and lists the saved profiles
+    def test_debug_profiling_endpoint(self):
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                patch.object(routes_module.profiler, "directory", tmpdir), \
+                patch.object(routes_module.profiler, "_saved", None):
+            r = self.client.post("/debug/profiling", json={"enabled": True, "routes": ["/list"], "keep": 3})
+            self.assertEqual(r.status_code, 200)
+            self.assertTrue(r.get_json()["enabled"])
+            self.client.get("/list")
+            self.client.get("/status")
+
+            profiles = self.client.get("/debug/profiling").get_json()["profiles"]
+            self.assertEqual(len(profiles), 1)
+            self.assertTrue(profiles[0]["file"].startswith("list-"))
+
+            self.assertEqual(self.client.post("/debug/profiling", json={"enabled": True, "keep": 0}).status_code, 400)
+            self.assertEqual(self.client.post("/debug/profiling", json={"enabled": True, "keep": True}).status_code, 400)
+            self.assertEqual(self.client.post("/debug/profiling", json={"enabled": True, "routes": 5}).status_code, 400)
+            r = self.client.post("/debug/profiling", json={"enabled": False})
+            self.assertFalse(r.get_json()["enabled"])
+            r = self.client.get("/debug/profiling", environ_base={"REMOTE_ADDR": "10.0.0.8"})
+            self.assertEqual(r.status_code, 404)
+
+    def test_debug_profiling_needs_explicit_json(self):
+        with patch.object(routes_module.profiler, "configure") as configure:
+            # what a cross-origin page can send without a preflight
+            self.assertEqual(self.client.post("/debug/profiling").status_code, 415)
+            r = self.client.post("/debug/profiling", data='{"enabled": true}', content_type="text/plain")
+            self.assertEqual(r.status_code, 415)
+            # and nothing is switched on by default
+            self.assertEqual(self.client.post("/debug/profiling", json={}).status_code, 400)
+            self.assertEqual(self.client.post("/debug/profiling", json={"enabled": "yes"}).status_code, 400)
+            self.assertEqual(self.client.post("/debug/profiling", json=[True]).status_code, 400)
+            configure.assert_not_called()
+
     # tests which are redundant in practice but get to 100% coverage #############################################
     def test_status_and_lock_unlock_cycle(self):
         # initial status after login in setUpClass should be unlocked
@@ -371,6 +685,120 @@ class TestVaultAPI(unittest.TestCase):
         self.assertEqual(r.status_code, 200)
         self.assertEqual(r.get_json().get("status"), "updated")
 
+    def test_reused_passwords_from_hash_index(self):
+        # earlier tests may leave the vault locked
+        self.client.post("/account/login", json={"username":"unittest-user","master_password":"unittest-pass"})
+        ids = []
+        for site, pwd in (("unittest-reuse-a.com", "Same-Pass-1"), ("unittest-reuse-b.com", "Same-Pass-1"), ("unittest-reuse-c.com", "Other-Pass-2")):
+            r = self.client.post("/add", json={"site": site, "username": "ru", "password": pwd})
+            ids.append(r.get_json()["id"])
+
+        def reused_ids():
+            groups = self.client.get("/health/reused").get_json()["groups"]
+            return [sorted(item["id"] for item in group["credentials"]) for group in groups]
+
+        self.assertIn(sorted(ids[:2]), reused_ids())
+
+        # the hash follows the password on update
+        self.client.put("/update", json={"id": ids[2], "site": "unittest-reuse-c.com", "username": "ru", "password": "Same-Pass-1"})
+        self.assertIn(sorted(ids), reused_ids())
+
+        # rows without a hash (written before the index existed) are backfilled on demand
+        c.execute("UPDATE credentials SET password_hmac = NULL WHERE id = ?", (ids[0],))
+        conn.commit()
+        self.assertIn(sorted(ids), reused_ids())
+        c.execute("SELECT password_hmac FROM credentials WHERE id = ?", (ids[0],))
+        self.assertIsNotNone(c.fetchone()[0])
+
+    def test_health_report_is_cached_by_revision(self):
+        r = self.client.post("/add", json={"site": "unittest-health-a.com", "username": "h", "password": "abc"})
+        weak_id = r.get_json()["id"]
+        self.client.post("/add", json={"site": "unittest-health-b.com", "username": "h", "password": "Reused#Passw0rd!!"})
+        self.client.post("/add", json={"site": "unittest-health-c.com", "username": "h", "password": "Reused#Passw0rd!!"})
+
+        r = self.client.get("/health")
+        self.assertEqual(r.status_code, 200)
+        report = r.get_json()
+        self.assertIn(weak_id, [item["id"] for item in report["weak"]])
+        reused_sites = [
+            {item["site"] for item in group["credentials"]} for group in report["reused"]
+        ]
+        self.assertIn({"unittest-health-b.com", "unittest-health-c.com"}, reused_sites)
+        self.assertNotIn("Reused#Passw0rd!!", r.get_data(as_text=True))
+
+        # same revision: served from the cache, a write invalidates it
+        cached = routes_module.health_report_cache["report"]
+        self.client.get("/health")
+        self.assertIs(routes_module.health_report_cache["report"], cached)
+        self.client.delete(f"/delete/{weak_id}")
+        report = self.client.get("/health").get_json()
+        self.assertNotIn(weak_id, [item["id"] for item in report["weak"]])
+
+        r = self.client.get("/health", query_string={"max_age_days": "soon"})
+        self.assertEqual(r.status_code, 400)
+
+    def test_fts_search_paginates_and_tracks_changes(self):
+        ids = []
+        for i in range(3):
+            r = self.client.post("/add", json={"site": f"unittest-ftsbank{i}.com", "username": "ftsuser", "password": "SecretPw1!"})
+            ids.append(r.get_json()["id"])
+
+        r = self.client.get("/search", query_string={"q": "unittest ftsbank", "limit": 2})
+        self.assertEqual(r.status_code, 200)
+        data = r.get_json()
+        self.assertEqual(data["total"], 3)
+        self.assertEqual(len(data["results"]), 2)
+        self.assertTrue(all("password" not in item for item in data["results"]))
+        r = self.client.get("/search", query_string={"q": "unittest ftsbank", "limit": 2, "offset": 2})
+        page_two = [item["id"] for item in r.get_json()["results"]]
+        self.assertEqual(len(page_two), 1)
+        self.assertEqual(set(page_two) | {item["id"] for item in data["results"]}, set(ids))
+
+        # the triggers keep the index in sync with updates and deletes
+        self.client.put("/update", json={"id": ids[0], "site": "unittest-renamed.org", "username": "ftsuser", "password": "SecretPw1!"})
+        self.client.delete(f"/delete/{ids[1]}")
+        r = self.client.get("/search", query_string={"q": "ftsbank"})
+        self.assertEqual([item["id"] for item in r.get_json()["results"]], [ids[2]])
+        r = self.client.get("/search", query_string={"q": "renamed"})
+        self.assertEqual([item["id"] for item in r.get_json()["results"]], [ids[0]])
+
+        # FTS syntax in the query is treated as plain text
+        r = self.client.get("/search", query_string={"q": 'ftsbank" OR *'})
+        self.assertEqual(r.status_code, 200)
+        r = self.client.get("/search", query_string={"q": "x", "offset": "later"})
+        self.assertEqual(r.status_code, 400)
+
+    def test_fuzzy_search_ranks_and_hides_passwords(self):
+        ids = []
+        for site in ("unittest-fuzzy.com", "unittest-fuzzymirror.net", "unittest-other.org"):
+            r = self.client.post("/add", json={"site": site, "username": "fz", "password": "SecretPw1!"})
+            ids.append(r.get_json()["id"])
+
+        r = self.client.get("/search/fuzzy", query_string={"q": "unittest-fuzzy", "limit": 5})
+        self.assertEqual(r.status_code, 200)
+        results = r.get_json()["results"]
+        self.assertEqual(results[0]["id"], ids[0])
+        self.assertEqual(results[0]["match"], "prefix")
+        self.assertIn(ids[1], [item["id"] for item in results])
+        self.assertNotIn(ids[2], [item["id"] for item in results])
+        self.assertTrue(all("password" not in item for item in results))
+
+        # typo still finds it, and a change to the vault is picked up
+        self.client.delete(f"/delete/{ids[1]}")
+        r = self.client.get("/search/fuzzy", query_string={"q": "unittest-fuzzzy"})
+        found = [item["id"] for item in r.get_json()["results"]]
+        self.assertIn(ids[0], found)
+        self.assertNotIn(ids[1], found)
+
+        r = self.client.get("/search/fuzzy", query_string={"q": "x", "limit": "many"})
+        self.assertEqual(r.status_code, 400)
+
+        self.client.post("/lock")
+        r = self.client.get("/search/fuzzy", query_string={"q": "unittest"})
+        self.assertEqual(r.status_code, 423)
+        self.client.post("/unlock")
+        self.client.post("/account/login", json={"username":"unittest-user","master_password":"unittest-pass"})
+
     def test_generate_password_default(self):
         r = self.client.get("/get/generated-password")
         self.assertEqual(r.status_code, 200)
@@ -382,6 +810,33 @@ class TestVaultAPI(unittest.TestCase):
         allowed = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()")
         self.assertTrue(all(ch in allowed for ch in pw))
 
+    def test_generate_password_options(self):
+        r = self.client.get("/get/generated-password", query_string={
+            "count": "200", "length": "24", "symbols": "false", "exclude": "xyz", "exclude_ambiguous": "1",
+        })
+        self.assertEqual(r.status_code, 200)
+        data = r.get_json()
+        self.assertEqual(data["count"], 200)
+        self.assertEqual(len(data["passwords"]), 200)
+        self.assertEqual(data["password"], data["passwords"][0])
+        for pw in data["passwords"]:
+            self.assertEqual(len(pw), 24)
+            self.assertFalse(set(pw) & set("!@#$%^&*()xyzIl1O0o"))
+        self.assertGreater(data["entropy_bits"], 24 * 5)
+
+        r = self.client.get("/get/generated-password", query_string={
+            "mode": "passphrase", "words": "4", "separator": ".", "count": "3",
+        })
+        self.assertEqual(r.status_code, 200)
+        data = r.get_json()
+        self.assertEqual(len(data["passwords"]), 3)
+        self.assertTrue(all(len(phrase.split(".")) == 4 for phrase in data["passwords"]))
+
+        for bad in ({"count": "0"}, {"length": "abc"}, {"mode": "pin"}, {"words": "1000", "mode": "passphrase"},
+                    {"lowercase": "0", "uppercase": "0", "digits": "0", "symbols": "0"}):
+            r = self.client.get("/get/generated-password", query_string=bad)
+            self.assertEqual(r.status_code, 400, bad)
+
     def test_ensure_credentials_id_column_migration(self):
         # Save originals
         old_conn = pm.conn
@@ -0,0 +1,95 @@
+import unittest
+
+from passwordmanager.utils.apiPasswordStrength import get_password_strength
+from passwordmanager.utils.pattern_strength import (
+    MAX_PATTERN_LENGTH, estimate_strength, get_pattern_feedback, get_pattern_strength,
+)
+
+
+def _patterns(password):
+    return [match["pattern"] for match in estimate_strength(password)["sequence"]]
+
+
+class TestPatternMatching(unittest.TestCase):
+    def test_dictionary_word(self):
+        match = estimate_strength("password")["sequence"][0]
+        self.assertEqual(match["pattern"], "dictionary")
+        self.assertEqual(match["dictionary"], "passwords")
+        self.assertFalse(match["reversed"])
+
+    def test_reversed_and_l33t_words(self):
+        self.assertTrue(estimate_strength("drowssap")["sequence"][0]["reversed"])
+        self.assertTrue(estimate_strength("p@ssw0rd")["sequence"][0]["l33t"])
+
+    def test_keyboard_walk(self):
+        match = estimate_strength("asdfghjkl")["sequence"][0]
+        self.assertEqual(match["pattern"], "spatial")
+        self.assertEqual(match["graph"], "qwerty")
+
+    def test_repeat_sequence_and_date(self):
+        self.assertEqual(_patterns("xyzxyzxyz"), ["repeat"])
+        self.assertEqual(_patterns("abcdefgh"), ["sequence"])
+        self.assertEqual(_patterns("98765"), ["sequence"])
+        self.assertEqual(_patterns("13/05/1997"), ["date"])
+
+    def test_sequence_covers_password_without_leaking_it(self):
+        password = "dragon2020dragon"
+        sequence = estimate_strength(password)["sequence"]
+        self.assertEqual(sequence[0]["i"], 0)
+        self.assertEqual(sequence[-1]["j"], len(password) - 1)
+        for match in sequence:
+            self.assertNotIn("token", match)
+            self.assertNotIn("base", match)
+
+
+class TestEstimateStrength(unittest.TestCase):
+    def test_common_password_is_weak(self):
+        result = estimate_strength("Password1!")
+        self.assertEqual(result["strength"], "weak")
+        self.assertTrue(result["warning"])
+
+    def test_random_password_is_strong(self):
+        result = estimate_strength("kL8#qZ2!wX5@nB7$hJ3%")
+        self.assertEqual(result["strength"], "strong")
+        self.assertEqual(result["warning"], "")
+
+    def test_passphrase_is_strong(self):
+        self.assertEqual(estimate_strength("correcthorsebatterystaple")["strength"], "strong")
+
+    def test_empty_and_non_ascii(self):
+        self.assertEqual(estimate_strength("")["strength"], "weak")
+        self.assertEqual(estimate_strength("")["sequence"], [])
+        self.assertIn(estimate_strength("密码密码123")["strength"], ("weak", "medium", "strong"))
+
+    def test_long_repeat_stays_weak(self):
+        # longer than one analysis chunk, the repeated chunks must not count as brute force
+        self.assertEqual(estimate_strength("a" * (MAX_PATTERN_LENGTH * 4 + 3))["strength"], "weak")
+
+    def test_long_random_password_spans_chunks(self):
+        password = "kL8#qZ2!wX5@nB7$hJ3%" * 2 + "Vt6^"
+        result = estimate_strength(password)
+        self.assertEqual(result["strength"], "strong")
+        self.assertEqual(result["sequence"][-1]["j"], len(password) - 1)
+
+
+class TestGetPatternStrength(unittest.TestCase):
+    def test_never_above_entropy_estimate(self):
+        order = {"weak": 0, "medium": 1, "strong": 2}
+        for password in ["abc", "Tr0ub4dor&3", "qwertyuiop", "correcthorsebatterystaple", "Zz9!Zz9!"]:
+            self.assertLessEqual(
+                order[get_pattern_strength(password)], order[get_password_strength(password)], password
+            )
+
+    def test_patterns_lower_the_rating(self):
+        # plenty of entropy by character classes, but a dictionary word plus a year
+        self.assertEqual(get_password_strength("sunshine19901990"), "strong")
+        self.assertNotEqual(get_pattern_strength("sunshine19901990"), "strong")
+
+    def test_feedback_has_warning(self):
+        strength, warning = get_pattern_feedback("qwertyuiop")
+        self.assertEqual(strength, "weak")
+        self.assertTrue(warning)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from passwordmanager.api.profiling import (
+    DEFAULT_KEEP, PROFILE_ENV, PROFILE_KEEP_ENV, RequestProfiler, parse_keep, parse_routes,
+)
+
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, "profiles")
+        self.profiler = RequestProfiler(self.directory, keep=2)
+        self.app = Flask(__name__)
+        self.profiler.install(self.app)
+
+        @self.app.route("/slow/<int:ms>")
+        def slow(ms):
+            time.sleep(ms / 1000)
+            return "ok"
+
+        @self.app.route("/other")
+        def other():
+            return "ok"
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _files(self):
+        return sorted(os.listdir(self.directory)) if os.path.isdir(self.directory) else []
+
+    def test_off_by_default(self):
+        self.client.get("/slow/1")
+        self.assertEqual(self._files(), [])
+
+    def test_keeps_the_slowest(self):
+        self.profiler.configure(True, ["/slow/<int:ms>"])
+        for ms in (30, 5, 60, 1):
+            self.client.get(f"/slow/{ms}")
+        self.client.get("/other")
+
+        status = self.profiler.status()
+        self.assertEqual([p["ms"] >= 60 for p in status["profiles"]], [True, False])
+        self.assertGreaterEqual(status["profiles"][1]["ms"], 30)
+        files = self._files()
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(name.startswith("slow_int_ms-") and name.endswith(".prof") for name in files))
+        stats = pstats.Stats(os.path.join(self.directory, files[0]))
+        self.assertTrue(any(func[2] == "slow" for func in stats.stats))
+
+        # a new profiler on the same directory still counts what is there
+        restarted = RequestProfiler(self.directory, keep=2)
+        self.assertEqual(len(restarted.status()["profiles"]), 2)
+
+    def test_configuration(self):
+        self.assertIsNone(parse_routes("all"))
+        self.assertEqual(parse_routes("/list, /export"), frozenset({"/list", "/export"}))
+        with patch.dict(os.environ, {PROFILE_ENV: "/list"}):
+            profiler = RequestProfiler.from_environment(self.directory)
+        self.assertTrue(profiler.wants("/list"))
+        self.assertFalse(profiler.wants("/get/<int:cred_id>"))
+        profiler.configure(False)
+        self.assertFalse(profiler.wants("/list"))
+
+    def test_keep_from_environment(self):
+        self.assertEqual(parse_keep("5"), 5)
+        self.assertEqual(parse_keep("0"), 1)
+        for value in (None, "", "ten", "5.5"):
+            self.assertEqual(parse_keep(value), DEFAULT_KEEP, value)
+        with patch.dict(os.environ, {PROFILE_KEEP_ENV: "lots"}):
+            self.assertEqual(RequestProfiler.from_environment(self.directory).keep, DEFAULT_KEEP)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import unittest
+from unittest import mock
+
+from cryptography.fernet import Fernet
+
+from passwordmanager.core import quick_unlock
+from passwordmanager.core.quick_unlock import QuickUnlock, validate_pin
+
+
+class TestValidatePin(unittest.TestCase):
+    def test_rules(self):
+        self.assertIsNone(validate_pin("1234"))
+        self.assertIsNone(validate_pin("123456789012"))
+        self.assertIsNotNone(validate_pin("123"))
+        self.assertIsNotNone(validate_pin("1234567890123"))
+        self.assertIsNotNone(validate_pin("12a4"))
+        self.assertIsNotNone(validate_pin(1234))
+        self.assertIsNotNone(validate_pin(None))
+
+
+class TestQuickUnlock(unittest.TestCase):
+    def setUp(self):
+        self.vmk = Fernet.generate_key()
+        self.qu = QuickUnlock(window_seconds=60, max_attempts=3)
+        self.qu.enroll("alice", self.vmk, "2468")
+
+    def test_not_available_until_armed(self):
+        self.assertTrue(self.qu.enrolled)
+        self.assertFalse(self.qu.available(now=0))
+        self.assertIsNone(self.qu.unlock("2468", now=0))
+
+    def test_unlock_inside_window(self):
+        self.qu.arm(now=100)
+        status = self.qu.status(now=110)
+        self.assertEqual((status["available"], status["username"], status["expires_in"], status["attempts_left"]),
+                         (True, "alice", 50, 3))
+        self.assertEqual(self.qu.unlock("2468", now=110), self.vmk)
+        # the window is spent, but the PIN stays enrolled for the next lock
+        self.assertFalse(self.qu.available(now=111))
+        self.qu.arm(now=200)
+        self.assertEqual(self.qu.unlock("2468", now=201), self.vmk)
+
+    def test_window_expires(self):
+        self.qu.arm(now=100)
+        self.assertIsNone(self.qu.unlock("2468", now=160))
+        self.assertFalse(self.qu.enrolled)
+
+    def test_wrong_pins_use_up_tries(self):
+        self.qu.arm(now=100)
+        self.assertIsNone(self.qu.unlock("0000", now=101))
+        self.assertIsNone(self.qu.unlock("1111", now=102))
+        self.assertEqual(self.qu.status(now=103)["attempts_left"], 1)
+        self.assertIsNone(self.qu.unlock("2222", now=103))
+        # out of tries: the wrapped key is gone, even the right PIN no longer works
+        self.assertFalse(self.qu.enrolled)
+        self.qu.arm(now=104)
+        self.assertIsNone(self.qu.unlock("2468", now=105))
+
+    def test_concurrent_guesses_stay_within_tries(self):
+        self.qu.arm()
+        derive = quick_unlock.derive_wrap_key
+        evaluated = []
+        barrier = threading.Barrier(40)
+
+        def counting_derive(*args):
+            evaluated.append(args[0])
+            return derive(*args)
+
+        def guess(pin):
+            barrier.wait()
+            results.append(self.qu.unlock(pin))
+
+        results = []
+        pins = [f"{n:04d}" for n in range(1000, 1039)] + ["2468"]
+        threads = [threading.Thread(target=guess, args=(pin,)) for pin in pins]
+        with mock.patch.object(quick_unlock, "derive_wrap_key", counting_derive):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLessEqual(len(evaluated), 3)
+        self.assertEqual(len(results), 40)
+        self.assertFalse(self.qu.available())
+
+    def test_rejects_bad_pin_at_enrollment(self):
+        with self.assertRaises(ValueError):
+            self.qu.enroll("alice", self.vmk, "12")
+
+    def test_bound_to_enrolling_session(self):
+        session, other = object(), object()
+        self.qu.enroll("alice", self.vmk, "2468", session=session)
+        self.assertTrue(self.qu.belongs_to(session))
+        self.assertFalse(self.qu.belongs_to(other))
+        self.qu.clear()
+        self.assertFalse(self.qu.belongs_to(session))
+
+    def test_clear(self):
+        self.qu.arm(now=100)
+        self.qu.clear()
+        self.assertEqual(self.qu.status(now=101), {
+            "enrolled": False, "available": False, "username": None, "expires_in": 0, "attempts_left": 0,
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
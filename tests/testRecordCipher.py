@@ -0,0 +1,86 @@
+import unittest
+import sqlite3
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from passwordmanager.core.record_cipher import (
+    RECORD_HEADER,
+    RECORD_OVERHEAD,
+    RecordCipher,
+    MultiRecordCipher,
+    is_record,
+    migrate_records,
+)
+
+
+class TestRecordCipher(unittest.TestCase):
+    def setUp(self):
+        self.vmk = Fernet.generate_key()
+        self.cipher = RecordCipher(self.vmk)
+
+    def test_round_trip_and_size(self):
+        token = self.cipher.encrypt(b"correct horse")
+        self.assertTrue(is_record(token))
+        self.assertEqual(len(token), len(b"correct horse") + RECORD_OVERHEAD)
+        self.assertEqual(self.cipher.decrypt(token), b"correct horse")
+        self.assertNotEqual(self.cipher.encrypt(b"correct horse"), token)
+        self.assertLess(len(token), len(Fernet(self.vmk).encrypt(b"correct horse")))
+
+    def test_reads_legacy_fernet_tokens(self):
+        legacy = Fernet(self.vmk).encrypt(b"old-pw")
+        self.assertFalse(is_record(legacy))
+        self.assertEqual(self.cipher.decrypt(legacy), b"old-pw")
+        self.assertEqual(self.cipher.decrypt(legacy.decode()), b"old-pw")
+
+    def test_tampered_or_foreign_records_fail(self):
+        token = bytearray(self.cipher.encrypt(b"secret"))
+        token[-1] ^= 1
+        with self.assertRaises(InvalidToken):
+            self.cipher.decrypt(bytes(token))
+        with self.assertRaises(InvalidToken):
+            self.cipher.decrypt(RECORD_HEADER + b"short")
+        with self.assertRaises(InvalidToken):
+            RecordCipher(Fernet.generate_key()).decrypt(self.cipher.encrypt(b"secret"))
+
+    def test_multi_cipher(self):
+        old = RecordCipher(Fernet.generate_key())
+        multi = MultiRecordCipher([self.cipher, old])
+        self.assertEqual(multi.decrypt(old.encrypt(b"a")), b"a")
+        self.assertEqual(self.cipher.decrypt(multi.encrypt(b"b")), b"b")
+        with self.assertRaises(InvalidToken):
+            multi.decrypt(RecordCipher(Fernet.generate_key()).encrypt(b"c"))
+        with self.assertRaises(ValueError):
+            MultiRecordCipher([])
+
+
+class TestMigrateRecords(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.c = self.conn.cursor()
+        self.c.execute("CREATE TABLE credentials (id INTEGER PRIMARY KEY AUTOINCREMENT, password BLOB)")
+        self.vmk = Fernet.generate_key()
+        self.cipher = RecordCipher(self.vmk)
+        legacy = Fernet(self.vmk)
+        for i in range(5):
+            self.c.execute("INSERT INTO credentials (password) VALUES (?)", (legacy.encrypt(f"pw-{i}".encode()),))
+        self.c.execute("INSERT INTO credentials (password) VALUES (?)", (self.cipher.encrypt(b"pw-5"),))
+        # another account's row, which this key can't open
+        self.c.execute("INSERT INTO credentials (password) VALUES (?)", (Fernet(Fernet.generate_key()).encrypt(b"x"),))
+        self.conn.commit()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_migrates_in_batches_and_reruns_cleanly(self):
+        self.assertEqual(migrate_records(self.c, self.cipher, batch_size=2, owner=None), {"migrated": 5, "skipped": 1})
+        self.c.execute("SELECT password FROM credentials ORDER BY id")
+        tokens = [row[0] for row in self.c.fetchall()]
+        self.assertTrue(all(is_record(t) for t in tokens[:6]))
+        self.assertFalse(is_record(tokens[6]))
+        self.assertEqual([self.cipher.decrypt(t).decode() for t in tokens[:6]], [f"pw-{i}" for i in range(6)])
+
+        self.assertEqual(migrate_records(self.c, self.cipher, owner=None), {"migrated": 0, "skipped": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
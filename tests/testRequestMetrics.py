@@ -0,0 +1,86 @@
+import sqlite3
+import unittest
+
+from flask import Flask, jsonify
+
+from passwordmanager.api.metrics import RequestMetrics, TimedCursor, is_loopback
+
+
+class TestRequestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = RequestMetrics(buckets=(0.5, 10.0))
+        self.app = Flask(__name__)
+        self.metrics.install(self.app)
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.c = TimedCursor(self.conn.cursor(), self.metrics, self.metrics.timed_connection(self.conn))
+        self.c.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        self.kdf = self.metrics.timed("kdf", lambda value: self.metrics.timed("kdf", str.upper)(value))
+
+        @self.app.route("/items/<int:item_id>")
+        def get_item(item_id):
+            self.c.execute("SELECT name FROM items WHERE id = ?", (item_id,))
+            row = self.c.fetchone()
+            if row is None:
+                return jsonify({"error": "Not found"}), 404
+            return jsonify({"name": self.kdf(row[0])})
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_counts_statuses_and_histogram(self):
+        self.c.execute("INSERT INTO items (name) VALUES ('a')")
+        self.c.connection.commit()
+        self.assertEqual(self.client.get("/items/1").get_json(), {"name": "A"})
+        self.client.get("/items/2")
+        self.client.get("/nothing")
+
+        text = self.metrics.render()
+        self.assertIn('passwordmanager_http_requests_total{route="/items/<int:item_id>",method="GET",status="200"} 1', text)
+        self.assertIn('passwordmanager_http_requests_total{route="/items/<int:item_id>",method="GET",status="404"} 1', text)
+        self.assertIn('passwordmanager_http_requests_total{route="unmatched",method="GET",status="404"} 1', text)
+        # buckets are cumulative and end in +Inf
+        self.assertIn('passwordmanager_http_request_duration_seconds_bucket{route="/items/<int:item_id>",method="GET",le="0.5"} 2', text)
+        self.assertIn('passwordmanager_http_request_duration_seconds_bucket{route="/items/<int:item_id>",method="GET",le="+Inf"} 2', text)
+        self.assertIn('passwordmanager_http_request_duration_seconds_count{route="/items/<int:item_id>",method="GET"} 2', text)
+        self.assertIn("passwordmanager_http_requests_in_flight 0", text)
+
+    def test_phases_are_counted_once_and_only_inside_requests(self):
+        self.c.execute("INSERT INTO items (name) VALUES ('a')")
+        self.kdf("outside a request")
+        self.client.get("/items/1")
+
+        text = self.metrics.render()
+        # execute + fetchone, and the nested kdf call counts as one
+        self.assertIn('passwordmanager_request_phase_calls_total{route="/items/<int:item_id>",phase="db"} 2', text)
+        self.assertIn('passwordmanager_request_phase_calls_total{route="/items/<int:item_id>",phase="kdf"} 1', text)
+        self.assertIn('passwordmanager_request_phase_seconds_total{route="/items/<int:item_id>",phase="kdf"}', text)
+
+    def test_timed_cursor_behaves_like_a_cursor(self):
+        self.c.executemany("INSERT INTO items (name) VALUES (?)", [("a",), ("b",)])
+        self.assertEqual(self.c.rowcount, 2)
+        self.assertEqual(self.c.execute("SELECT COUNT(*) FROM items").fetchone(), (2,))
+        self.assertEqual([row for row in self.c.execute("SELECT name FROM items ORDER BY id")], [("a",), ("b",)])
+        self.assertIsInstance(self.c.connection.cursor(), TimedCursor)
+
+    def test_timed_cipher_class(self):
+        class Cipher:
+            def encrypt(self, data):
+                return data[::-1]
+
+            def decrypt(self, token):
+                return token[::-1]
+
+        timed = self.metrics.timed_cipher_class(Cipher)
+        self.assertEqual(timed.__name__, "Cipher")
+        self.assertEqual(timed().decrypt(timed().encrypt(b"abc")), b"abc")
+        self.assertIsInstance(timed(), Cipher)
+
+    def test_is_loopback(self):
+        for address, expected in (("127.0.0.1", True), ("::1", True), ("10.0.0.2", False), ("", False), (None, False)):
+            self.assertEqual(is_loopback(address), expected, address)
+
+
+if __name__ == "__main__":
+    unittest.main()
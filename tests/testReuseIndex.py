@@ -0,0 +1,104 @@
+import unittest
+import sqlite3
+
+from cryptography.fernet import Fernet
+
+from passwordmanager.core.reuse_index import (
+    derive_reuse_key,
+    password_fingerprint,
+    backfill_fingerprints,
+    find_reused,
+)
+from passwordmanager.core.import_service import import_items
+
+
+class TestReuseIndex(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.c = self.conn.cursor()
+        self.c.execute(
+            """
+            CREATE TABLE credentials (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT,
+                username TEXT,
+                password BLOB,
+                password_hmac BLOB,
+                owner TEXT
+            )
+            """
+        )
+        self.vmk = Fernet.generate_key()
+        self.cipher = Fernet(self.vmk)
+        self.reuse_key = derive_reuse_key(self.vmk)
+
+    def tearDown(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def _insert(self, site, password, with_hash=True):
+        fingerprint = password_fingerprint(self.reuse_key, password) if with_hash else None
+        self.c.execute(
+            "INSERT INTO credentials (site, username, password, password_hmac) VALUES (?, ?, ?, ?)",
+            (site, "user", self.cipher.encrypt(password.encode()), fingerprint),
+        )
+        return self.c.lastrowid
+
+    def test_key_is_separate_from_vmk_and_deterministic(self):
+        self.assertEqual(len(self.reuse_key), 32)
+        self.assertEqual(derive_reuse_key(self.vmk), self.reuse_key)
+        self.assertNotEqual(derive_reuse_key(Fernet.generate_key()), self.reuse_key)
+        self.assertNotIn(self.reuse_key, self.vmk)
+
+    def test_fingerprint(self):
+        a = password_fingerprint(self.reuse_key, "hunter2")
+        self.assertEqual(a, password_fingerprint(self.reuse_key, "hunter2"))
+        self.assertNotEqual(a, password_fingerprint(self.reuse_key, "hunter3"))
+        self.assertNotEqual(a, password_fingerprint(derive_reuse_key(Fernet.generate_key()), "hunter2"))
+        self.assertIsNone(password_fingerprint(None, "hunter2"))
+
+    def test_find_reused_groups(self):
+        a = self._insert("a.com", "shared")
+        b = self._insert("b.com", "shared")
+        c = self._insert("c.com", "other")
+        d = self._insert("d.com", "other")
+        e = self._insert("e.com", "other")
+        self._insert("f.com", "unique")
+        groups = find_reused(self.c)
+        self.assertEqual([group["count"] for group in groups], [3, 2])
+        self.assertEqual([item["id"] for item in groups[0]["credentials"]], [c, d, e])
+        self.assertEqual([item["id"] for item in groups[1]["credentials"]], [a, b])
+        self.assertNotIn("password_hmac", groups[0]["credentials"][0])
+
+    def test_backfill_fills_only_missing_rows(self):
+        self._insert("a.com", "shared")
+        self._insert("b.com", "shared", with_hash=False)
+        self.c.execute(
+            "INSERT INTO credentials (site, username, password) VALUES (?, ?, ?)", ("x.com", "user", b"garbage")
+        )
+        self.assertEqual(find_reused(self.c), [])
+
+        summary = backfill_fingerprints(self.c, self.cipher, self.reuse_key, batch_size=1, owner=None)
+        self.assertEqual(summary, {"updated": 1, "errors": 1})
+        self.assertEqual(find_reused(self.c)[0]["count"], 2)
+        # running it again has nothing left to do
+        self.assertEqual(backfill_fingerprints(self.c, self.cipher, self.reuse_key, owner=None)["updated"], 0)
+
+    def test_backfill_without_key_does_nothing(self):
+        self._insert("a.com", "shared", with_hash=False)
+        self.assertEqual(backfill_fingerprints(self.c, self.cipher, None, owner=None), {"updated": 0, "errors": 0})
+
+    def test_import_writes_fingerprints(self):
+        items = [
+            {"site": "a.com", "username": "u", "password": "same"},
+            {"site": "b.com", "username": "u", "password": "same"},
+        ]
+        summary = import_items(self.c, items, self.cipher, reuse_key=self.reuse_key, owner="alice")
+        self.assertEqual(summary["inserted"], 2)
+        self.assertEqual(find_reused(self.c, owner="alice")[0]["count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import sqlite3
+
+from cryptography.fernet import Fernet, MultiFernet
+
+from passwordmanager.core.reuse_index import derive_reuse_key, password_fingerprint
+from passwordmanager.core.rotation_service import (
+    get_rotation,
+    start_rotation,
+    rotate_batch,
+    finish_rotation,
+    rotation_progress,
+)
+
+
+class TestRotationService(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.c = self.conn.cursor()
+        self.c.execute(
+            """
+            CREATE TABLE credentials (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT,
+                username TEXT,
+                password BLOB,
+                password_hmac BLOB
+            )
+            """
+        )
+        self.c.execute("CREATE TABLE user_metadata (username TEXT PRIMARY KEY, wrapped_vmk BLOB NOT NULL)")
+        self.c.execute(
+            """
+            CREATE TABLE vmk_rotation (
+                username TEXT PRIMARY KEY,
+                new_wrapped_vmk BLOB NOT NULL,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                skipped INTEGER NOT NULL DEFAULT 0,
+                started_at DATETIME
+            )
+            """
+        )
+        self.c.execute("INSERT INTO user_metadata VALUES ('alice', ?)", (b"old-wrapped",))
+        self.old = Fernet(Fernet.generate_key())
+        self.new_vmk = Fernet.generate_key()
+        self.new = Fernet(self.new_vmk)
+        self.new_reuse_key = derive_reuse_key(self.new_vmk)
+        self.read = MultiFernet([self.new, self.old])
+        for i in range(7):
+            self._insert(self.old, f"pw-{i}")
+        # a row from another account, encrypted under a key this rotation doesn't have
+        self.foreign_id = self._insert(Fernet(Fernet.generate_key()), "not-mine")
+        self.conn.commit()
+
+    def tearDown(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def _insert(self, cipher, password):
+        self.c.execute(
+            "INSERT INTO credentials (site, username, password) VALUES (?, ?, ?)",
+            ("site", "user", cipher.encrypt(password.encode())),
+        )
+        return self.c.lastrowid
+
+    def _passwords(self, cipher):
+        self.c.execute("SELECT id, password FROM credentials WHERE id != ? ORDER BY id", (self.foreign_id,))
+        return [cipher.decrypt(token).decode() for _, token in self.c.fetchall()]
+
+    def test_full_rotation(self):
+        state = start_rotation(self.c, "alice", b"new-wrapped", owner=None)
+        self.assertEqual(state["total"], 8)
+        self.conn.commit()
+
+        calls = 0
+        while not rotate_batch(self.c, "alice", self.read, self.new, self.new_reuse_key, batch_size=3, owner=None)["finished"]:
+            self.conn.commit()
+            calls += 1
+        self.assertEqual(calls, 3)
+        progress = rotation_progress(get_rotation(self.c, "alice"))
+        self.assertEqual((progress["done"], progress["skipped"]), (7, 1))
+        finish_rotation(self.c, "alice")
+        self.conn.commit()
+
+        # only the new key is needed now, and the reuse hashes follow the new key
+        self.assertEqual(self._passwords(self.new), [f"pw-{i}" for i in range(7)])
+        self.c.execute("SELECT password_hmac FROM credentials WHERE id = 1")
+        self.assertEqual(self.c.fetchone()[0], password_fingerprint(self.new_reuse_key, "pw-0"))
+        self.c.execute("SELECT wrapped_vmk FROM user_metadata WHERE username = 'alice'")
+        self.assertEqual(self.c.fetchone()[0], b"new-wrapped")
+        self.assertIsNone(get_rotation(self.c, "alice"))
+        self.assertEqual(rotation_progress(None), {"rotating": False})
+
+    def test_interrupted_batch_rolls_back_and_resumes(self):
+        start_rotation(self.c, "alice", b"new-wrapped", owner=None)
+        self.conn.commit()
+        rotate_batch(self.c, "alice", self.read, self.new, self.new_reuse_key, batch_size=3, owner=None)
+        self.conn.commit()
+        rotate_batch(self.c, "alice", self.read, self.new, self.new_reuse_key, batch_size=3, owner=None)
+        self.conn.rollback()  # crash before the second batch committed
+
+        state = get_rotation(self.c, "alice")
+        self.assertEqual((state["last_id"], state["done"]), (3, 3))
+        # mid-rotation both kinds of row read fine through the MultiFernet
+        self.assertEqual(self._passwords(self.read), [f"pw-{i}" for i in range(7)])
+
+        while not rotate_batch(self.c, "alice", self.read, self.new, self.new_reuse_key, batch_size=3, owner=None)["finished"]:
+            self.conn.commit()
+        self.assertEqual(self._passwords(self.new), [f"pw-{i}" for i in range(7)])
+
+    def test_rows_written_during_rotation(self):
+        start_rotation(self.c, "alice", b"new-wrapped", owner=None)
+        rotate_batch(self.c, "alice", self.read, self.new, self.new_reuse_key, batch_size=3, owner=None)
+        self._insert(self.read, "added-mid-rotation")  # MultiFernet encrypts with the new key
+        while not rotate_batch(self.c, "alice", self.read, self.new, self.new_reuse_key, batch_size=3, owner=None)["finished"]:
+            pass
+        self.assertEqual(self._passwords(self.new)[-1], "added-mid-rotation")
+
+    def test_row_rewritten_during_batch_is_kept(self):
+        start_rotation(self.c, "alice", b"new-wrapped", owner=None)
+        self.conn.commit()
+        test = self
+
+        class UpdateMidBatch:
+            # an /update lands after the batch read the rows and before it writes them back
+            def decrypt(self, token):
+                test.c.execute("UPDATE credentials SET password = ? WHERE id = 2", (test.new.encrypt(b"edited"),))
+                return test.read.decrypt(token)
+
+        state = rotate_batch(self.c, "alice", UpdateMidBatch(), self.new, self.new_reuse_key, batch_size=3, owner=None)
+        self.assertEqual(state["done"], 3)
+        self.assertEqual(self._passwords(self.read)[:3], ["pw-0", "edited", "pw-2"])
+
+    def test_batch_without_rotation_raises(self):
+        with self.assertRaises(ValueError):
+            rotate_batch(self.c, "alice", self.read, self.new, self.new_reuse_key, owner=None)
+
+    def test_finish_without_rotation_keeps_key(self):
+        finish_rotation(self.c, "alice")
+        self.c.execute("SELECT wrapped_vmk FROM user_metadata WHERE username = 'alice'")
+        self.assertEqual(self.c.fetchone()[0], b"old-wrapped")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import random
+import time
+import unittest
+
+from benchmarks.generate_vault import synthetic_credentials
+from passwordmanager.utils.search_engine import SearchEngine, prefix_distance, max_edit_distance
+
+
+def _creds():
+    return [
+        {"id": 1, "site": "github.com", "username": "alice"},
+        {"id": 2, "site": "gist.github.com", "username": "alice"},
+        {"id": 3, "site": "mygithubmirror.net", "username": "bob"},
+        {"id": 4, "site": "example.org", "username": "g.i.t.h.u.b"},
+        {"id": 5, "site": "bank.example.com", "username": "carol_smith"},
+        {"id": 6, "site": "github", "username": "dave"},
+    ]
+
+
+class TestPrefixDistance(unittest.TestCase):
+    def test_exact_and_prefix(self):
+        self.assertEqual(prefix_distance("git", "github.com", 1), 0)
+        self.assertEqual(prefix_distance("github", "github", 1), 0)
+
+    def test_single_edits(self):
+        self.assertEqual(prefix_distance("gthub", "github.com", 1), 1)   # deletion
+        self.assertEqual(prefix_distance("gitbub", "github.com", 1), 1)  # substitution
+        self.assertEqual(prefix_distance("giithub", "github.com", 1), 1) # insertion
+        self.assertEqual(prefix_distance("gihtub", "github.com", 1), 1)  # transposition
+
+    def test_over_limit_returns_none(self):
+        self.assertIsNone(prefix_distance("gltlab", "github.com", 1))
+        self.assertIsNone(prefix_distance("zzzz", "github", 2))
+
+    def test_max_edit_distance_grows_with_query(self):
+        self.assertEqual(max_edit_distance("git"), 0)
+        self.assertEqual(max_edit_distance("gith"), 1)
+        self.assertEqual(max_edit_distance("githubcom"), 2)
+
+
+class TestSearchEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = SearchEngine(_creds())
+
+    def _ids(self, query, limit=20):
+        return [self.engine.credentials[pos]["id"] for pos, _, _ in self.engine.rank(query, limit)]
+
+    def _tiers(self, query):
+        return {self.engine.credentials[pos]["id"]: tier for pos, _, tier in self.engine.rank(query, None)}
+
+    def test_tier_order(self):
+        tiers = self._tiers("github")
+        self.assertEqual(tiers[6], "exact")
+        self.assertEqual(tiers[1], "prefix")
+        self.assertEqual(tiers[2], "boundary")
+        self.assertEqual(tiers[3], "substring")
+        self.assertEqual(tiers[4], "subsequence")
+        self.assertEqual(self._ids("github"), [6, 1, 2, 3, 4])
+
+    def test_scores_decrease(self):
+        scores = [score for _, score, _ in self.engine.rank("github", None)]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_typo_tolerance(self):
+        # a dropped or wrong letter is within the edit distance, scattered letters only a subsequence
+        self.assertEqual(self._tiers("gthub")[1], "fuzzy")
+        tiers = self._tiers("gitbub")
+        self.assertEqual(tiers[6], "fuzzy")
+        self.assertEqual(tiers[1], "fuzzy")
+        self.assertEqual(self._tiers("gthb")[1], "subsequence")
+
+    def test_typos_rank_above_scattered_letters(self):
+        engine = SearchEngine([
+            {"id": 1, "site": "mail.agoline.de", "username": "lewis"},
+            {"id": 2, "site": "acme.mount.io", "username": "ann"},
+            {"id": 3, "site": "login.shop.com", "username": "ben"},
+            {"id": 4, "site": "accounts.bank.com", "username": "cleo"},
+            # also one edit away, but only by changing the first letter
+            {"id": 5, "site": "agointo.com", "username": "dan"},
+            {"id": 6, "site": "countryred.fr", "username": "eve"},
+        ])
+        for query, expected in (("lgoin", [3, 5, 1]), ("acount", [4, 6, 2])):
+            ranked = engine.rank(query, limit=None)
+            self.assertEqual([engine.credentials[pos]["id"] for pos, _, _ in ranked], expected, query)
+            self.assertEqual([tier for _, _, tier in ranked], ["fuzzy", "fuzzy", "subsequence"], query)
+
+    def test_transposed_letters(self):
+        engine = SearchEngine([
+            {"id": 1, "site": "company.com", "username": "ann"},
+            {"id": 2, "site": "secure.io", "username": "ben"},
+        ])
+        for query, cred_id in (("compnay", 1), ("comapny", 1), ("secrue", 2)):
+            self.assertEqual([engine.credentials[pos]["id"] for pos in engine.matches(query)], [cred_id], query)
+
+    def test_username_boundary_match(self):
+        self.assertEqual(self._tiers("smith"), {5: "boundary"})
+
+    def test_limit(self):
+        self.assertEqual(self._ids("github", limit=2), [6, 1])
+        self.assertEqual(len(self.engine.rank("a", limit=1)), 1)
+
+    def test_no_match_and_empty_query(self):
+        self.assertEqual(self.engine.rank("qqqqqq"), [])
+        self.assertEqual(self.engine.rank(""), [])
+        self.assertEqual(SearchEngine([]).rank("github"), [])
+
+    def test_matches_returns_positions_in_rank_order(self):
+        positions = self.engine.matches("github")
+        self.assertEqual([self.engine.credentials[p]["id"] for p in positions], [6, 1, 2, 3, 4])
+
+    def test_matches_limit_is_the_head(self):
+        full = self.engine.matches("github")
+        for limit in range(1, len(full) + 1):
+            self.assertEqual(self.engine.matches("github", limit=limit), full[:limit])
+
+    def test_limit_with_several_entries_per_credential(self):
+        # every site has three words starting with the query, all of them ahead of the next site's
+        engine = SearchEngine([
+            {"id": n, "site": f"x.shop{c}.shop{c}.shop{c}.com", "username": "u"}
+            for n, c in enumerate("abcdefgh")
+        ])
+        full = engine.rank("shop", limit=None)
+        self.assertEqual({tier for _, _, tier in full}, {"boundary"})
+        for limit in range(1, 9):
+            self.assertEqual(engine.rank("shop", limit=limit), full[:limit])
+
+    def test_substring_search_still_available(self):
+        # the plain CredentialSearchIndex behaviour is inherited unchanged
+        self.assertEqual(self.engine.search("example"), {3, 4})
+
+
+class TestSearchBudget(unittest.TestCase):
+    """A ranked head has to come back within a frame (16 ms) on every keystroke at 50k entries."""
+
+    BUDGET_SECONDS = 0.016
+    # typos, a near miss that matches nothing, and plain prefixes
+    QUERIES = ("acount", "emaill.com", "lgoin", "gmial", "hotmial.com", "compnay", "outlok", "mail")
+
+    @classmethod
+    def setUpClass(cls):
+        credentials = synthetic_credentials(50_000, random.Random(7))
+        cls.engine = SearchEngine(
+            {"id": n, "site": site, "username": username}
+            for n, (site, username, _, _) in enumerate(credentials)
+        )
+
+    def test_head_within_a_frame(self):
+        # 20 for the API default, 100 for the list widget's head
+        for limit in (20, 100):
+            timings = {query: [] for query in self.QUERIES}
+            for _ in range(3):
+                # round robin, so every call is a new query like a keystroke is
+                for query in self.QUERIES:
+                    start = time.perf_counter()
+                    self.engine.rank(query, limit=limit)
+                    timings[query].append(time.perf_counter() - start)
+            for query, seconds in timings.items():
+                self.assertLess(min(seconds), self.BUDGET_SECONDS, f"{query!r} at limit {limit}")
+
+    def test_typos_find_the_intended_entries(self):
+        for query, word in (("acount", "account"), ("lgoin", "login")):
+            top = [self.engine.keys[pos] for pos in self.engine.matches(query, limit=20)]
+            self.assertEqual(len(top), 20, query)
+            self.assertTrue(all(word in key for key in top), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from passwordmanager.utils.search_index import CredentialSearchIndex
+
+
+def _creds():
+    return [
+        {"id": 1, "site": "GitHub.com", "username": "alice"},
+        {"id": 2, "site": "gitlab.com", "username": "bob"},
+        {"id": 3, "site": "example.org", "username": "Alice.Smith"},
+        {"id": 4, "site": "bank.example.com", "username": "carol"},
+    ]
+
+
+class TestCredentialSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = CredentialSearchIndex(_creds())
+
+    def test_empty_query_matches_everything(self):
+        self.assertEqual(self.index.search(""), {0, 1, 2, 3})
+        self.assertEqual(self.index.search("   "), {0, 1, 2, 3})
+
+    def test_short_queries(self):
+        self.assertEqual(self.index.search("k"), {3})
+        self.assertEqual(self.index.search("gi"), {0, 1})
+        self.assertEqual(self.index.search("git"), {0, 1})
+
+    def test_long_query_is_case_insensitive_substring(self):
+        self.assertEqual(self.index.search("GITHUB"), {0})
+        self.assertEqual(self.index.search("example"), {2, 3})
+        self.assertEqual(self.index.search("alice"), {0, 2})
+
+    def test_matches_same_as_plain_substring_scan(self):
+        for query in ["a", "al", "ali", "com", "e.c", "nomatch", "b"]:
+            expected = {
+                i for i, c in enumerate(_creds())
+                if query in c["site"].lower() or query in c["username"].lower()
+            }
+            fresh = CredentialSearchIndex(_creds())
+            self.assertEqual(fresh.search(query), expected, query)
+
+    def test_query_does_not_match_across_site_and_username(self):
+        # "comcarol" would only match if site and username were concatenated
+        self.assertEqual(self.index.search("comcarol"), set())
+
+    def test_narrowing_refines_previous_result(self):
+        self.assertEqual(self.index.search("git"), {0, 1})
+        # the refined search must only look at the previous result set
+        self.index.keys[2] = "github-lookalike\nnobody"
+        self.assertEqual(self.index.search("github"), {0})
+
+    def test_widening_falls_back_to_index(self):
+        self.assertEqual(self.index.search("github"), {0})
+        self.assertEqual(self.index.search("git"), {0, 1})
+
+    def test_build_resets_state(self):
+        self.index.search("git")
+        self.index.build([{"site": "other.net", "username": "git"}])
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.search("github"), set())
+        self.assertEqual(self.index.search("git"), {0})
+
+    def test_ordered_by_site(self):
+        self.assertEqual(self.index.ordered(), [0, 1, 2, 3])
+        self.assertEqual(self.index.ordered("site"), [3, 2, 0, 1])
+        self.assertEqual(self.index.ordered("site", reverse=True), [1, 0, 2, 3])
+
+    def test_missing_fields(self):
+        index = CredentialSearchIndex([{"id": 9}])
+        self.assertEqual(index.search("x"), set())
+        self.assertEqual(index.search(""), {0})
+
+
+if __name__ == "__main__":
+    unittest.main()
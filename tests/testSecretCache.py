@@ -0,0 +1,60 @@
+import unittest
+
+from passwordmanager.core.secret_cache import SecretCache
+
+
+class TestSecretCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SecretCache(max_entries=2, ttl_seconds=10)
+
+    def _buffer(self, cred_id):
+        return self.cache._entries[cred_id][1]
+
+    def test_hit_and_revision_miss(self):
+        self.cache.put(1, b"token-a", b"hunter2", now=0)
+        self.assertEqual(self.cache.get(1, b"token-a", now=1), b"hunter2")
+        buffer = self._buffer(1)
+        # the row was rewritten since: stale entry dropped and wiped
+        self.assertIsNone(self.cache.get(1, b"token-b", now=1))
+        self.assertEqual(buffer, bytearray(len(b"hunter2")))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_ttl(self):
+        self.cache.put(1, "r", b"secret", now=0)
+        buffer = self._buffer(1)
+        self.assertIsNone(self.cache.get(1, "r", now=10))
+        self.assertEqual(buffer, bytearray(6))
+
+        self.cache.put(2, "r", b"secret", now=0)
+        self.cache.put(3, "r", b"secret", now=5)
+        self.cache.purge_expired(now=12)
+        self.assertEqual(list(self.cache._entries), [3])
+
+    def test_lru_eviction_zeroes(self):
+        self.cache.put(1, "r", b"one", now=0)
+        self.cache.put(2, "r", b"two", now=0)
+        self.cache.get(1, "r", now=0)
+        evicted = self._buffer(2)
+        self.cache.put(3, "r", b"three", now=0)
+        self.assertIsNone(self.cache.get(2, "r", now=0))
+        self.assertEqual(evicted, bytearray(3))
+        self.assertEqual(self.cache.get(1, "r", now=0), b"one")
+
+    def test_discard_and_clear(self):
+        self.cache.put(1, "r", b"one")
+        self.cache.put(2, "r", b"two")
+        buffers = [self._buffer(1), self._buffer(2)]
+        self.cache.discard(1)
+        self.assertIsNone(self.cache.get(1, "r"))
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(buffers, [bytearray(3), bytearray(3)])
+
+    def test_disabled(self):
+        cache = SecretCache(max_entries=0)
+        cache.put(1, "r", b"one")
+        self.assertIsNone(cache.get(1, "r"))
+
+
+if __name__ == "__main__":
+    unittest.main()
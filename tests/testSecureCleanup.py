@@ -35,115 +35,95 @@ class TestSecureCleanup(unittest.TestCase):
         self.assertEqual(len(data), 0)
 
     def test_cleanup_secrets_no_secrets(self):
-        cleanup_secrets()
+        self._cleanup_with()
 
-    def test_cleanup_secrets_with_vmk_bytes(self):
-        from passwordmanager.api.routes import current_vmk
-        original_vmk = current_vmk
-        
+    def _cleanup_with(self, vmk=None, cipher=None):
+        # runs cleanup_secrets with the default session holding vmk/cipher, then puts the session back
+        import passwordmanager.api.routes as routes_module
+        session = routes_module.sessions.default
+        saved = session.snapshot()
         try:
-            from passwordmanager.api.routes import current_vmk
-            import passwordmanager.api.routes as routes_module
-            routes_module.current_vmk = b"test_vmk_key_data"
+            session.open("cleanup-user", vmk, cipher, None)
             cleanup_secrets()
+            self.assertTrue(session.locked)
+            self.assertIsNone(session.vmk)
+            self.assertIsNone(session.cipher)
         finally:
-            routes_module.current_vmk = original_vmk
+            if saved.locked:
+                session.close()
+            else:
+                session.open(saved.username, saved.vmk, saved.cipher, saved.reuse_key)
 
-    def test_cleanup_secrets_with_vmk_bytearray(self):
-        from passwordmanager.api.routes import current_vmk
-        original_vmk = current_vmk
-        
+    def test_cleanup_secrets_clears_secret_cache(self):
+        import passwordmanager.api.routes as routes_module
+        cache = routes_module.sessions.default.cache
+        cache.put(1, b"token", b"plaintext")
+        buffer = cache._entries[1][1]
+        self._cleanup_with(vmk=b"test_vmk_key_data")
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(buffer, bytearray(len(b"plaintext")))
+
+    def test_cleanup_secrets_covers_token_sessions(self):
+        import passwordmanager.api.routes as routes_module
+        session = routes_module.sessions.create()
         try:
-            import passwordmanager.api.routes as routes_module
-            routes_module.current_vmk = bytearray(b"test_vmk_key_data")
+            session.open("cleanup-user", b"test_vmk_key_data", None, None)
             cleanup_secrets()
+            self.assertTrue(session.locked)
         finally:
-            routes_module.current_vmk = original_vmk
+            routes_module.sessions.remove(session)
+
+    def test_cleanup_secrets_with_vmk_bytes(self):
+        self._cleanup_with(vmk=b"test_vmk_key_data")
+
+    def test_cleanup_secrets_with_vmk_bytearray(self):
+        vmk = bytearray(b"test_vmk_key_data")
+        self._cleanup_with(vmk=vmk)
+        self.assertEqual(vmk, bytearray(len(b"test_vmk_key_data")))
     
     def test_cleanup_secrets_with_vmk_other_type(self):
-        # test to cover branch: current_vmk is not None but not bytearray or bytes
-        import passwordmanager.api.routes as routes_module
-        original_vmk = routes_module.current_vmk
-        
-        try:
-            routes_module.current_vmk = "not bytes or bytearray"
-            cleanup_secrets()
-        finally:
-            routes_module.current_vmk = original_vmk
+        # test to cover branch: vmk is not None but not bytearray or bytes
+        self._cleanup_with(vmk="not bytes or bytearray")
 
     def test_cleanup_secrets_with_cipher(self):
         from cryptography.fernet import Fernet
-        from passwordmanager.api.routes import current_vmk_cipher
-        original_cipher = current_vmk_cipher
-        
-        try:
-            import passwordmanager.api.routes as routes_module
-            key = Fernet.generate_key()
-            routes_module.current_vmk_cipher = Fernet(key)
-            cleanup_secrets()
-        finally:
-            routes_module.current_vmk_cipher = original_cipher
+        self._cleanup_with(cipher=Fernet(Fernet.generate_key()))
+
+    def test_cleanup_secrets_with_record_cipher(self):
+        from cryptography.fernet import Fernet
+        from passwordmanager.core.record_cipher import RecordCipher
+        self._cleanup_with(cipher=RecordCipher(Fernet.generate_key()))
     
     def test_cleanup_secrets_with_cipher_no_signing_key(self):
         # test to cover branch: hasattr returns False or _signing_key is None
         from cryptography.fernet import Fernet
-        import passwordmanager.api.routes as routes_module
-        original_cipher = routes_module.current_vmk_cipher
-        
-        try:
-            key = Fernet.generate_key()
-            cipher = Fernet(key)
-            if hasattr(cipher, '_signing_key'):
-                cipher._signing_key = None
-            routes_module.current_vmk_cipher = cipher
-            cleanup_secrets()
-        finally:
-            routes_module.current_vmk_cipher = original_cipher
+        cipher = Fernet(Fernet.generate_key())
+        if hasattr(cipher, '_signing_key'):
+            cipher._signing_key = None
+        self._cleanup_with(cipher=cipher)
     
     def test_cleanup_secrets_with_cipher_no_encryption_key(self):
         # test to cover branch: hasattr returns False or _encryption_key is None
         from cryptography.fernet import Fernet
-        import passwordmanager.api.routes as routes_module
-        original_cipher = routes_module.current_vmk_cipher
-        
-        try:
-            key = Fernet.generate_key()
-            cipher = Fernet(key)
-            if hasattr(cipher, '_encryption_key'):
-                cipher._encryption_key = None
-            routes_module.current_vmk_cipher = cipher
-            cleanup_secrets()
-        finally:
-            routes_module.current_vmk_cipher = original_cipher
+        cipher = Fernet(Fernet.generate_key())
+        if hasattr(cipher, '_encryption_key'):
+            cipher._encryption_key = None
+        self._cleanup_with(cipher=cipher)
     
     def test_cleanup_secrets_with_cipher_no_keys(self):
         # test to cover branches: both keys are None
         from cryptography.fernet import Fernet
-        import passwordmanager.api.routes as routes_module
-        original_cipher = routes_module.current_vmk_cipher
-        
-        try:
-            key = Fernet.generate_key()
-            cipher = Fernet(key)
-            if hasattr(cipher, '_signing_key'):
-                cipher._signing_key = None
-            if hasattr(cipher, '_encryption_key'):
-                cipher._encryption_key = None
-            routes_module.current_vmk_cipher = cipher
-            cleanup_secrets()
-        finally:
-            routes_module.current_vmk_cipher = original_cipher
+        cipher = Fernet(Fernet.generate_key())
+        if hasattr(cipher, '_signing_key'):
+            cipher._signing_key = None
+        if hasattr(cipher, '_encryption_key'):
+            cipher._encryption_key = None
+        self._cleanup_with(cipher=cipher)
     
     def test_cleanup_secrets_with_cipher_no_attrs(self):
         # test to cover branches: hasattr returns False for both attributes
-        import passwordmanager.api.routes as routes_module
-        original_cipher = routes_module.current_vmk_cipher
-        
         class MockCipher:
             pass
         
-        try:
-            routes_module.current_vmk_cipher = MockCipher()
-            cleanup_secrets()
-        finally:
-            routes_module.current_vmk_cipher = original_cipher
+        self._cleanup_with(cipher=MockCipher())
+
@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from passwordmanager.utils.startup_trace import StartupTrace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# what the login window must come up without
+HEAVY_MODULES = [
+    "flask",
+    "cryptography",
+    "argon2",
+    "requests",
+    "passwordmanager.api.routes",
+    "passwordmanager.core.passwordManager",
+    "passwordmanager.gui.main_window",
+    "passwordmanager.gui.widgets.listCredentialsWidget",
+]
+
+
+def run_python(code_or_args, tmpdir, **env):
+    args = ["-c", code_or_args] if isinstance(code_or_args, str) else code_or_args
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=120,
+        env=dict(os.environ, PASSWORDMANAGER_DB=os.path.join(tmpdir, "vault.db"), **env),
+    )
+
+
+class TestStartupTrace(unittest.TestCase):
+    def test_marks_first_occurrence_in_order(self):
+        seen = []
+        trace = StartupTrace()
+        trace.listeners.append(seen.append)
+        self.assertIsNotNone(trace.mark("a"))
+        trace.mark("b")
+        self.assertIsNone(trace.mark("a"))
+
+        phases = trace.phases()
+        self.assertEqual(list(phases), ["a", "b"])
+        self.assertLessEqual(phases["a"], phases["b"])
+        self.assertEqual(seen, ["a", "b"])
+        self.assertIn("b ", trace.summary())
+
+    def test_writes_log_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "startup.json")
+            trace = StartupTrace(log_path=path)
+            trace.mark("imports_done")
+            trace.mark("login_window_shown")
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(list(json.load(f)["phases"]), ["imports_done", "login_window_shown"])
+
+
+class TestStartupImports(unittest.TestCase):
+    def test_login_path_skips_heavy_modules(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = run_python(
+                f"import sys, json, main; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))", tmpdir
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(json.loads(result.stdout.strip().splitlines()[-1]), [])
+
+    def test_database_opens_on_first_use(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = run_python(
+                "import os, passwordmanager.core.passwordManager as pm\n"
+                "print(os.path.exists(pm.db_path))\n"
+                "pm.c.execute('SELECT COUNT(*) FROM credentials')\n"
+                "print(os.path.exists(pm.db_path), pm.FTS_AVAILABLE in (True, False))",
+                tmpdir,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.split(), ["False", "True", "True"])
+
+    def test_launch_reaches_login_window(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = os.path.join(tmpdir, "startup.json")
+            result = run_python(
+                [os.path.join(REPO_ROOT, "main.py")], tmpdir,
+                QT_QPA_PLATFORM="offscreen",
+                PASSWORDMANAGER_STARTUP_LOG=log_path,
+                PASSWORDMANAGER_STARTUP_EXIT="login_window_shown",
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            with open(log_path, encoding="utf-8") as f:
+                phases = json.load(f)["phases"]
+            self.assertLess(phases["imports_done"], phases["qapplication_created"])
+            self.assertLess(phases["qapplication_created"], phases["login_window_shown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from passwordmanager.core.vault_session import SessionStore, VaultSession
+
+
+class TestVaultSession(unittest.TestCase):
+    def test_open_close_and_snapshot(self):
+        session = VaultSession("t")
+        self.assertTrue(session.locked)
+        session.cache.put(1, b"token", b"secret")
+        session.open("alice", b"vmk", "cipher", b"reuse")
+        self.assertEqual(len(session.cache), 0)
+        state = session.snapshot()
+        self.assertEqual((state.locked, state.username, state.cipher), (False, "alice", "cipher"))
+
+        self.assertEqual(session.close(), "alice")
+        # a snapshot taken earlier stays consistent, the session itself is locked and keyless
+        self.assertEqual(state.username, "alice")
+        self.assertEqual((session.locked, session.username, session.vmk, session.cipher), (True, None, None, None))
+        self.assertIsNone(session.close())
+
+    def test_set_keys_only_for_the_logged_in_user(self):
+        session = VaultSession()
+        self.assertFalse(session.set_keys("alice", "new", b"r"))
+        session.open("alice", b"vmk", "old", b"reuse")
+        self.assertFalse(session.set_keys("bob", "new", b"r"))
+        self.assertTrue(session.set_keys("alice", "new", b"r", vmk=b"vmk2"))
+        self.assertEqual((session.cipher, session.vmk), ("new", b"vmk2"))
+
+    def test_store(self):
+        store = SessionStore(max_sessions=2)
+        self.assertIs(store.get(None), store.default)
+        self.assertIsNone(store.get("unknown"))
+
+        first, second = store.create(), store.create()
+        self.assertNotEqual(first.token, second.token)
+        self.assertIs(store.get(first.token), first)
+        first.open("alice", b"vmk", "cipher", b"reuse")
+        store.default.open("alice", b"vmk", "cipher", b"reuse")
+        self.assertEqual(store.for_user("alice"), [store.default, first])
+
+        # at the limit a session without keys makes room, even a more recently active one
+        first.touch(0)
+        third = store.create()
+        self.assertIsNone(store.get(second.token))
+        self.assertIs(store.get(first.token), first)
+        self.assertFalse(first.locked)
+        self.assertEqual(len(store.all()), 3)
+
+        # with every session logged in there is no room
+        third.open("bob", b"vmk", "cipher", b"reuse")
+        self.assertIsNone(store.create())
+        self.assertEqual(len(store.all()), 3)
+
+        store.remove(third)
+        self.assertIsNone(store.get(third.token))
+        self.assertIsNotNone(store.create())
+
+
+if __name__ == "__main__":
+    unittest.main()
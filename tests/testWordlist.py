@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from passwordmanager.utils import wordlist as wordlist_module
+from passwordmanager.utils.pattern_strength import DICTIONARY_DIR
+from passwordmanager.utils.wordlist import (
+    WORDLIST_ENV, Wordlist, build_wordlist, get_wordlist, reset_wordlist, wordlist_from_text,
+)
+
+
+class TestWordlistFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "words.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        words = ["apple", "", "  banana ", "cherry", "apple", "smörgås"]
+        self.assertEqual(build_wordlist(words, self.path), 4)
+        with Wordlist(self.path) as wl:
+            self.assertEqual(len(wl), 4)
+            self.assertEqual([wl[i] for i in range(len(wl))], ["apple", "banana", "cherry", "smörgås"])
+            self.assertEqual(wl[-1], "smörgås")
+            with self.assertRaises(IndexError):
+                wl[4]
+
+    def test_from_diceware_text(self):
+        source = os.path.join(self.tmp.name, "words.txt")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("11111\tAbacus\n11112\tab\n11113\tabdomen\n\n11114\tdon't\n11115\textraordinary\n")
+        self.assertEqual(wordlist_from_text(source, self.path), 2)
+        with Wordlist(self.path) as wl:
+            self.assertEqual([wl[0], wl[1]], ["abacus", "abdomen"])
+
+    def test_rejects_bad_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a wordlist at all")
+        with self.assertRaises(ValueError):
+            Wordlist(self.path)
+
+        build_wordlist(["alpha", "beta"], self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(self.path, "wb") as f:
+            f.write(data[:-2])
+        with self.assertRaises(ValueError):
+            Wordlist(self.path)
+
+        with self.assertRaises(ValueError):
+            build_wordlist(["", " "], self.path)
+
+    def test_bundled_wordlist_matches_its_source(self):
+        rebuilt = os.path.join(self.tmp.name, "rebuilt.bin")
+        self.assertEqual(wordlist_from_text(str(DICTIONARY_DIR / "eff_large_wordlist.txt"), rebuilt), 7772)
+        with open(rebuilt, "rb") as f, open(wordlist_module.DEFAULT_WORDLIST_PATH, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+
+class TestSharedWordlist(unittest.TestCase):
+    def tearDown(self):
+        reset_wordlist()
+
+    def test_mapped_once_and_env_override(self):
+        reset_wordlist()
+        self.assertIs(get_wordlist(), get_wordlist())
+        self.assertGreater(len(get_wordlist()), 7000)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "custom.bin")
+            build_wordlist(["only"], path)
+            reset_wordlist()
+            with patch.dict(os.environ, {WORDLIST_ENV: path}):
+                self.assertEqual(get_wordlist()[0], "only")
+            reset_wordlist()
+
+
+if __name__ == "__main__":
+    unittest.main()